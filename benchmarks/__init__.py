@@ -0,0 +1,4 @@
+"""
+Benchmarks of plans construction and rendering.
+Run `python -m benchmarks --help` from the repository root.
+"""
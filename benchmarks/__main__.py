@@ -0,0 +1,149 @@
+"""
+Benchmarks runner.
+
+    python -m benchmarks                                  # run and print results
+    python -m benchmarks --save benchmarks/baseline.json  # store baseline
+    python -m benchmarks --check benchmarks/baseline.json # fail on regressions
+    python -m benchmarks --large                          # add plans of 10^5 figures
+
+Results are keyed by "<plan>/<figures count>/<case>", times are in seconds (best of at least
+three repeats), memory is peak of traced allocations during construction and rendering in bytes.
+"""
+from benchmarks.generators import GENERATORS
+from planner.frame import RectFrame
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+
+DEFAULT_SIZES = (10 ** 2, 10 ** 3, 10 ** 4)
+LARGE_SIZE = 10 ** 5
+# svgwrite objects are slow, strict rendering is measured on smaller plans
+MAX_DRAW_SIZE = 10 ** 4
+# total count of figures rendered by repeats of one case
+REPEAT_FIGURES = 10 ** 4
+MIN_REPEAT = 3
+MAX_REPEAT = 5
+# timings shorter than this are dominated by noise and are not reported as regressions
+TIME_NOISE = 0.005
+
+
+def _best_time(function, setup, repeat):
+    """
+    Best time of function call, setup result is passed to function and is not timed.
+    """
+    best = None
+    for i in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        function(argument)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _draw(drawing):
+    for obj in drawing.objects:
+        obj._draw()
+        obj._defs()
+
+
+def _peak_memory(generator, count):
+    tracemalloc.start()
+    try:
+        str(generator(count))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _add_apertures(count):
+    """
+    Frame with `count` apertures along top wall.
+    """
+    frame = RectFrame(0, 0, count * 20 + 20, 100, 5)
+    for index in range(count):
+        frame.add_aperture(index * 20 + 10, 0, 10)
+    return frame
+
+
+def run(plans, sizes, log=None):
+    results = {}
+
+    def record(key, value):
+        results[key] = value
+        if log is not None:
+            log.write("{:<32} {:>14.6g}\n".format(key, value))
+            log.flush()
+
+    for size in sizes:
+        repeat = max(MIN_REPEAT, min(MAX_REPEAT, REPEAT_FIGURES // size))
+        for name in plans:
+            generator = GENERATORS[name]
+            prefix = "{}/{}/".format(name, size)
+            record(prefix + "build", _best_time(generator, lambda: size, repeat))
+            record(prefix + "render", _best_time(str, lambda: generator(size), repeat))
+            if size <= MAX_DRAW_SIZE:
+                record(prefix + "draw", _best_time(_draw, lambda: generator(size), repeat))
+            record(prefix + "memory", _peak_memory(generator, size))
+        record("apertures/{}/build".format(size), _best_time(_add_apertures, lambda: size, repeat))
+    return results
+
+
+def check(results, baseline, tolerance, time_noise=TIME_NOISE):
+    """
+    List of regressions: (key, baseline value, current value) for values exceeding
+    baseline by more than tolerance (fraction of baseline value).
+    Timings are also allowed to exceed baseline by `time_noise` seconds.
+    """
+    regressions = []
+    for key, value in sorted(results.items()):
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        limit = expected * (1 + tolerance)
+        if not key.endswith("/memory"):
+            limit = max(limit, expected + time_noise)
+        if value > limit:
+            regressions.append((key, expected, value))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks of planner")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="counts of figures in plans")
+    parser.add_argument("--large", action="store_true",
+                        help="also run plans of {} figures".format(LARGE_SIZE))
+    parser.add_argument("--plans", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--save", metavar="PATH", help="save results as baseline")
+    parser.add_argument("--check", metavar="PATH", help="compare results with baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown relative to baseline (default: 0.5)")
+    options = parser.parse_args(args)
+    sizes = list(options.sizes)
+    if options.large and LARGE_SIZE not in sizes:
+        sizes.append(LARGE_SIZE)
+    results = run(options.plans, sizes, sys.stdout)
+    if options.save:
+        with open(options.save, "w") as fileobj:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "results": results}, fileobj, indent=2, sort_keys=True)
+            fileobj.write("\n")
+    if options.check:
+        with open(options.check) as fileobj:
+            baseline = json.load(fileobj)["results"]
+        regressions = check(results, baseline, options.tolerance)
+        for key, expected, value in regressions:
+            sys.stdout.write("REGRESSION {}: {:.6g} -> {:.6g} (+{:.0%})\n".format(
+                key, expected, value, value / expected - 1))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Generators of synthetic plans.
+Every generator creates drawing with specified count of top-level figures,
+figures are placed on a grid, so plans are the same on every run.
+"""
+from planner.drawing import Drawing
+from planner.frame import RectFrame, Rect
+from planner.frame.dimension import (LinearDimension, ExtensionableLinearDimension, TinyExtensionableLinearDimension,
+                                     AngleDimension)
+import math
+
+FRAME_WIDTH = 200
+FRAME_HEIGHT = 150
+WALL_WIDTH = 5
+# distance between figures on grid
+STEP = 250
+
+
+def _grid(count):
+    """
+    Generate left-top corners of grid cells for count figures.
+    """
+    columns = int(math.ceil(math.sqrt(count)))
+    for index in range(count):
+        row, column = divmod(index, columns)
+        yield column * STEP, row * STEP
+
+
+def _drawing(count):
+    columns = int(math.ceil(math.sqrt(count)))
+    return Drawing((columns * STEP, columns * STEP))
+
+
+def frames_plan(count):
+    """
+    Frames with aperture on every wall and two crossing bulkheads.
+    """
+    drawing = _drawing(count)
+    for x, y in _grid(count):
+        frame = RectFrame(x, y, FRAME_WIDTH, FRAME_HEIGHT, WALL_WIDTH, **{"stroke-width": "1"})
+        frame.add_aperture(x + 20, y, 30)
+        frame.add_aperture(x, y + 20, 20)
+        frame.add_aperture(x + FRAME_WIDTH - WALL_WIDTH, y + 60, 20)
+        frame.add_aperture(x + 60, y + FRAME_HEIGHT - WALL_WIDTH, 30)
+        frame.add_bulkhead(x + WALL_WIDTH, y + 50, 5)
+        frame.add_bulkhead(x + 100, y + WALL_WIDTH, 5)
+        drawing.add(frame)
+    return drawing
+
+
+def dimensions_plan(count):
+    """
+    Dense dimensions of all kinds.
+    """
+    drawing = _drawing(count)
+    for index, (x, y) in enumerate(_grid(count)):
+        kind = index % 4
+        if kind == 0:
+            dimension = LinearDimension((x, y), (x + FRAME_WIDTH, y), str(FRAME_WIDTH))
+        elif kind == 1:
+            dimension = ExtensionableLinearDimension((x, y), (x, y + FRAME_HEIGHT), str(FRAME_HEIGHT), direction=-1)
+        elif kind == 2:
+            dimension = TinyExtensionableLinearDimension((x, y), (x + 10, y), "10", extension_size=22)
+        else:
+            dimension = AngleDimension((x, y), (x + 40, y), "30")
+        drawing.add(dimension)
+    return drawing
+
+
+def hatching_plan(count):
+    """
+    Hatched frames and rects with a few distinct patterns and fillings.
+    """
+    drawing = _drawing(count)
+    for index, (x, y) in enumerate(_grid(count)):
+        if index % 2:
+            figure = RectFrame(x, y, FRAME_WIDTH, FRAME_HEIGHT, 20)
+        else:
+            figure = Rect(x, y, FRAME_WIDTH, FRAME_HEIGHT)
+        if index % 5 == 4:
+            figure.add_filling("#ccc")
+        else:
+            figure.add_hatching(angle=30 + 15 * (index % 4), distance=3, width=0.3, color="#999")
+        drawing.add(figure)
+    return drawing
+
+
+GENERATORS = {
+    "frames": frames_plan,
+    "dimensions": dimensions_plan,
+    "hatching": hatching_plan}
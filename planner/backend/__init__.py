@@ -0,0 +1,24 @@
+"""
+Rendering backends.
+Figures describe themselves with primitives, backends serialize primitives to SVG.
+"""
+from planner.backend.base import Backend  # noqa
+from planner.backend.string_backend import StringBackend  # noqa
+from planner.backend.svgwrite_backend import SvgwriteBackend  # noqa
+from planner.backend.raster import RasterBackend  # noqa
+
+BACKENDS = {
+    "string": StringBackend,
+    "svgwrite": SvgwriteBackend}
+
+
+def get_backend(backend, **options):
+    """
+    Get backend instance by name ("string", "svgwrite") created with specified options
+    (see `Backend.__init__`) or return backend instance as is.
+    """
+    if isinstance(backend, Backend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError("Unknown backend {}".format(backend))
+    return BACKENDS[backend](**options)
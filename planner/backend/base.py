@@ -0,0 +1,106 @@
+from planner.backend.formatting import number_formatter
+from planner.tools import to_base36
+
+# Presentation attributes moved to CSS classes in style classes mode
+STYLE_PROPERTIES = frozenset((
+    'fill', 'fill-opacity', 'fill-rule', 'opacity', 'stroke', 'stroke-width', 'stroke-opacity',
+    'stroke-linecap', 'stroke-linejoin', 'stroke-dasharray', 'font-family', 'font-size', 'font-weight',
+    'font-style', 'text-anchor'))
+
+
+class StyleRule(str):
+
+    """
+    CSS rule of style class (defs item of style classes mode),
+    all rules of document are joined into one `<style>` element (see `style_element`).
+    """
+
+    __slots__ = ()
+
+
+def style_element(rules):
+    return '<style>{}</style>'.format(''.join(rules))
+
+
+class Backend(object):
+
+    """
+    Abstract rendering backend.
+    Serializes primitives (see `planner.backend.primitives`) to SVG.
+    """
+
+    def __init__(self, style_classes=False, precision=None, class_prefix='s'):
+        """
+        style_classes - replace presentation attributes (stroke, fill, font-family, etc)
+            of elements with CSS classes, every distinct combination of attributes
+            is defined once (see `pop_defs`)
+        precision - round numbers to specified step (e.g. 0.01) in output,
+            numbers are written as is by default
+        class_prefix - prefix of names of CSS classes, should be unique for documents
+            inlined in one HTML page
+        """
+        self.style_classes = style_classes
+        self.precision = precision
+        self.class_prefix = class_prefix
+        self.format_number = number_formatter(precision)
+        # declarations -> (class name, CSS rule)
+        self._classes = {}
+        # defs required by primitives serialized since last `pop_defs` call
+        self._pending_defs = {}
+
+    def header(self, size, viewbox, unit='mm'):
+        """
+        Opening tag of SVG document.
+        size - sizes of document (width, height) in `unit` units
+        viewbox - visible area in user units (x, y, width, height)
+        """
+        raise NotImplementedError("Header rendering is not yet implemented")
+
+    def serialize(self, primitive):
+        """
+        Serialize single primitive (with nested primitives) to SVG string.
+        """
+        raise NotImplementedError("Serialization is not yet implemented")
+
+    def footer(self):
+        """
+        Closing tag of SVG document.
+        """
+        return '</svg>'
+
+    def pop_defs(self):
+        """
+        Defs items required by primitives serialized since previous call (CSS rules of classes, see `StyleRule`),
+        returns list of pairs (id, item).
+        """
+        if not self._pending_defs:
+            return []
+        defs = list(self._pending_defs.items())
+        self._pending_defs = {}
+        return defs
+
+    def _apply_style_class(self, attribs):
+        """
+        Move presentation attributes to CSS class (attribs dict is changed in place).
+        """
+        declarations = []
+        for key in sorted(attribs):
+            if key in STYLE_PROPERTIES:
+                value = attribs.pop(key)
+                if value is not None:
+                    if isinstance(value, (int, float)):
+                        value = self.format_number(value)
+                    declarations.append('{}:{}'.format(key, value))
+        if not declarations:
+            return
+        declarations = ';'.join(declarations)
+        style_class = self._classes.get(declarations)
+        if style_class is None:
+            class_name = self.class_prefix + to_base36(len(self._classes))
+            style_class = self._classes[declarations] = (
+                class_name, StyleRule('.{}{{{}}}'.format(class_name, declarations)))
+        class_name, rule = style_class
+        self._pending_defs[class_name] = rule
+        if attribs.get('class'):
+            class_name = '{} {}'.format(attribs['class'], class_name)
+        attribs['class'] = class_name
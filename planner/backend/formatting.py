@@ -0,0 +1,70 @@
+"""
+Formatting of numbers in output.
+"""
+from decimal import Decimal
+import numpy as np
+
+
+def _get_decimals(precision):
+    """
+    Count of decimal digits required to write multiples of precision (0.01 -> 2, 0.5 -> 1, 10 -> 0).
+    """
+    return max(0, -Decimal(repr(precision)).normalize().as_tuple().exponent)
+
+
+def _is_power_of_ten(precision, decimals):
+    return Decimal(repr(precision)) == Decimal(1).scaleb(-decimals)
+
+
+def number_formatter(precision=None):
+    """
+    Create function converting numbers to strings.
+    precision - step of rounding in user units (e.g. 0.01),
+        without precision numbers are written as is (`str`).
+    Trailing zeros are omitted: 1.50 -> "1.5", 2.00 -> "2".
+    Formatter has `precision` attribute (except formatter without precision).
+    """
+    if precision is None:
+        return str
+    if precision <= 0:
+        raise ValueError("Precision should be positive number")
+    decimals = _get_decimals(precision)
+    template = '%.{}f'.format(decimals)
+    rounding_required = not _is_power_of_ten(precision, decimals)
+
+    def format_number(value):
+        if rounding_required:
+            value = round(value / precision) * precision
+        elif decimals and type(value) is int:
+            return str(value)
+        string = template % value
+        if decimals:
+            string = string.rstrip('0').rstrip('.')
+        return '0' if string == '-0' else string
+
+    format_number.precision = precision
+    return format_number
+
+
+def prepare_array(values, precision=None):
+    """
+    Prepare array of numbers for vectorized formatting with %-templates.
+    Returns tuple (numbers, specifier): list of rounded numbers and conversion specifier
+    (e.g. "%.5g") writing them like `number_formatter(precision)` does.
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    if precision is None:
+        return values.tolist(), '%s'
+    decimals = _get_decimals(precision)
+    if _is_power_of_ten(precision, decimals):
+        rounded = np.round(values, decimals)
+    else:
+        rounded = np.round(values / precision) * precision
+    # get rid of negative zeros
+    rounded += 0.0
+    if decimals > 4 or not len(rounded):
+        # "%g" switches to exponential notation for small numbers
+        format_number = number_formatter(precision)
+        return [format_number(value) for value in rounded.tolist()], '%s'
+    integer_digits = len(str(int(np.abs(rounded).max())))
+    return rounded.tolist(), '%.{}g'.format(integer_digits + decimals)
@@ -0,0 +1,303 @@
+"""
+Rendering primitives.
+Lightweight descriptions of SVG elements produced by figures.
+Primitives don't validate or serialize anything, it's a job of backends.
+Constructors follow signatures of corresponding `svgwrite` classes.
+"""
+from planner.backend.formatting import prepare_array
+from planner.geometry import union_bboxes, points_bbox
+from planner.tools import parse_measure_units
+import numbers
+import numpy as np
+
+
+def _normalize_attribs(attribs):
+    """
+    Convert keyword arguments to SVG attributes names the same way as svgwrite does:
+    trailing '_' is removed ('class_' -> 'class'), inner '_' is replaced by '-'
+    ('stroke_width' -> 'stroke-width').
+    """
+    for key in attribs:
+        if '_' in key:
+            return dict((key.rstrip('_').replace('_', '-'), value) for key, value in attribs.items())
+    return attribs
+
+
+def iter_primitives(drawed):
+    """
+    Iterate over primitives returned by figure (single primitive, list of primitives or nothing).
+    """
+    if not drawed:
+        return
+    if isinstance(drawed, (list, tuple)):
+        for primitive in drawed:
+            yield primitive
+    else:
+        yield drawed
+
+
+def get_bbox(drawed):
+    """
+    Bounding box (x0, y0, x1, y1) of primitives returned by figure or None if they have no geometry.
+    """
+    return union_bboxes(primitive.bbox() for primitive in iter_primitives(drawed))
+
+
+class Value(object):
+
+    """
+    Abstract structured attribute value with numbers formatted by backend.
+    """
+
+    __slots__ = ()
+
+    def format(self, format_number=str):
+        raise NotImplementedError("Formatting is not yet implemented")
+
+    def __str__(self):
+        return self.format()
+
+
+class Rotation(Value):
+
+    """
+    Value of `transform` attribute: rotation by angle (in degrees) around point (cx, cy).
+    """
+
+    __slots__ = ('angle', 'cx', 'cy')
+
+    def __init__(self, angle, cx, cy):
+        self.angle = angle
+        self.cx = cx
+        self.cy = cy
+
+    def format(self, format_number=str):
+        return "rotate({}, {}, {})".format(format_number(self.angle), format_number(self.cx), format_number(self.cy))
+
+
+class PathData(Value):
+
+    """
+    Path commands for many subpaths (polylines or polygons) stored in arrays:
+    points - array of points with shape (n, 2)
+    offsets - indexes of first point of every subpath and total count of points
+    closed - close every subpath ("Z" command)
+    Numbers are formatted at once with vectorized operations.
+    """
+
+    __slots__ = ('points', 'offsets', 'closed')
+
+    def __init__(self, points, offsets, closed=False):
+        self.points = points
+        self.offsets = offsets
+        self.closed = closed
+
+    def _get_subpath_template(self, size):
+        template = 'M %s %s'
+        if size > 1:
+            template += ' L' + ' %s %s' * (size - 1)
+        if self.closed:
+            template += ' Z'
+        return template
+
+    def _get_template(self):
+        sizes = np.diff(self.offsets)
+        if not len(sizes):
+            return ''
+        if (sizes == sizes[0]).all():
+            # all subpaths have the same size (e.g. segments)
+            template = self._get_subpath_template(int(sizes[0]))
+            return ' '.join([template] * len(sizes))
+        templates = {}
+        for size in sizes.tolist():
+            if size not in templates:
+                templates[size] = self._get_subpath_template(size)
+        return ' '.join(templates[size] for size in sizes.tolist())
+
+    def format(self, format_number=str):
+        numbers, specifier = prepare_array(self.points, getattr(format_number, 'precision', None))
+        template = self._get_template()
+        if specifier != '%s':
+            template = template.replace('%s', specifier)
+        return template % tuple(numbers)
+
+
+class Primitive(object):
+
+    """
+    Abstract rendering primitive.
+    `role` marks details which can be dropped in simplified renders (e.g. "arrow").
+    """
+
+    __slots__ = ('attribs', 'role')
+
+    elementname = None
+
+    def __init__(self, **extra):
+        self.attribs = _normalize_attribs(extra)
+        self.role = None
+
+    def bbox(self):
+        """
+        Bounding box (x0, y0, x1, y1) of element geometry (without stroke) or None.
+        """
+        return None
+
+
+class Container(Primitive):
+
+    """ Abstract primitive with nested primitives """
+
+    __slots__ = ('elements',)
+
+    def __init__(self, **extra):
+        super(Container, self).__init__(**extra)
+        self.elements = []
+
+    def add(self, element):
+        self.elements.append(element)
+        return element
+
+
+class Rect(Primitive):
+
+    __slots__ = ('insert', 'size', 'rx', 'ry')
+
+    elementname = 'rect'
+
+    def __init__(self, insert=(0, 0), size=(1, 1), rx=None, ry=None, **extra):
+        super(Rect, self).__init__(**extra)
+        self.insert = insert
+        self.size = size
+        self.rx = rx
+        self.ry = ry
+
+    def bbox(self):
+        return points_bbox([self.insert, (self.insert[0] + self.size[0], self.insert[1] + self.size[1])])
+
+
+class Line(Primitive):
+
+    __slots__ = ('start', 'end')
+
+    elementname = 'line'
+
+    def __init__(self, start=(0, 0), end=(0, 0), **extra):
+        super(Line, self).__init__(**extra)
+        self.start = start
+        self.end = end
+
+    def bbox(self):
+        return points_bbox([self.start, self.end])
+
+
+class Polygon(Primitive):
+
+    __slots__ = ('points',)
+
+    elementname = 'polygon'
+
+    def __init__(self, points=(), **extra):
+        super(Polygon, self).__init__(**extra)
+        self.points = list(points)
+
+    def bbox(self):
+        return points_bbox(self.points)
+
+
+class Text(Primitive):
+
+    __slots__ = ('text', 'insert')
+
+    elementname = 'text'
+
+    DEFAULT_FONT_SIZE = 16
+    # average width of character relative to font size (rough estimation for bounding boxes)
+    CHAR_WIDTH = 0.6
+
+    def __init__(self, text, insert=None, **extra):
+        super(Text, self).__init__(**extra)
+        self.text = text
+        self.insert = insert
+
+    def bbox(self):
+        """
+        Estimated with font size and length of text, large enough for any anchor and rotation.
+        """
+        if self.insert is None:
+            return None
+        font_size, unit = parse_measure_units(str(self.attribs.get('font-size', self.DEFAULT_FONT_SIZE)))
+        radius = font_size * max(len(str(self.text)), 1) * self.CHAR_WIDTH
+        return (self.insert[0] - radius, self.insert[1] - radius, self.insert[0] + radius, self.insert[1] + radius)
+
+
+class Path(Primitive):
+
+    __slots__ = ('commands',)
+
+    elementname = 'path'
+
+    def __init__(self, d=None, **extra):
+        super(Path, self).__init__(**extra)
+        self.commands = []
+        if d is not None:
+            self.push(d)
+
+    def push(self, *elements):
+        """ Push commands and coordinates onto the command stack """
+        self.commands.extend(elements)
+
+    def bbox(self):
+        """
+        Bounding box of points of path (arcs are bounded by their end points).
+        """
+        bboxes = []
+        points = []
+        stack = list(self.commands)
+        while stack:
+            command = stack.pop()
+            if isinstance(command, PathData):
+                bboxes.append(points_bbox(command.points))
+            elif isinstance(command, (list, tuple)):
+                if len(command) == 2 and all(isinstance(item, numbers.Number) for item in command):
+                    points.append(command)
+                else:
+                    stack.extend(command)
+        bboxes.append(points_bbox(points))
+        return union_bboxes(bboxes)
+
+    def push_arc(self, target, rotation, r, large_arc=True, angle_dir='+', absolute=False):
+        """ Push elliptical-arc command (same as `svgwrite.path.Path.push_arc`) """
+        self.push('A' if absolute else 'a')
+        if isinstance(r, (float, int)):
+            self.push(r, r)
+        else:
+            self.push(r)
+        self.push(rotation)
+        self.push("%d,%d" % (int(large_arc), 1 if angle_dir == '+' else 0))
+        self.push(target)
+
+
+class Pattern(Container):
+
+    __slots__ = ('insert', 'size')
+
+    elementname = 'pattern'
+
+    def __init__(self, insert=None, size=None, **extra):
+        super(Pattern, self).__init__(**extra)
+        self.insert = insert
+        self.size = size
+
+
+class Marker(Container):
+
+    __slots__ = ('insert', 'size', 'orient')
+
+    elementname = 'marker'
+
+    def __init__(self, insert=None, size=None, orient=None, **extra):
+        super(Marker, self).__init__(**extra)
+        self.insert = insert
+        self.size = size
+        self.orient = orient
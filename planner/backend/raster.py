@@ -0,0 +1,408 @@
+"""
+Raster backend: draws primitives straight into NumPy image and encodes PNG.
+Supports geometry produced by figures of this package: rects, lines, polygons,
+paths of lines (arcs are approximated with chords) and pattern fills (hatching).
+Texts are not drawn.
+"""
+from planner.backend import primitives
+from planner.tools import parse_measure_units
+import numpy as np
+import struct
+import math
+import zlib
+
+COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0), "green": (0, 128, 0),
+    "blue": (0, 0, 255), "gray": (128, 128, 128), "grey": (128, 128, 128), "yellow": (255, 255, 0)}
+
+# default presentation attributes of SVG
+DEFAULT_FILL = "#000"
+DEFAULT_STROKE = "none"
+DEFAULT_STROKE_WIDTH = 1
+
+
+def parse_color(value):
+    """
+    Convert SVG color ("#rgb", "#rrggbb", "rgb(r, g, b)" or basic color name) to RGB tuple,
+    returns None for "none" and unknown colors are black.
+    """
+    value = str(value).strip().lower()
+    if value in ('none', 'transparent'):
+        return None
+    if value.startswith('#'):
+        digits = value[1:]
+        if len(digits) == 3:
+            digits = ''.join(digit * 2 for digit in digits)
+        try:
+            return tuple(int(digits[index:index + 2], 16) for index in (0, 2, 4))
+        except ValueError:
+            return (0, 0, 0)
+    if value.startswith('rgb(') and value.endswith(')'):
+        return tuple(int(float(part)) for part in value[4:-1].split(','))[:3]
+    return COLORS.get(value, (0, 0, 0))
+
+
+def encode_png(image):
+    """
+    Encode RGB image (array of uint8 with shape (height, width, 3)) to PNG.
+    """
+    height, width = image.shape[:2]
+    # every scanline starts with filter type byte (0 - no filter)
+    scanlines = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(chunk_type, data):
+        return (struct.pack('>I', len(data)) + chunk_type + data +
+                struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+    return b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)),
+        chunk(b'IDAT', zlib.compress(scanlines.tobytes(), 6)),
+        chunk(b'IEND', b'')))
+
+
+class _Canvas(object):
+
+    """
+    RGB image with mapping of user units to pixels.
+    Tiles of patterns are rendered once and kept in `tiles` by pattern id and scale.
+    """
+
+    __slots__ = ('image', 'scale', 'origin', 'tiles')
+
+    def __init__(self, width, height, scale, origin, background):
+        self.image = np.empty((height, width, 3), dtype=np.float32)
+        self.image[:] = background
+        self.scale = scale
+        self.origin = origin
+        self.tiles = {}
+
+    def to_pixels(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        return (points - self.origin) * self.scale
+
+    def _region(self, x0, y0, x1, y1):
+        """
+        Pixels with centers in rectangle (at least one pixel for non-empty rectangle) clipped by image.
+        """
+        height, width = self.image.shape[:2]
+        columns = [int(math.ceil(x0 - 0.5)), int(math.ceil(x1 - 0.5))]
+        rows = [int(math.ceil(y0 - 0.5)), int(math.ceil(y1 - 0.5))]
+        # thin shapes are at least one pixel wide
+        for bounds in (columns, rows):
+            if bounds[1] <= bounds[0]:
+                bounds[1] = bounds[0] + 1
+        return (slice(max(rows[0], 0), min(rows[1], height)), slice(max(columns[0], 0), min(columns[1], width)))
+
+    def _centers(self, region):
+        rows, columns = region
+        ys = np.arange(rows.start, rows.stop, dtype=float) + 0.5
+        xs = np.arange(columns.start, columns.stop, dtype=float) + 0.5
+        return xs[np.newaxis, :], ys[:, np.newaxis]
+
+    def paint(self, region, paint, opacity, mask=None):
+        """
+        Paint region (pair of slices) with paint (RGB tuple or function returning colors of pixels).
+        """
+        rows, columns = region
+        if rows.start >= rows.stop or columns.start >= columns.stop:
+            return
+        if callable(paint):
+            xs, ys = self._centers(region)
+            color = paint(xs, ys)
+        else:
+            color = np.asarray(paint, dtype=np.float32)
+        target = self.image[region]
+        if mask is None:
+            if opacity >= 1:
+                target[:] = color
+            else:
+                target[:] = target * (1 - opacity) + color * opacity
+        elif opacity >= 1:
+            target[mask] = color[mask] if callable(paint) else color
+        else:
+            color = color[mask] if callable(paint) else color
+            target[mask] = target[mask] * (1 - opacity) + color * opacity
+
+    def fill_rect(self, x0, y0, x1, y1, paint, opacity=1):
+        self.paint(self._region(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)), paint, opacity)
+
+    def fill_polygon(self, points, paint, opacity=1):
+        """
+        Fill polygon (array of points in pixels) with even-odd rule.
+        """
+        if len(points) < 3:
+            return
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        region = self._region(x0, y0, x1, y1)
+        if region[0].start >= region[0].stop or region[1].start >= region[1].stop:
+            return
+        xs, ys = self._centers(region)
+        inside = np.zeros((len(ys), xs.shape[1]), dtype=bool)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for (ax, ay), (bx, by) in zip(points, np.roll(points, -1, axis=0)):
+                if ay == by:
+                    continue
+                crossing = (ay > ys) != (by > ys)
+                x_intersection = ax + (ys - ay) * (bx - ax) / (by - ay)
+                inside ^= crossing & (xs < x_intersection)
+        self.paint(region, paint, opacity, inside)
+
+    def stroke_line(self, start, end, width, paint, opacity=1):
+        """
+        Draw segment between points in pixels.
+        """
+        (ax, ay), (bx, by) = start, end
+        half = max(width, 1) / 2.0
+        if ax == bx or ay == by:
+            self.fill_rect(min(ax, bx) - half, min(ay, by) - half, max(ax, bx) + half, max(ay, by) + half,
+                           paint, opacity)
+            return
+        region = self._region(min(ax, bx) - half, min(ay, by) - half, max(ax, bx) + half, max(ay, by) + half)
+        if region[0].start >= region[0].stop or region[1].start >= region[1].stop:
+            return
+        xs, ys = self._centers(region)
+        dx, dy = bx - ax, by - ay
+        t = np.clip(((xs - ax) * dx + (ys - ay) * dy) / (dx * dx + dy * dy), 0, 1)
+        distance = np.hypot(xs - ax - t * dx, ys - ay - t * dy)
+        self.paint(region, paint, opacity, distance <= half)
+
+    def to_uint8(self):
+        return np.clip(np.rint(self.image), 0, 255).astype(np.uint8)
+
+
+class RasterBackend(object):
+
+    """
+    Rasterizer of drawings to RGB images (NumPy arrays) and PNG.
+    """
+
+    PAINTERS = {
+        'rect': '_paint_rect',
+        'line': '_paint_line',
+        'polygon': '_paint_polygon',
+        'path': '_paint_path'}
+
+    def __init__(self, width=256, height=None, background="#fff", supersampling=1):
+        """
+        width, height - size of image in pixels, height is calculated from proportions of plan by default
+        background - color of background
+        supersampling - render in larger image and downscale it (antialiasing), e.g. 2 or 4
+        """
+        self.width = width
+        self.height = height
+        self.background = parse_color(background)
+        self.supersampling = supersampling
+
+    def render(self, drawing, viewport=None):
+        """
+        Draw drawing to RGB image, returns array of uint8 with shape (height, width, 3).
+        viewport - part of plan (x, y, width, height), whole plan by default
+        """
+        if viewport is None:
+            viewport = drawing.layout().viewbox
+        x, y, width, height = viewport
+        scale = float(self.width) / width
+        image_height = self.height or max(int(round(height * scale)), 1)
+        factor = self.supersampling
+        canvas = _Canvas(self.width * factor, image_height * factor, scale * factor, (x, y), self.background)
+        patterns = {}
+        visible = (x, y, x + width, y + height)
+        for obj in drawing.objects:
+            # objects drawn in sheet units (title blocks of drawing with automatic size)
+            transform = drawing._sheet_transform(obj)
+            bbox = obj.bbox
+            if transform is not None:
+                sheet_x, sheet_y, sheet_scale = transform
+                canvas.scale = scale * factor * sheet_scale
+                canvas.origin = ((x - sheet_x) / float(sheet_scale), (y - sheet_y) / float(sheet_scale))
+            elif bbox is not None and not (bbox[0] <= visible[2] and visible[0] <= bbox[2] and
+                                           bbox[1] <= visible[3] and visible[1] <= bbox[3]):
+                continue
+            for item in primitives.iter_primitives(obj._defs_primitives()):
+                if isinstance(item, primitives.Pattern) and item.attribs.get('id') not in patterns:
+                    patterns[item.attribs.get('id')] = item
+            for primitive in primitives.iter_primitives(obj._primitives()):
+                self.draw(canvas, primitive, patterns)
+            if transform is not None:
+                canvas.scale = scale * factor
+                canvas.origin = (x, y)
+        image = canvas.image
+        if factor > 1:
+            image = image.reshape(image_height, factor, self.width, factor, 3).mean(axis=(1, 3))
+            canvas.image = image
+        return canvas.to_uint8()
+
+    def render_png(self, drawing, viewport=None):
+        """
+        Draw drawing and encode it to PNG, returns bytes.
+        """
+        return encode_png(self.render(drawing, viewport))
+
+    def write(self, drawing, fileobj, viewport=None):
+        """
+        Write PNG image of drawing to binary file-like object.
+        """
+        fileobj.write(self.render_png(drawing, viewport))
+
+    def draw(self, canvas, primitive, patterns):
+        """
+        Draw primitive on canvas, patterns - dict {id: pattern primitive} for pattern fills.
+        """
+        painter = self.PAINTERS.get(primitive.elementname)
+        if painter is not None:
+            getattr(self, painter)(canvas, primitive, self._get_style(primitive.attribs), patterns)
+
+    @staticmethod
+    def _get_style(attribs):
+        """
+        Presentation attributes of element overridden with declarations of `style` attribute.
+        """
+        style = dict(attribs)
+        for declaration in str(attribs.get('style') or '').split(';'):
+            if ':' in declaration:
+                key, value = declaration.split(':', 1)
+                style[key.strip()] = value.strip()
+        return style
+
+    @staticmethod
+    def _get_number(value, default):
+        if value is None:
+            return default
+        if isinstance(value, (int, float)):
+            return value
+        return parse_measure_units(str(value).strip())[0]
+
+    def _get_paint(self, canvas, style, key, default, patterns):
+        """
+        Paint (RGB tuple or function of pixels) and opacity of fill or stroke, None if it's not painted.
+        """
+        value = style.get(key, default)
+        opacity = float(self._get_number(style.get(key + '-opacity'), 1)) * \
+            float(self._get_number(style.get('opacity'), 1))
+        if value is None or opacity <= 0:
+            return None
+        value = str(value).strip()
+        if value.startswith('url(#'):
+            pattern = patterns.get(value[5:value.index(')')])
+            if pattern is None:
+                return None
+            return self._get_pattern_paint(canvas, pattern, patterns), opacity
+        color = parse_color(value)
+        if color is None:
+            return None
+        return color, opacity
+
+    def _get_pattern_paint(self, canvas, pattern, patterns):
+        """
+        Paint tiling region with pattern tile rendered once per canvas.
+        """
+        x, y = pattern.insert or (0, 0)
+        width, height = pattern.size
+        scale = canvas.scale
+        # scale of canvas is changed for objects drawn in sheet units
+        key = (pattern.attribs.get('id'), scale)
+        tile = canvas.tiles.get(key)
+        if tile is None:
+            # tile has at least 8 pixels on the shortest side
+            resolution = max(scale, 8.0 / min(width, height))
+            tile_width = max(int(round(width * resolution)), 1)
+            tile_height = max(int(round(height * resolution)), 1)
+            tile = _Canvas(tile_width, tile_height, (tile_width / float(width), tile_height / float(height)),
+                           (0, 0), (0, 0, 0))
+            # pattern without background is transparent, but white background is used for simplicity
+            tile.image[:] = 255
+            for element in pattern.elements:
+                self.draw(tile, element, patterns)
+            canvas.tiles[key] = tile
+        image = tile.image
+        tile_height, tile_width = image.shape[:2]
+        origin_x, origin_y = canvas.origin
+
+        def paint(xs, ys):
+            # user coordinates of pixels to tile pixels
+            columns = (np.mod(xs / scale + origin_x - x, width) * tile.scale[0]).astype(int) % tile_width
+            rows = (np.mod(ys / scale + origin_y - y, height) * tile.scale[1]).astype(int) % tile_height
+            return image[rows, columns]
+
+        return paint
+
+    def _stroke_params(self, canvas, style, patterns):
+        stroke = self._get_paint(canvas, style, 'stroke', DEFAULT_STROKE, patterns)
+        width = self._get_number(style.get('stroke-width'), DEFAULT_STROKE_WIDTH)
+        scale = canvas.scale if not isinstance(canvas.scale, tuple) else min(canvas.scale)
+        return stroke, float(width) * scale
+
+    def _paint_rect(self, canvas, rect, style, patterns):
+        end = (rect.insert[0] + rect.size[0], rect.insert[1] + rect.size[1])
+        (x0, y0), (x1, y1) = canvas.to_pixels([rect.insert, end])
+        fill = self._get_paint(canvas, style, 'fill', DEFAULT_FILL, patterns)
+        if fill is not None:
+            canvas.fill_rect(x0, y0, x1, y1, *fill)
+        stroke, width = self._stroke_params(canvas, style, patterns)
+        if stroke is not None:
+            corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+            for start, end in zip(corners, corners[1:] + corners[:1]):
+                canvas.stroke_line(start, end, width, *stroke)
+
+    def _paint_line(self, canvas, line, style, patterns):
+        stroke, width = self._stroke_params(canvas, style, patterns)
+        if stroke is not None:
+            start, end = canvas.to_pixels([line.start, line.end])
+            canvas.stroke_line(start, end, width, *stroke)
+
+    def _paint_polygon(self, canvas, polygon, style, patterns):
+        self._paint_subpaths(canvas, [(canvas.to_pixels(polygon.points), True)], style, patterns)
+
+    def _paint_path(self, canvas, path, style, patterns):
+        self._paint_subpaths(canvas, self._get_subpaths(canvas, path.commands), style, patterns)
+
+    def _paint_subpaths(self, canvas, subpaths, style, patterns):
+        fill = self._get_paint(canvas, style, 'fill', DEFAULT_FILL, patterns)
+        if fill is not None:
+            for points, closed in subpaths:
+                canvas.fill_polygon(points, *fill)
+        stroke, width = self._stroke_params(canvas, style, patterns)
+        if stroke is not None:
+            for points, closed in subpaths:
+                if closed and len(points) > 2:
+                    points = np.vstack((points, points[:1]))
+                for start, end in zip(points[:-1], points[1:]):
+                    canvas.stroke_line(start, end, width, *stroke)
+
+    @staticmethod
+    def _flatten(commands):
+        for command in commands:
+            if isinstance(command, list) or (isinstance(command, tuple) and len(command) != 2):
+                for item in RasterBackend._flatten(command):
+                    yield item
+            else:
+                yield command
+
+    def _get_subpaths(self, canvas, commands):
+        """
+        Split path commands to subpaths: list of pairs (points in pixels, closed).
+        Supports absolute "M", "L", "A" (approximated with chord) and "Z" commands with points as tuples
+        and path data arrays.
+        """
+        subpaths = []
+        points = []
+        closed = False
+        for command in self._flatten(commands):
+            if isinstance(command, primitives.PathData):
+                offsets = command.offsets
+                pixels = canvas.to_pixels(command.points)
+                for start, end in zip(offsets[:-1], offsets[1:]):
+                    subpaths.append((pixels[start:end], command.closed))
+            elif isinstance(command, str):
+                command = command.strip().upper()
+                if command in ('M', 'Z') and points:
+                    subpaths.append((canvas.to_pixels(points), closed or command == 'Z'))
+                    points = []
+                closed = False
+            elif isinstance(command, tuple):
+                points.append(command)
+        if points:
+            subpaths.append((canvas.to_pixels(points), closed))
+        return subpaths
@@ -0,0 +1,137 @@
+"""
+Fast backend, serializes primitives directly to strings without any validation.
+Output is the same as output of svgwrite backend.
+"""
+from planner.backend.base import Backend
+from planner.backend.primitives import Primitive, Container, Value
+
+SVG_HEADER = (
+    '<svg baseProfile="full" height="{height}{unit}" version="1.1" viewBox="{viewbox}" width="{width}{unit}" '
+    'xmlns="http://www.w3.org/2000/svg" xmlns:ev="http://www.w3.org/2001/xml-events" '
+    'xmlns:xlink="http://www.w3.org/1999/xlink">')
+
+_ATTRIB_ESCAPES = (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'),
+                   ('\r', '&#13;'), ('\n', '&#10;'), ('\t', '&#09;'))
+_TEXT_ESCAPES = (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'))
+
+
+def _escape(value, escapes):
+    for char, replacement in escapes:
+        if char in value:
+            value = value.replace(char, replacement)
+    return value
+
+
+def _flatten(values):
+    for value in values:
+        if hasattr(value, '__iter__') and not isinstance(value, str):
+            for item in _flatten(value):
+                yield item
+        else:
+            yield value
+
+
+class StringBackend(Backend):
+
+    """
+    Validation-free backend writing SVG strings directly.
+    """
+
+    def __init__(self, style_classes=False, precision=None, class_prefix='s'):
+        super(StringBackend, self).__init__(style_classes, precision, class_prefix)
+        self._geometry_handlers = {
+            'rect': self._rect_geometry,
+            'line': self._line_geometry,
+            'polygon': self._polygon_geometry,
+            'text': self._text_geometry,
+            'path': self._path_geometry,
+            'pattern': self._pattern_geometry,
+            'marker': self._marker_geometry}
+
+    def header(self, size, viewbox, unit='mm'):
+        return SVG_HEADER.format(
+            width=self.format_number(size[0]), height=self.format_number(size[1]), unit=unit,
+            viewbox=' '.join(self.format_number(value) for value in viewbox))
+
+    def serialize(self, primitive):
+        if not isinstance(primitive, Primitive):
+            # Foreign elements (svgwrite objects) serialize themselves
+            return primitive.tostring()
+        attribs = primitive.attribs.copy()
+        if self.style_classes:
+            self._apply_style_class(attribs)
+        self._geometry_handlers[primitive.elementname](primitive, attribs)
+        parts = ['<', primitive.elementname]
+        for key in sorted(attribs):
+            value = attribs[key]
+            # skip empty attributes
+            if value is None:
+                continue
+            if isinstance(value, (int, float)):
+                value = self.format_number(value)
+            elif isinstance(value, Value):
+                value = value.format(self.format_number)
+            else:
+                value = _escape(str(value), _ATTRIB_ESCAPES)
+            if value:
+                parts.append(' {}="{}"'.format(key, value))
+        content = self._content(primitive)
+        if content:
+            parts.append('>')
+            parts.append(content)
+            parts.append('</{}>'.format(primitive.elementname))
+        else:
+            parts.append(' />')
+        return ''.join(parts)
+
+    def _content(self, primitive):
+        if isinstance(primitive, Container):
+            return ''.join(self.serialize(element) for element in primitive.elements)
+        if primitive.elementname == 'text':
+            return _escape(str(primitive.text), _TEXT_ESCAPES)
+        return None
+
+    def _join_numbers(self, values, separator=' '):
+        format_number = self.format_number
+        return separator.join(
+            value if isinstance(value, str) else
+            value.format(format_number) if isinstance(value, Value) else format_number(value)
+            for value in _flatten(values) if value is not None)
+
+    def _rect_geometry(self, rect, attribs):
+        attribs['x'], attribs['y'] = rect.insert
+        attribs['width'], attribs['height'] = rect.size
+        if rect.rx is not None:
+            attribs['rx'] = rect.rx
+        if rect.ry is not None:
+            attribs['ry'] = rect.ry
+
+    def _line_geometry(self, line, attribs):
+        attribs['x1'], attribs['y1'] = line.start
+        attribs['x2'], attribs['y2'] = line.end
+
+    def _polygon_geometry(self, polygon, attribs):
+        format_number = self.format_number
+        attribs['points'] = ' '.join(
+            '{},{}'.format(format_number(x), format_number(y)) for x, y in polygon.points)
+
+    def _text_geometry(self, text, attribs):
+        if text.insert is not None:
+            attribs['x'], attribs['y'] = text.insert
+
+    def _path_geometry(self, path, attribs):
+        attribs['d'] = self._join_numbers(path.commands)
+
+    def _pattern_geometry(self, pattern, attribs):
+        if pattern.insert is not None:
+            attribs['x'], attribs['y'] = pattern.insert
+        if pattern.size is not None:
+            attribs['width'], attribs['height'] = pattern.size
+
+    def _marker_geometry(self, marker, attribs):
+        if marker.insert is not None:
+            attribs['refX'], attribs['refY'] = marker.insert
+        if marker.size is not None:
+            attribs['markerWidth'], attribs['markerHeight'] = marker.size
+        if marker.orient is not None:
+            attribs['orient'] = marker.orient
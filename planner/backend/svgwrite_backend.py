@@ -0,0 +1,115 @@
+"""
+Strict backend, converts primitives to svgwrite objects.
+All attributes are validated by svgwrite, useful for debugging.
+"""
+from planner.backend.base import Backend
+from planner.backend import primitives
+from svgwrite import Drawing as SVGDrawing, shapes, text, path, pattern, container
+import copy
+
+
+class SvgwriteBackend(Backend):
+
+    """
+    Backend based on svgwrite with validation of every attribute.
+    """
+
+    def header(self, size, viewbox, unit='mm'):
+        draw = SVGDrawing(
+            size=(self.format_number(size[0]) + unit, self.format_number(size[1]) + unit), profile='full',
+            viewBox=' '.join(self.format_number(value) for value in viewbox))
+        # Serialize empty document and cut it before the first child
+        empty = draw.tostring()
+        return empty[:empty.index('<defs />')]
+
+    def serialize(self, primitive):
+        if self.style_classes or self.precision is not None:
+            primitive = self._prepare(primitive)
+        return self.convert(primitive).tostring()
+
+    def _format_values(self, value):
+        """
+        Format numbers (in nested sequences too) with backend precision.
+        """
+        if isinstance(value, (int, float)):
+            return self.format_number(value)
+        if isinstance(value, primitives.Value):
+            return value.format(self.format_number)
+        if isinstance(value, (list, tuple)):
+            return [self._format_values(item) for item in value]
+        return value
+
+    def _prepare(self, primitive):
+        """
+        Copy of primitive (with nested primitives) with presentation attributes moved to CSS classes
+        and numbers formatted with backend precision.
+        """
+        if not isinstance(primitive, primitives.Primitive):
+            return primitive
+        prepared = copy.copy(primitive)
+        prepared.attribs = primitive.attribs.copy()
+        if self.style_classes:
+            self._apply_style_class(prepared.attribs)
+        if self.precision is not None:
+            for key, value in prepared.attribs.items():
+                prepared.attribs[key] = self._format_values(value)
+            for cls in type(primitive).__mro__:
+                for name in getattr(cls, '__slots__', ()):
+                    if name not in ('attribs', 'elements', 'text'):
+                        setattr(prepared, name, self._format_values(getattr(primitive, name)))
+        if isinstance(primitive, primitives.Container):
+            prepared.elements = [self._prepare(element) for element in primitive.elements]
+        return prepared
+
+    @classmethod
+    def convert(cls, drawed):
+        """
+        Convert primitive (or list of primitives) to svgwrite object (or list of objects).
+        Foreign objects (already svgwrite objects) are returned as is.
+        """
+        if not drawed:
+            return drawed
+        if isinstance(drawed, (list, tuple)):
+            return [cls.convert(item) for item in drawed]
+        if not isinstance(drawed, primitives.Primitive):
+            return drawed
+        if any(isinstance(value, primitives.Value) for value in drawed.attribs.values()):
+            drawed = copy.copy(drawed)
+            drawed.attribs = dict((key, str(value) if isinstance(value, primitives.Value) else value)
+                                  for key, value in drawed.attribs.items())
+        converter = getattr(cls, '_convert_{}'.format(drawed.elementname))
+        svg_obj = converter(drawed)
+        if isinstance(drawed, primitives.Container):
+            for element in drawed.elements:
+                svg_obj.add(cls.convert(element))
+        return svg_obj
+
+    @staticmethod
+    def _convert_rect(rect):
+        return shapes.Rect(rect.insert, rect.size, rect.rx, rect.ry, **rect.attribs)
+
+    @staticmethod
+    def _convert_line(line):
+        return shapes.Line(line.start, line.end, **line.attribs)
+
+    @staticmethod
+    def _convert_polygon(polygon):
+        return shapes.Polygon(polygon.points, **polygon.attribs)
+
+    @staticmethod
+    def _convert_text(text_primitive):
+        return text.Text(text_primitive.text, text_primitive.insert, **text_primitive.attribs)
+
+    @staticmethod
+    def _convert_path(path_primitive):
+        svg_path = path.Path(**path_primitive.attribs)
+        svg_path.push(*path_primitive.commands)
+        return svg_path
+
+    @staticmethod
+    def _convert_pattern(pattern_primitive):
+        return pattern.Pattern(pattern_primitive.insert, pattern_primitive.size, **pattern_primitive.attribs)
+
+    @staticmethod
+    def _convert_marker(marker):
+        return container.Marker(marker.insert, marker.size, marker.orient, **marker.attribs)
@@ -0,0 +1,112 @@
+"""
+Batch rendering of many drawings in a process pool.
+"""
+from planner.backend.raster import RasterBackend
+from planner.serialization import dumps, loads
+from concurrent.futures import ProcessPoolExecutor
+from collections import namedtuple, deque
+from itertools import count
+import os
+import time
+
+RenderResult = namedtuple('RenderResult', ('path', 'seconds', 'size'))
+
+
+def _get_drawing(drawing):
+    """
+    Decode drawing sent to worker process in binary format.
+    """
+    if isinstance(drawing, bytes):
+        return loads(drawing)
+    return drawing
+
+
+def _pack(task):
+    """
+    Replace drawing of task with its binary description (without rendering caches and indexes).
+    """
+    return (dumps(task[0]),) + task[1:]
+
+
+def _render_file(task):
+    """
+    Render drawing to file (executed in worker process).
+    """
+    drawing, path = task
+    started = time.perf_counter()
+    drawing = _get_drawing(drawing)
+    size = 0
+    with open(path, 'wb') as output:
+        for chunk in drawing.iter_svg(cache=False):
+            data = chunk.encode('utf-8')
+            output.write(data)
+            size += len(data)
+    return RenderResult(path, time.perf_counter() - started, size)
+
+
+def _render_png_file(task):
+    """
+    Render PNG image of drawing to file (executed in worker process).
+    """
+    drawing, path, backend = task
+    started = time.perf_counter()
+    drawing = _get_drawing(drawing)
+    with open(path, 'wb') as output:
+        backend.write(drawing, output)
+        size = output.tell()
+    return RenderResult(path, time.perf_counter() - started, size)
+
+
+def _run(function, tasks, workers):
+    """
+    Run function for every task, keep at most two pending tasks per worker
+    so drawings are serialized only when workers are ready to take them.
+    """
+    if workers == 1:
+        return [function(task) for task in tasks]
+    workers = workers or os.cpu_count() or 1
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= 2 * workers:
+                results.append(pending.popleft().result())
+            pending.append(executor.submit(function, _pack(task)))
+        while pending:
+            results.append(pending.popleft().result())
+    return results
+
+
+def render_many(drawings, out_dir, workers=None, names=None):
+    """
+    Render drawings to SVG files in a process pool.
+     -  drawings - iterable with drawings
+     -  out_dir - directory for SVG files (created if not exists)
+     -  workers - number of worker processes (number of CPUs by default),
+        with `workers=1` drawings are rendered in current process
+     -  names - iterable with file names, "drawing-<index>.svg" by default
+    Workers receive drawings in binary format of `planner.serialization`
+    and write results straight to disk (UTF-8).
+    Returns list of `RenderResult(path, seconds, size)` in order of drawings,
+    size is number of written bytes.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if names is None:
+        names = ('drawing-{}.svg'.format(index) for index in count(1))
+    tasks = ((drawing, os.path.join(out_dir, name)) for drawing, name in zip(drawings, names))
+    return _run(_render_file, tasks, workers)
+
+
+def render_many_png(drawings, out_dir, width=256, workers=None, names=None, **options):
+    """
+    Render PNG thumbnails of drawings with raster backend in a process pool
+    (see `render_many` for arguments, names are "drawing-<index>.png" by default).
+     -  width - width of images in pixels
+     -  options - other options of `planner.backend.raster.RasterBackend`
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if names is None:
+        names = ('drawing-{}.png'.format(index) for index in count(1))
+    backend = RasterBackend(width, **options)
+    tasks = ((drawing, os.path.join(out_dir, name), backend) for drawing, name in zip(drawings, names))
+    return _run(_render_png_file, tasks, workers)
@@ -2,7 +2,22 @@
 Structural object.
 Container of all plan objects.
 """
-from svgwrite import Drawing as SVGDrawing, mm
+from planner.backend import get_backend
+from planner.backend.base import StyleRule, style_element
+from planner.backend.primitives import iter_primitives
+from planner.frame.title import SampleTitle
+from planner.geometry import union_bboxes
+from planner.index import GridIndex
+from planner.tiles import render_tiles
+from planner.lod import LevelOfDetail
+from planner.tools import IdAllocator
+from collections import namedtuple
+import time
+
+
+# sheet of drawing: size (width, height) in mm, denominator of scale (1:scale)
+# and visible area of plan in user units (x, y, width, height)
+SheetLayout = namedtuple('SheetLayout', ('size', 'scale', 'viewbox'))
 
 
 class Drawing(object):
@@ -22,41 +37,502 @@ class Drawing(object):
         "A9": (52, 37),
         "A10": (37, 26)}
 
-    def __init__(self, size="A3"):
+    # denominators of standard scales (ISO 5455) for automatic sheet size
+    SCALES = (1, 2, 5, 10, 20, 25, 50, 100, 200, 250, 500, 1000, 2000, 5000)
+    # margins of sheet (left, top, right, bottom) and title block (width, height) in the bottom right corner,
+    # the same as of `planner.frame.title.SampleTitle`
+    MARGINS = (20, 10, 10, 10)
+    TITLE_BLOCK = (185, 55)
+
+    # count of spatial index cells along the longest side of plan
+    INDEX_GRID_SIZE = 64
+
+    def __init__(self, size="A3", backend="string", cache=True, groups=False, style_classes=False,
+                 precision=None, instrument=None, max_size="A0", class_prefix="s"):
         """
          -  size can be:
              - tuple with 2 values (width, height)
              - series of size (ISO 216): A0-A10
+             - "auto" - the smallest sheet and standard scale fitting content (see `layout`)
+         -  backend - name of rendering backend or backend instance:
+             - "string" - fast backend without validation (default)
+             - "svgwrite" - strict backend with validation of every attribute (for debugging)
+         -  cache - keep rendered fragments in figures and re-render only changed figures,
+            disable to keep memory usage flat on one-time export of huge plans
+         -  groups - wrap elements of every object in group with object id (`Figure.uuid`)
+            and track changes of objects, required for patches (see `render_patch`)
+         -  style_classes - replace repeated presentation attributes (stroke, fill, font-family, etc)
+            with CSS classes defined once per document in one `<style>` element
+            (ignored if backend instance is passed)
+         -  precision - step of coordinates rounding in output, e.g. 0.01 (mm),
+            numbers are written as is by default (ignored if backend instance is passed)
+         -  instrument - callable called after every rendering stage of every object with arguments
+            (object, stage, seconds, elements count, size of SVG), stages are:
+             - "draw" - description of object with primitives (`Figure._primitives`, `Figure._defs_primitives`),
+               elements count is count of primitives, size is 0
+             - "body" - serialization of elements
+             - "defs" - serialization of defs section items
+            e.g. `planner.profiling.RenderProfile` instance, cache is bypassed while instrument is set,
+            so real rendering cost of every object is measured
+         -  max_size - the biggest sheet (A0-A10) for automatic size
+         -  class_prefix - prefix of CSS classes names, the same for all drawings by default,
+            so identical plans are rendered to identical documents; pass distinct prefixes
+            to drawings inlined in one HTML page (ignored if backend instance is passed)
         """
-        # Save size of plan
-        if size in Drawing.SIZES:
-            self.size = Drawing.SIZES[size]
-        else:
-            self.size = size
+        self.size = size
+        self.max_size = max_size
+        self.backend = get_backend(backend, style_classes=style_classes, precision=precision,
+                                   class_prefix=class_prefix)
+        self.cache = cache
+        self.groups = groups
+        self.instrument = instrument
         # Init container
         self.objects = []
+        # Bounding box of content, bounding boxes of objects joined to it
+        # and objects added or changed after its calculation (see `bbox`),
+        # None instead of list of objects means that bounding box should be recalculated
+        self._bbox = None
+        self._bboxes = {}
+        self._bbox_pending = None
+        # Allocator of figures ids (see `Figure.uuid`)
+        self.ids = IdAllocator()
+        # Changes since last rendering (see `render_patch`),
+        # positions of objects in `objects` list (None after removal, rebuilt on next patch)
+        self._changed = {}
+        self._positions = {}
+        self._removed = set()
+        self._rendered = set()
+        self._rendered_defs = set()
+        # Spatial index of objects, built on first viewport rendering (see `render`)
+        self._index = None
+        self._index_key = 0
+        self._index_changed = set()
+
+    def __getstate__(self):
+        # Changes tracking state is bound to the documents sent from this process
+        state = self.__dict__.copy()
+        state.update(_changed={}, _positions=None, _removed=set(), _rendered=set(), _rendered_defs=set(),
+                     _index=None, _index_key=0, _index_changed=set(), _bbox=None, _bboxes={}, _bbox_pending=None,
+                     instrument=None)
+        return state
+
+    @property
+    def size(self):
+        """
+        Size of sheet (width, height) in mm.
+        """
+        if self._size is None:
+            return self.layout().size
+        return self._size
+
+    @size.setter
+    def size(self, size):
+        if size == "auto":
+            self._size = None
+        elif size in Drawing.SIZES:
+            self._size = Drawing.SIZES[size]
+        else:
+            self._size = size
+
+    @property
+    def autosize(self):
+        return self._size is None
+
+    @property
+    def bbox(self):
+        """
+        Bounding box of content (x0, y0, x1, y1) or None for empty drawing, title blocks are not included.
+        Added and changed objects are joined lazily, so adding or changing of object costs O(1).
+        Bounding box is recalculated over the whole plan (O(n)) only after change or removal of object
+        lying on its border, as bounding box can become smaller.
+        """
+        pending = self._bbox_pending
+        if pending is None:
+            self._bbox = None
+            self._bboxes = {}
+            pending = self.objects
+        if pending:
+            bboxes = [self._bbox]
+            for obj in pending:
+                # removed objects and title blocks are skipped
+                if obj._parent is self and not isinstance(obj, SampleTitle):
+                    bbox = self._bboxes[obj] = obj.bbox
+                    bboxes.append(bbox)
+            self._bbox = union_bboxes(bboxes)
+        self._bbox_pending = []
+        return self._bbox
+
+    def _bbox_changed(self, obj, removed=False):
+        """
+        Update bounding box of content on change or removal of object.
+        """
+        if self._bbox_pending is None:
+            return
+        if obj not in self._bboxes:
+            # object isn't joined yet
+            return
+        old = self._bboxes.pop(obj)
+        bbox = self._bbox
+        if old is not None and (old[0] <= bbox[0] or old[1] <= bbox[1] or old[2] >= bbox[2] or old[3] >= bbox[3]):
+            self._bbox_pending = None
+        elif not removed:
+            self._bbox_pending.append(obj)
+
+    @classmethod
+    def fit_sheet(cls, bbox, max_size="A0"):
+        """
+        Sheet layout (`SheetLayout`) for content with bounding box bbox:
+        the most detailed standard scale (see `SCALES`) at which content fits a sheet not bigger than max_size
+        and the smallest sheet fitting content at this scale.
+        Content is placed in the top left corner of area inside margins (see `MARGINS`)
+        and doesn't overlap title block (see `TITLE_BLOCK`).
+        """
+        if bbox is None:
+            bbox = (0, 0, 0, 0)
+        left, top, right, bottom = cls.MARGINS
+        title_width, title_height = cls.TITLE_BLOCK
+        limit = cls.SIZES[max_size]
+        # sheets with place for title block
+        sizes = sorted((size for size in cls.SIZES.values() if size[0] <= limit[0] and size[1] <= limit[1] and
+                        size[0] - left - right >= title_width and size[1] - top - bottom >= title_height),
+                       key=lambda size: size[0] * size[1])
+        width, height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+        for scale in cls.SCALES:
+            for size in sizes:
+                area_width, area_height = size[0] - left - right, size[1] - top - bottom
+                if width > area_width * scale or height > area_height * scale:
+                    continue
+                if width <= (area_width - title_width) * scale or height <= (area_height - title_height) * scale:
+                    viewbox = (bbox[0] - left * scale, bbox[1] - top * scale, size[0] * scale, size[1] * scale)
+                    return SheetLayout(size, scale, viewbox)
+        raise ValueError("Content doesn't fit {} sheet at 1:{}".format(max_size, cls.SCALES[-1]))
+
+    def layout(self):
+        """
+        Sheet layout of drawing (`SheetLayout`).
+        Sheet of drawing with fixed size shows plan at 1:1 from the origin,
+        automatic sheet is fitted to content (see `fit_sheet`).
+        """
+        if self._size is None:
+            return self.fit_sheet(self.bbox, self.max_size)
+        return SheetLayout(self._size, 1, (0, 0) + tuple(self._size))
 
     def add(self, obj):
+        """
+        Add object to the drawing.
+        Drawing tracks changes of object, so object can belong only to one drawing.
+        """
+        if self._positions is not None:
+            self._positions[obj] = len(self.objects)
         self.objects.append(obj)
+        obj._parent = self
+        if self._bbox_pending is not None:
+            self._bbox_pending.append(obj)
+        self._reserve_ids(obj)
+        if self.groups:
+            self._changed[obj] = None
+        if self._index is not None:
+            self._index_changed.add(obj)
 
-    def __str__(self):
-        draw = SVGDrawing(
-            size=(self.size[0] * mm, self.size[1] * mm), profile='full',
-            viewBox="0 0 {} {}".format(self.size[0], self.size[1]))
-        for obj in self.objects:
-            drawed = obj._draw()
-            # object can consists of several objects
-            if hasattr(drawed, '__iter__'):
-                for svg_obj in drawed:
-                    draw.add(svg_obj)
+    def _reserve_ids(self, obj):
+        """
+        Keep ids of object and its nested figures allocated by other drawing.
+        """
+        if hasattr(obj, '_uuid'):
+            self.ids.reserve(obj._uuid)
+        for child in obj._children():
+            self._reserve_ids(child)
+
+    def remove(self, obj):
+        """
+        Remove object from the drawing.
+        """
+        self.objects.remove(obj)
+        self._positions = None
+        obj._parent = None
+        self._bbox_changed(obj, removed=True)
+        if self._index is not None:
+            self._index_changed.discard(obj)
+            if obj in self._index:
+                self._index.remove(obj)
+        if self.groups:
+            self._changed.pop(obj, None)
+            # objects without ids were never sent in documents or patches
+            if hasattr(obj, '_uuid'):
+                self._removed.add(obj._uuid)
+
+    def _child_changed(self, obj):
+        self._bbox_changed(obj)
+        if self.groups:
+            self._changed[obj] = None
+        if self._index is not None:
+            # bounding box is updated on next query
+            self._index_changed.add(obj)
+
+    def _get_index(self):
+        """
+        Spatial index of objects, object keys are ordering objects as in `objects` list.
+        """
+        if self._index is None:
+            bboxes = [obj.bbox for obj in self.objects]
+            x0, y0, x1, y1 = union_bboxes(bboxes + [(0, 0) + tuple(self.size)])
+            self._index = GridIndex(float(max(x1 - x0, y1 - y0, 1)) / self.INDEX_GRID_SIZE)
+            for key, (obj, bbox) in enumerate(zip(self.objects, bboxes)):
+                self._index.insert(obj, bbox, key)
+            self._index_key = len(self.objects)
+            self._index_changed.clear()
+        for obj in self._index_changed:
+            if obj in self._index:
+                self._index.insert(obj, obj.bbox)
+            else:
+                self._index.insert(obj, obj.bbox, self._index_key)
+                self._index_key += 1
+        self._index_changed.clear()
+        return self._index
+
+    def find_objects(self, bbox):
+        """
+        Objects intersecting with bounding box (x0, y0, x1, y1) in order of drawing.
+        Objects are looked up in spatial index, so cost depends on count of found objects.
+        """
+        return self._get_index().query(bbox)
+
+    def _measure(self, obj, stage, function, *args):
+        """
+        Call rendering function of stage and pass its statistics to instrumentation hook.
+        """
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+        if stage == "draw":
+            elements, size = sum(1 for _ in iter_primitives(result)), 0
+        else:
+            svg = result if stage == "body" else ''.join(defs_item for defs_id, defs_item in result)
+            elements, size = svg.count('<') - svg.count('</'), len(svg)
+        self.instrument(obj, stage, seconds, elements, size)
+        return result
+
+    def _profile_defs(self, obj, lod=None):
+        """
+        Render defs of object measuring drawing and serialization (cache is bypassed).
+        """
+        drawed = self._measure(obj, "draw", obj._get_defs_primitives, lod)
+        return self._measure(obj, "defs", obj._serialize_defs, self.backend, drawed) + self.backend.pop_defs()
+
+    def _profile_body(self, obj, lod=None):
+        """
+        Render elements of object measuring drawing and serialization (cache is bypassed).
+        """
+        drawed = self._measure(obj, "draw", obj._get_primitives, lod)
+        return self._measure(obj, "body", obj._serialize_body, self.backend, drawed)
+
+    def _render_defs(self, obj, lod=None, cache=None):
+        if self.instrument is not None:
+            return self._profile_defs(obj, lod)
+        if self.cache if cache is None else cache:
+            return obj._render(self.backend, lod)[0]
+        # definitions required by serialized primitives (CSS classes, etc) are collected as well
+        return obj._render_defs(self.backend, lod) + self.backend.pop_defs()
+
+    def _render_body(self, obj, lod=None, cache=None):
+        if self.instrument is not None:
+            body = self._profile_body(obj, lod)
+        elif self.cache if cache is None else cache:
+            body = obj._render(self.backend, lod)[1]
+        else:
+            body = obj._render_body(self.backend, lod)
+        return self._wrap_body(obj, body)
+
+    def _sheet_transform(self, obj):
+        """
+        Transformation (x, y, scale) of sheet units to plan units for objects drawn in sheet units
+        (title blocks of drawing with automatic size), None for other objects.
+        """
+        if self._size is None and isinstance(obj, SampleTitle):
+            layout = self.layout()
+            return layout.viewbox[0], layout.viewbox[1], layout.scale
+        return None
+
+    def _wrap_body(self, obj, body):
+        transform = self._sheet_transform(obj)
+        if transform is not None:
+            body = '<g transform="translate({} {}) scale({})">{}</g>'.format(
+                *[self.backend.format_number(value) for value in transform] + [body])
+        if self.groups:
+            return '<g id="{}">{}</g>'.format(obj.uuid, body)
+        return body
+
+    def _render_fragment(self, obj):
+        """
+        Render defs and body of object at once.
+        """
+        if self.instrument is not None:
+            body = self._profile_body(obj)
+            defs = self._profile_defs(obj)
+        elif self.cache:
+            defs, body = obj._render(self.backend)
+        else:
+            body = obj._render_body(self.backend)
+            defs = obj._render_defs(self.backend) + self.backend.pop_defs()
+        return defs, self._wrap_body(obj, body)
+
+    @staticmethod
+    def _split_rules(defs_items, rules):
+        """
+        Move CSS rules of style classes (see `planner.backend.base.StyleRule`) from defs items to rules list.
+        """
+        for defs_item in defs_items:
+            if isinstance(defs_item, StyleRule):
+                rules.append(defs_item)
             else:
-                draw.add(drawed)
-            # defs section (masks, clips, markers, etc)
-            defs = obj._defs()
-            if defs:
-                if hasattr(defs, '__iter__'):
-                    for defs_item in defs:
-                        draw.defs.add(defs_item)
-                else:
-                    draw.defs.add(defs)
-        return draw.tostring()
+                yield defs_item
+
+    @staticmethod
+    def _new_defs(defs, defs_ids):
+        """
+        Filter out defs items with already emitted ids (shared definitions are emitted once).
+        """
+        for defs_id, defs_item in defs:
+            if defs_id is not None:
+                if defs_id in defs_ids:
+                    continue
+                defs_ids.add(defs_id)
+            yield defs_item
+
+    def render_patch(self):
+        """
+        Render changes since the previous patch or full rendering of document
+        (first patch without full rendering adds everything).
+        Returns dict with keys:
+         -  "defs" - list of new defs section items (new CSS rules are joined into one `<style>` element)
+         -  "removed" - list of ids of removed objects
+         -  "replaced" - list of dicts {"id": object id, "svg": object group} for changed objects
+         -  "added" - list of dicts {"id": object id, "after": id of previous object or None,
+            "svg": object group} for new objects
+        Objects are keyed by `Figure.uuid`, svg of object is a group with object id.
+        Only changed objects are rendered, so patch cost depends on size of changes, not of plan.
+        Available only for drawings with `groups=True`.
+        """
+        if not self.groups:
+            raise ValueError("Patches are available only for drawings with groups")
+        patch = {"defs": [], "removed": [], "replaced": [], "added": []}
+        for uuid in self._removed:
+            if uuid in self._rendered:
+                self._rendered.discard(uuid)
+                patch["removed"].append(uuid)
+        if self._positions is None:
+            self._positions = dict((obj, index) for index, obj in enumerate(self.objects))
+        rules = []
+        for obj in self._changed:
+            defs = self._new_defs(self._render_defs(obj), self._rendered_defs)
+            patch["defs"].extend(self._split_rules(defs, rules))
+            svg = self._render_body(obj)
+            defs = self._new_defs(self.backend.pop_defs(), self._rendered_defs)
+            patch["defs"].extend(self._split_rules(defs, rules))
+            if obj.uuid in self._rendered:
+                patch["replaced"].append({"id": obj.uuid, "svg": svg})
+            else:
+                index = self._positions[obj]
+                after = self.objects[index - 1].uuid if index else None
+                patch["added"].append({"id": obj.uuid, "after": after, "svg": svg})
+                self._rendered.add(obj.uuid)
+        if rules:
+            patch["defs"].append(style_element(rules))
+        self._changed.clear()
+        self._removed.clear()
+        return patch
+
+    def iter_svg(self, viewport=None, scale=None, cache=None):
+        """
+        Generate SVG document chunk by chunk: header, defs section (masks, clips, markers, etc),
+        elements of every object and closing tag.
+        Whole document is never built in memory, with disabled cache
+        peak memory doesn't depend on objects count.
+        viewport, scale - see `render`
+        cache - use and fill rendering cache of figures (`Drawing.cache` by default)
+        """
+        backend = self.backend
+        if cache is None:
+            cache = self.cache
+        if viewport is None:
+            objects = self.objects
+            layout = self.layout()
+            yield backend.header(layout.size, layout.viewbox)
+        else:
+            x, y, width, height = viewport
+            objects = self.find_objects((x, y, x + width, y + height))
+            yield backend.header(self.size, tuple(viewport))
+        lod = scale
+        if scale is not None and not isinstance(scale, LevelOfDetail):
+            lod = LevelOfDetail(scale)
+        if lod is not None:
+            objects = [obj for obj in objects if lod.is_visible(obj.bbox)]
+        # defs section should precede elements, so objects are passed twice
+        has_defs = False
+        defs_ids = set()
+        rules = []
+        for obj in objects:
+            for defs_item in self._split_rules(self._new_defs(self._render_defs(obj, lod, cache), defs_ids), rules):
+                if not has_defs:
+                    has_defs = True
+                    yield '<defs>'
+                yield defs_item
+        # rendered fragments (cache) contain CSS rules of elements, so all rules are known here
+        cached = cache and self.instrument is None
+        if rules and cached:
+            if not has_defs:
+                has_defs = True
+                yield '<defs>'
+            yield style_element(rules)
+            rules = []
+        yield '</defs>' if has_defs else '<defs />'
+        for obj in objects:
+            yield self._render_body(obj, lod, cache)
+            for defs_item in self._split_rules(self._new_defs(backend.pop_defs(), defs_ids), rules):
+                yield defs_item
+        if rules:
+            # without cache CSS rules of elements are known only now, style element is valid anywhere
+            yield style_element(rules)
+        yield backend.footer()
+        if self.groups and viewport is None and lod is None:
+            # Document contains everything, next patch should contain only further changes
+            self._rendered = set(obj.uuid for obj in self.objects)
+            self._rendered_defs = defs_ids
+            self._changed.clear()
+            self._removed.clear()
+
+    def render(self, viewport=None, scale=None):
+        """
+        Render SVG document.
+        viewport - part of plan (x, y, width, height) to show with drawing size,
+            only objects intersecting with viewport are rendered.
+        scale - pixels per user unit of plan, fine details (hatching, texts, arrows, tiny figures)
+            are dropped at small scales (see `planner.lod.LevelOfDetail`), also accepts
+            `LevelOfDetail` instance with custom thresholds. All details are rendered by default.
+        """
+        return ''.join(self.iter_svg(viewport, scale))
+
+    def render_tiles(self, tile_size=256, zoom_levels=3, out_dir='.', workers=None):
+        """
+        Render plan to pyramid of SVG tiles `<out_dir>/<zoom>/<x>/<y>.svg` for web viewers.
+        On zoom level 0 the longest side of content (see `bbox`) is covered with one tile,
+        on every next level tiles are twice smaller.
+         -  tile_size - size of tile document in pixels
+         -  zoom_levels - count of zoom levels (starting from 0) or iterable with zoom levels
+         -  workers - count of threads writing tiles
+        Every object is placed only to tiles it touches, with enabled cache it's rendered once.
+        Returns list of `planner.tiles.TileResult(path, zoom, x, y, size)`.
+        """
+        return render_tiles(self, tile_size, zoom_levels, out_dir, workers)
+
+    def write(self, fileobj, viewport=None, scale=None, cache=False):
+        """
+        Write SVG document to file-like object (file, socket file, etc) chunk by chunk.
+        Rendered fragments of figures are not cached by default, so memory used by export
+        doesn't grow with plan (see `iter_svg`).
+        """
+        for chunk in self.iter_svg(viewport, scale, cache):
+            fileobj.write(chunk)
+
+    def __str__(self):
+        return ''.join(self.iter_svg())
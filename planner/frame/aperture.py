@@ -1,5 +1,7 @@
 from planner.frame.figure import Figure
-from svgwrite import shapes
+from planner.backend import primitives
+from planner.style import Style
+from planner.geometry import points_bbox
 
 
 class Aperture(Figure):
@@ -8,6 +10,8 @@ class Aperture(Figure):
     Aperture (door, window, etc) in a wall (only horizontal and vertical walls supported for now)
     """
 
+    __slots__ = ('start_point', 'width', 'wall_start_point', 'wall_end_point', 'wall_width', 'attribs')
+
     def __init__(self, start_point, width, wall_start_point, wall_end_point, wall_width, **attribs):
         """
         Create aperture. Parameters:
@@ -26,20 +30,23 @@ class Aperture(Figure):
         self.wall_start_point = wall_start_point
         self.wall_end_point = wall_end_point
         self.wall_width = wall_width
-        self.attribs = attribs
+        self.attribs = Style.get(attribs)
 
-    def _draw(self):
-        attribs = {"stroke": "#000", "stroke-width": "2", "fill": "#fff"}
-        attribs.update(self.attribs)
+    def _get_size(self):
         # vertical (x coordinates equal)
         if self.wall_start_point[0] == self.wall_end_point[0]:
-            width = self.wall_width
-            height = self.width
+            return (self.wall_width, self.width)
         # horizontal
-        else:
-            width = self.width
-            height = self.wall_width
-        return shapes.Rect((self.start_point[0], self.start_point[1]), (width, height), **attribs)
+        return (self.width, self.wall_width)
+
+    def _get_bbox(self):
+        width, height = self._get_size()
+        return points_bbox([self.start_point, (self.start_point[0] + width, self.start_point[1] + height)])
+
+    def _primitives(self):
+        attribs = {"stroke": "#000", "stroke-width": "2", "fill": "#fff"}
+        attribs.update(self.attribs)
+        return primitives.Rect((self.start_point[0], self.start_point[1]), self._get_size(), **attribs)
 
     @classmethod
     def match_wall_and_create(cls, start_point, width, walls, wall_width, **attribs):
@@ -0,0 +1,97 @@
+"""
+Batches of similar figures stored in arrays (without object per item).
+"""
+from planner.frame.figure import Figure
+from planner.backend import primitives
+from planner.style import Style
+from planner.geometry import points_bbox
+import numpy as np
+
+
+class LineBatch(Figure):
+
+    """
+    Batch of line segments rendered as few `<path>` elements.
+    Call `invalidate` after changing items of `segments` array in place.
+    """
+
+    __slots__ = ('segments', 'chunk_size', 'attribs')
+
+    DEFAULT_ATTRIBS = {"stroke-width": 0.5, "stroke": "#000"}
+
+    def __init__(self, segments, chunk_size=10000, **attribs):
+        """
+        segments - array-like of segments ((x1, y1), (x2, y2)) with shape (n, 2, 2) or (n, 4)
+        chunk_size - max count of segments in one path element
+        """
+        self.segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        self.chunk_size = chunk_size
+        self.attribs = Style.get(self.DEFAULT_ATTRIBS, attribs)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _get_bbox(self):
+        return points_bbox(self.segments.reshape(-1, 2))
+
+    def _primitives(self):
+        res = []
+        for start in range(0, len(self.segments), self.chunk_size):
+            points = self.segments[start:start + self.chunk_size].reshape(-1, 2)
+            offsets = np.arange(0, len(points) + 1, 2)
+            res.append(primitives.Path(primitives.PathData(points, offsets), **self.attribs))
+        return res
+
+
+class PolygonBatch(Figure):
+
+    """
+    Batch of polygons rendered as few `<path>` elements.
+    Call `invalidate` after changing items of `points` or `offsets` arrays in place.
+    """
+
+    __slots__ = ('points', 'offsets', 'chunk_size', 'attribs')
+
+    DEFAULT_ATTRIBS = {"stroke": "#000", "stroke-width": "2", "fill": "#fff"}
+
+    def __init__(self, rings, offsets=None, chunk_size=10000, **attribs):
+        """
+        rings - polygons rings, can be:
+            - sequence of arrays of points with shape (k, 2) (rings can have different sizes)
+            - array with shape (n, k, 2) (all rings have the same size)
+            - array of points of all rings with shape (m, 2), if `offsets` specified
+        offsets - indexes of first point of every ring in `rings` array (and optionally total count of points)
+        chunk_size - max count of polygons in one path element
+        """
+        if offsets is None:
+            if isinstance(rings, np.ndarray) and rings.ndim == 3:
+                sizes = np.full(len(rings), rings.shape[1])
+            else:
+                rings = [np.asarray(ring, dtype=float).reshape(-1, 2) for ring in rings]
+                sizes = np.array([len(ring) for ring in rings], dtype=int)
+            points = np.concatenate(rings).reshape(-1, 2) if len(rings) else np.empty((0, 2))
+            offsets = np.concatenate(([0], np.cumsum(sizes)))
+        else:
+            points = np.asarray(rings, dtype=float).reshape(-1, 2)
+            offsets = np.asarray(offsets, dtype=int)
+            if not len(offsets) or offsets[-1] != len(points):
+                offsets = np.append(offsets, len(points))
+        self.points = np.asarray(points, dtype=float)
+        self.offsets = offsets
+        self.chunk_size = chunk_size
+        self.attribs = Style.get(self.DEFAULT_ATTRIBS, attribs)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _get_bbox(self):
+        return points_bbox(self.points)
+
+    def _primitives(self):
+        res = []
+        for start in range(0, len(self), self.chunk_size):
+            offsets = self.offsets[start:start + self.chunk_size + 1]
+            points = self.points[offsets[0]:offsets[-1]]
+            path_data = primitives.PathData(points, offsets - offsets[0], closed=True)
+            res.append(primitives.Path(path_data, **self.attribs))
+        return res
@@ -1,5 +1,6 @@
 from planner.frame.figure import Figure
-from svgwrite import shapes
+from planner.backend import primitives
+from planner.style import Style
 from planner.tools import parse_measure_units
 
 
@@ -10,6 +11,8 @@ class Bulkhead(Figure):
     Only horizontal and vertical bulkheads supported for now.
     """
 
+    __slots__ = ('x', 'y', 'width', 'height', 'attribs')
+
     DEFAULT_PARAMS = {"stroke": "#000", "stroke-width": "2", "fill": "#fff"}
 
     def __init__(self, left_top_point, right_bottom_point, **attribs):
@@ -21,18 +24,29 @@ class Bulkhead(Figure):
         self.y = left_top_point[1]
         self.width = right_bottom_point[0] - left_top_point[0]
         self.height = right_bottom_point[1] - left_top_point[1]
-        self.attribs = attribs
+        self.attribs = Style.get(attribs)
+
+    @property
+    def rect(self):
+        """
+        Bulkhead bounds (x0, y0, x1, y1).
+        """
+        return (min(self.x, self.x + self.width), min(self.y, self.y + self.height),
+                max(self.x, self.x + self.width), max(self.y, self.y + self.height))
+
+    def _get_bbox(self):
+        return self.rect
 
-    def _draw(self):
-        # Prepare border
+    def _border_params(self):
         border_params = self.DEFAULT_PARAMS.copy()
         border_params.update(self.attribs)
         border_params['fill'] = '#fff'  # For border stroke background should be white
-        border = shapes.Rect((self.x, self.y), (self.width, self.height), **border_params)
-        res = [border]
-        # Prepare background
-        stroke_width = border_params.get('stroke-width')
-        value, unit = parse_measure_units(stroke_width)
+        return border_params
+
+    def _background(self, inside_border=True):
+        """
+        Background rect inside of border (or of the whole bulkhead size).
+        """
         bg_params = self.DEFAULT_PARAMS.copy()
         bg_params.update(self.attribs)
         del bg_params['stroke-width']
@@ -40,14 +54,18 @@ class Bulkhead(Figure):
         # Hatching and filling
         if hasattr(self, "hatch") and self.hatch:
             bg_params['style'] = "fill: url(#{})".format(self._hatching_id)
-            res.append(self.hatch)
         if hasattr(self, "filling"):
             bg_params['fill'] = self.filling
         else:
             if 'fill' not in bg_params:
                 bg_params['fill'] = "#fff"
-        background = shapes.Rect(
+        if not inside_border:
+            return primitives.Rect((self.x, self.y), (self.width, self.height), **bg_params)
+        value, unit = parse_measure_units(self._border_params().get('stroke-width'))
+        return primitives.Rect(
             (self.x + float(value) / 2, self.y + float(value) / 2),
             (self.width - value, self.height - value), **bg_params)
-        res.append(background)
-        return res
+
+    def _primitives(self):
+        border = primitives.Rect((self.x, self.y), (self.width, self.height), **self._border_params())
+        return [border, self._background()]
@@ -1,5 +1,8 @@
 from planner.frame.figure import Figure
-from svgwrite import shapes, text, path, container
+from planner.backend import primitives
+from planner.style import Style
+from planner.tools import content_id
+import numpy as np
 import math
 
 
@@ -9,6 +12,8 @@ class BaseDimension(Figure):
     Abstract base class for dimensions objects
     """
 
+    __slots__ = ('start_point', 'end_point', 'label', 'attribs', 'label_attribs')
+
     DEFAULT_ATTRIBS = {"stroke-width": "0.5", "stroke": "#000000"}
     DEFAULT_ARROW_ATTRIBS = {"fill": "#000000"}
     DEFAULT_LABEL_ATTRIBS = {"font-size": "4", "text-anchor": "middle", "font-family": "Arial"}
@@ -20,9 +25,8 @@ class BaseDimension(Figure):
         self.start_point = start_point
         self.end_point = end_point
         self.label = label
-        self.attribs = self.DEFAULT_ATTRIBS
-        self.attribs.update(attribs)
-        self.label_attribs = label_attribs or {}
+        self.attribs = Style.get(self.DEFAULT_ATTRIBS, attribs)
+        self.label_attribs = Style.get(label_attribs)
 
     def _get_length(self, p1, p2):
         return ((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2) ** 0.5
@@ -71,9 +75,10 @@ class BaseDimension(Figure):
                  middle_point[1] + unit_vector_p[1] * self.ARROW_WIDTH)
         tail2 = (middle_point[0] - unit_vector_p[0] * self.ARROW_WIDTH,
                  middle_point[1] - unit_vector_p[1] * self.ARROW_WIDTH)
-        attribs_merged = self.DEFAULT_ARROW_ATTRIBS
-        attribs_merged.update(attribs)
-        return shapes.Polygon([start_point, tail1, tail2, start_point], **attribs_merged)
+        attribs_merged = Style.get(self.DEFAULT_ARROW_ATTRIBS, attribs)
+        arrow = primitives.Polygon([start_point, tail1, tail2, start_point], **attribs_merged)
+        arrow.role = 'arrow'
+        return arrow
 
     def _render_text(self, start_point, end_point, padding=True):
         middle_point = self._get_middle_point(start_point, end_point)
@@ -90,10 +95,10 @@ class BaseDimension(Figure):
                                       middle_point[1] + unit_vector[1] * self.ARROW_PADDING)
         else:
             draw_text_center_point = middle_point
-        attribs['transform'] = "rotate({}, {}, {})".format(angle, draw_text_center_point[0], draw_text_center_point[1])
-        return text.Text(self.label, draw_text_center_point, **attribs)
+        attribs['transform'] = primitives.Rotation(angle, draw_text_center_point[0], draw_text_center_point[1])
+        return primitives.Text(self.label, draw_text_center_point, **attribs)
 
-    def _draw(self):
+    def _primitives(self):
         """
         SVG draw logic.
         """
@@ -106,14 +111,16 @@ class LinearDimension(BaseDimension):
     Linear dimensions.
     """
 
-    def _draw(self):
+    __slots__ = ()
+
+    def _primitives(self):
         res = []
         start_middle_point = self._get_middle_point(self.start_point, self.end_point, self.ARROW_LENGTH)
         end_middle_point = self._get_middle_point(self.end_point, self.start_point, self.ARROW_LENGTH)
         # Prepare svg elements
         arrow_start = self._create_arrow(self.start_point, self.end_point, start_middle_point)
         arrow_end = self._create_arrow(self.end_point, self.start_point, end_middle_point)
-        line = shapes.Line(start_middle_point, end_middle_point, **self.attribs)
+        line = primitives.Line(start_middle_point, end_middle_point, **self.attribs)
         # Create list with correct sequence of svg objects
         res.append(line)
         res.append(arrow_start)
@@ -128,6 +135,8 @@ class ExtensionableLinearDimension(BaseDimension):
     Linear dimensions with extension lines.
     """
 
+    __slots__ = ('_direction', 'extension_size')
+
     EXTENSION_TAIL = 2
 
     def __init__(self, start_point, end_point, label, font=None, direction=1, extension_size=12, **attribs):
@@ -140,7 +149,7 @@ class ExtensionableLinearDimension(BaseDimension):
         self._direction = direction >= 0
         self.extension_size = extension_size
 
-    def _draw(self):
+    def _primitives(self):
         res = []
         # Draw lines
         unit_vector = self._get_perpendicular_unit_vector(self.start_point, self.end_point, self.start_point)
@@ -151,14 +160,14 @@ class ExtensionableLinearDimension(BaseDimension):
                                  self.start_point[1] + unit_vector[1] * self.extension_size)
         end_extension_point = (self.end_point[0] + unit_vector[0] * self.extension_size,
                                self.end_point[1] + unit_vector[1] * self.extension_size)
-        start_extension_line = shapes.Line(self.start_point, start_extension_point, **self.attribs)
-        end_extension_line = shapes.Line(self.end_point, end_extension_point, **self.attribs)
+        start_extension_line = primitives.Line(self.start_point, start_extension_point, **self.attribs)
+        end_extension_line = primitives.Line(self.end_point, end_extension_point, **self.attribs)
         dimension_size = self.extension_size - self.EXTENSION_TAIL
         start_dimension_point = (self.start_point[0] + unit_vector[0] * dimension_size,
                                  self.start_point[1] + unit_vector[1] * dimension_size)
         end_dimension_point = (self.end_point[0] + unit_vector[0] * dimension_size,
                                self.end_point[1] + unit_vector[1] * dimension_size)
-        dimension_line = shapes.Line(start_dimension_point, end_dimension_point, **self.attribs)
+        dimension_line = primitives.Line(start_dimension_point, end_dimension_point, **self.attribs)
         res += [start_extension_line, end_extension_line, dimension_line]
         # Draw arrows
         start_arrow_point = self._get_middle_point(start_dimension_point, end_dimension_point, self.ARROW_LENGTH)
@@ -177,6 +186,8 @@ class TinyExtensionableLinearDimension(ExtensionableLinearDimension):
         elongate dimension line.
     """
 
+    __slots__ = ('_start_position', 'elongation')
+
     def __init__(self, start_point, end_point, label, font=None, direction=1,
                  extension_size=12, label_position='start', elongation=15, **attribs):
         """
@@ -192,7 +203,7 @@ class TinyExtensionableLinearDimension(ExtensionableLinearDimension):
         self._start_position = label_position == 'start'
         self.elongation = elongation
 
-    def _draw(self):
+    def _primitives(self):
         res = []
         # Draw lines
         unit_vector = self._get_perpendicular_unit_vector(self.start_point, self.end_point, self.start_point)
@@ -203,8 +214,8 @@ class TinyExtensionableLinearDimension(ExtensionableLinearDimension):
                                  self.start_point[1] + unit_vector[1] * self.extension_size)
         end_extension_point = (self.end_point[0] + unit_vector[0] * self.extension_size,
                                self.end_point[1] + unit_vector[1] * self.extension_size)
-        start_extension_line = shapes.Line(self.start_point, start_extension_point, **self.attribs)
-        end_extension_line = shapes.Line(self.end_point, end_extension_point, **self.attribs)
+        start_extension_line = primitives.Line(self.start_point, start_extension_point, **self.attribs)
+        end_extension_line = primitives.Line(self.end_point, end_extension_point, **self.attribs)
         dimension_size = self.extension_size - self.EXTENSION_TAIL
         start_dimension_middle_point = (self.start_point[0] + unit_vector[0] * dimension_size,
                                         self.start_point[1] + unit_vector[1] * dimension_size)
@@ -220,7 +231,7 @@ class TinyExtensionableLinearDimension(ExtensionableLinearDimension):
                 end_dimension_middle_point, start_dimension_middle_point, -(self.elongation + self.ARROW_LENGTH))
             start_dimension_point = self._get_middle_point(
                 start_dimension_middle_point, end_dimension_middle_point, -(self.ARROW_LENGTH + 2))
-        dimension_line = shapes.Line(start_dimension_point, end_dimension_point, **self.attribs)
+        dimension_line = primitives.Line(start_dimension_point, end_dimension_point, **self.attribs)
         res += [start_extension_line, end_extension_line, dimension_line]
         # Draw arrows
         start_arrow_point = self._get_middle_point(
@@ -245,33 +256,38 @@ class AngleDimension(BaseDimension):
     Angle dimension without extension lines.
     """
 
+    __slots__ = ()
+
     DEFAULT_ATTRIBS = {"stroke-width": "0.5", "stroke": "#000000", "fill-opacity": "0", "stroke-linecap": "butt"}
 
     def get_marker_id(self, position):
-        return "marker-{}-{}".format(position, self.uuid)
+        # markers depend only on arrows size, so they are shared by all angle dimensions
+        return "marker-{}-{}".format(position, content_id(self.ARROW_LENGTH, self.ARROW_WIDTH))
 
-    def _defs(self):
+    def _defs_primitives(self):
         markers = []
-        marker_start = container.Marker(size=(self.ARROW_LENGTH, self.ARROW_WIDTH * 2),
-                                        id=self.get_marker_id('start'), orient="auto", refX=0, refY=self.ARROW_WIDTH)
+        marker_start = primitives.Marker(size=(self.ARROW_LENGTH, self.ARROW_WIDTH * 2),
+                                         id=self.get_marker_id('start'), orient="auto", refX=0, refY=self.ARROW_WIDTH)
         marker_start.add(
-            path.Path(["M", (0, self.ARROW_WIDTH), (self.ARROW_LENGTH, 0), (self.ARROW_LENGTH, self.ARROW_WIDTH * 2),
-                      (0, self.ARROW_WIDTH)], **{"stroke": "#000", "stroke-width": 0.5}))
+            primitives.Path(["M", (0, self.ARROW_WIDTH), (self.ARROW_LENGTH, 0),
+                             (self.ARROW_LENGTH, self.ARROW_WIDTH * 2), (0, self.ARROW_WIDTH)],
+                            **{"stroke": "#000", "stroke-width": 0.5}))
         markers.append(marker_start)
-        marker_end = container.Marker(size=(self.ARROW_LENGTH, self.ARROW_WIDTH * 2), id=self.get_marker_id('end'),
-                                      orient="auto", refX=self.ARROW_LENGTH, refY=self.ARROW_WIDTH)
+        marker_end = primitives.Marker(size=(self.ARROW_LENGTH, self.ARROW_WIDTH * 2), id=self.get_marker_id('end'),
+                                       orient="auto", refX=self.ARROW_LENGTH, refY=self.ARROW_WIDTH)
         marker_end.add(
-            path.Path(["M", (0, 0), (0, self.ARROW_WIDTH * 2), (self.ARROW_LENGTH, self.ARROW_WIDTH), (0, 0)],
-                      **{"stroke": "#000", "stroke-width": 0.5}))
+            primitives.Path(["M", (0, 0), (0, self.ARROW_WIDTH * 2), (self.ARROW_LENGTH, self.ARROW_WIDTH), (0, 0)],
+                            **{"stroke": "#000", "stroke-width": 0.5}))
         markers.append(marker_end)
         return markers
 
-    def _draw(self):
+    def _primitives(self):
         res = []
         # Arc
-        self.attribs.update({"marker-start": "url(#{})".format(self.get_marker_id('start')),
-                             "marker-end": "url(#{})".format(self.get_marker_id('end'))})
-        arc = path.Path(**self.attribs)
+        attribs = self.attribs.copy()
+        attribs.update({"marker-start": "url(#{})".format(self.get_marker_id('start')),
+                        "marker-end": "url(#{})".format(self.get_marker_id('end'))})
+        arc = primitives.Path(**attribs)
         arc.push("M")
         arc.push(self.start_point)
         arc_r = length = self._get_length(self.start_point, self.end_point)
@@ -295,3 +311,113 @@ class AngleDimension(BaseDimension):
                          arc_center[1] + radius_ortogonal_vector[1] * 10)
         res.append(self._render_text(text_line_start, text_line_end, padding=False))
         return res
+
+
+class DimensionSet(Figure):
+
+    """
+    Set of linear dimensions with extension lines (see `ExtensionableLinearDimension`)
+    stored in arrays. Geometry of all dimensions is calculated at once,
+    lines and arrows are drawn with one path each.
+    Call `invalidate` after changing items of points, directions or extension sizes arrays
+    or of `labels` list in place.
+    """
+
+    __slots__ = ('start_points', 'end_points', 'labels', 'directions', 'extension_sizes',
+                 'attribs', 'label_attribs')
+
+    DEFAULT_ATTRIBS = BaseDimension.DEFAULT_ATTRIBS
+    DEFAULT_ARROW_ATTRIBS = BaseDimension.DEFAULT_ARROW_ATTRIBS
+    DEFAULT_LABEL_ATTRIBS = BaseDimension.DEFAULT_LABEL_ATTRIBS
+    ARROW_LENGTH = BaseDimension.ARROW_LENGTH
+    ARROW_WIDTH = BaseDimension.ARROW_WIDTH
+    ARROW_PADDING = BaseDimension.ARROW_PADDING
+    EXTENSION_TAIL = ExtensionableLinearDimension.EXTENSION_TAIL
+
+    def __init__(self, start_points, end_points, labels, directions=1, extension_sizes=12,
+                 label_attribs=None, **attribs):
+        """
+        start_points, end_points - arrays of points with shape (n, 2)
+        labels - sequence of n labels
+        directions - direction of extension lines (see `ExtensionableLinearDimension`),
+            single value or array of n values
+        extension_sizes - size of extension lines, single value or array of n values
+        """
+        start_points = np.asarray(start_points, dtype=float).reshape(-1, 2)
+        end_points = np.asarray(end_points, dtype=float).reshape(-1, 2)
+        labels = list(labels)
+        if not len(start_points) == len(end_points) == len(labels):
+            raise ValueError("Count of start points, end points and labels should be the same")
+        if (start_points == end_points).all(axis=1).any():
+            raise ValueError("Dimension start and end points should be different")
+        self.start_points = start_points
+        self.end_points = end_points
+        self.labels = labels
+        self.directions = np.zeros(len(labels)) + directions >= 0
+        self.extension_sizes = np.zeros(len(labels)) + extension_sizes
+        self.attribs = Style.get(self.DEFAULT_ATTRIBS, attribs)
+        self.label_attribs = Style.get(label_attribs)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @staticmethod
+    def _get_perpendicular_unit_vectors(start_points, end_points):
+        """
+        Vectorized `BaseDimension._get_perpendicular_unit_vector` (the same orientation of vectors).
+        """
+        vectors = end_points - start_points
+        dx, dy = vectors[:, 0], vectors[:, 1]
+        sign = np.where(dy != 0, np.sign(dy), -np.sign(dx))
+        return np.column_stack((-dy, dx)) * (sign / np.hypot(dx, dy))[:, np.newaxis]
+
+    @staticmethod
+    def _get_unit_vectors(start_points, end_points):
+        vectors = end_points - start_points
+        return vectors / np.hypot(vectors[:, 0], vectors[:, 1])[:, np.newaxis]
+
+    def _get_arrows(self, start_points, end_points):
+        """
+        Arrows triangles with tips in `start_points`: array of rows (tip, tail1, tail2) with shape (n, 6).
+        """
+        middle_points = start_points + self._get_unit_vectors(start_points, end_points) * self.ARROW_LENGTH
+        perpendicular = self._get_perpendicular_unit_vectors(start_points, end_points) * self.ARROW_WIDTH
+        return np.hstack((start_points, middle_points + perpendicular, middle_points - perpendicular))
+
+    def _get_labels(self, start_points, end_points):
+        attribs = self.DEFAULT_LABEL_ATTRIBS.copy()
+        attribs.update(self.label_attribs)
+        vectors = end_points - start_points
+        with np.errstate(divide='ignore', invalid='ignore'):
+            angles = np.where(vectors[:, 0] != 0, np.degrees(np.arctan(vectors[:, 1] / vectors[:, 0])), -90)
+        centers = ((start_points + end_points) / 2 +
+                   self._get_perpendicular_unit_vectors(start_points, end_points) * self.ARROW_PADDING)
+        res = []
+        for label, angle, (x, y) in zip(self.labels, angles.tolist(), centers.tolist()):
+            label_attribs = dict(attribs, transform=primitives.Rotation(angle, x, y))
+            res.append(primitives.Text(label, (x, y), **label_attribs))
+        return res
+
+    def _primitives(self):
+        if not len(self):
+            return []
+        start_points, end_points = self.start_points, self.end_points
+        unit_vectors = self._get_perpendicular_unit_vectors(start_points, end_points)
+        # inverse unit vectors if needed
+        unit_vectors[self.directions] *= -1
+        extension_vectors = unit_vectors * self.extension_sizes[:, np.newaxis]
+        dimension_vectors = unit_vectors * (self.extension_sizes - self.EXTENSION_TAIL)[:, np.newaxis]
+        start_dimension_points = start_points + dimension_vectors
+        end_dimension_points = end_points + dimension_vectors
+        # extension lines and dimension line of every dimension
+        segments = np.hstack((start_points, start_points + extension_vectors,
+                              end_points, end_points + extension_vectors,
+                              start_dimension_points, end_dimension_points)).reshape(-1, 2)
+        lines = primitives.Path(primitives.PathData(segments, np.arange(0, len(segments) + 1, 2)),
+                                **self.attribs)
+        arrows = np.hstack((self._get_arrows(start_dimension_points, end_dimension_points),
+                            self._get_arrows(end_dimension_points, start_dimension_points))).reshape(-1, 2)
+        arrows = primitives.Path(primitives.PathData(arrows, np.arange(0, len(arrows) + 1, 3), closed=True),
+                                 **self.DEFAULT_ARROW_ATTRIBS)
+        arrows.role = 'arrow'
+        return [lines, arrows] + self._get_labels(start_dimension_points, end_dimension_points)
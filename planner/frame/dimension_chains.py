@@ -0,0 +1,200 @@
+"""
+Automatic dimensioning of frames.
+
+Chains of dimensions are placed outside of frame on tiers (distance from frame grows with tier):
+ -  openings - wall pieces and apertures on every wall with apertures
+ -  bulkheads - positions of bulkheads between inner borders of walls
+    (vertical bulkheads along bottom wall, horizontal ones along right wall)
+ -  overall - width along top wall and height along left wall
+Labels are placed without overlaps: narrow dimensions get labels on elongated dimension lines,
+dimensions without free place for label are moved away from frame.
+"""
+from planner.frame.dimension import ExtensionableLinearDimension, TinyExtensionableLinearDimension
+from planner.backend import primitives
+from planner.index import GridIndex
+from planner.tools import parse_measure_units
+
+
+class LabelPlacer(object):
+
+    """
+    Spatial hash of placed labels bounding boxes.
+    Checks are near constant time, so placement is linear in count of dimensions.
+    Shared placer keeps labels of several frames from overlapping.
+    """
+
+    # gap between labels
+    PADDING = 0.5
+
+    def __init__(self, cell_size=20):
+        self._index = GridIndex(cell_size)
+
+    def __len__(self):
+        return len(self._index)
+
+    def fits(self, bbox):
+        """
+        Check that bounding box doesn't overlap with placed labels (and their padding).
+        """
+        return not self._index.query(bbox)
+
+    def add(self, bbox):
+        x0, y0, x1, y1 = bbox
+        self._index.insert(len(self._index), (x0 - self.PADDING, y0 - self.PADDING,
+                                              x1 + self.PADDING, y1 + self.PADDING))
+
+
+def label_bbox(text):
+    """
+    Bounding box of text primitive of dimension label (horizontal or vertical with middle anchor).
+    """
+    font_size = parse_measure_units(str(text.attribs.get('font-size', primitives.Text.DEFAULT_FONT_SIZE)))[0]
+    half_width = len(str(text.text)) * primitives.Text.CHAR_WIDTH * font_size / 2.
+    x, y = text.insert
+    rotation = text.attribs.get('transform')
+    if rotation is not None and abs(abs(rotation.angle) - 90) < 45:
+        # text is rotated around insert point, its top is turned to the left or to the right
+        if rotation.angle < 0:
+            return (x - font_size, y - half_width, x, y + half_width)
+        return (x, y - half_width, x + font_size, y + half_width)
+    return (x - half_width, y - font_size, x + half_width, y)
+
+
+def format_length(length):
+    return "{:g}".format(round(length, 2))
+
+
+def _get_label_bbox(dimension):
+    for primitive in dimension._primitives():
+        if isinstance(primitive, primitives.Text):
+            return label_bbox(primitive)
+    return None
+
+
+def _chain(positions, fixed, vertical):
+    """
+    Segments between sorted distinct positions along axis, fixed - coordinate on other axis.
+    """
+    positions = sorted(set(positions))
+    segments = []
+    for start, end in zip(positions, positions[1:]):
+        if vertical:
+            segments.append(((fixed, start), (fixed, end)))
+        else:
+            segments.append(((start, fixed), (end, fixed)))
+    return segments
+
+
+def _frame_chains(frame):
+    """
+    Generate chains of frame as tuples (side, segments), sides are "top", "left", "right" and "bottom".
+    """
+    x0, y0 = frame.x, frame.y
+    x1, y1 = frame.x + frame.width, frame.y + frame.height
+    wall_width = frame.wall_width
+    sides = {"top": (False, y0), "left": (True, x0), "right": (True, x1), "bottom": (False, y1)}
+    # openings
+    walls = dict((wall, []) for wall in frame.WALLS)
+    for aperture in frame.apertures:
+        wall_index = frame._match_wall(aperture.start_point)
+        if wall_index is not None:
+            walls[frame.WALLS[wall_index]].append(aperture)
+    for side in frame.WALLS:
+        if walls[side]:
+            vertical, fixed = sides[side]
+            axis = 1 if vertical else 0
+            positions = [y0, y1] if vertical else [x0, x1]
+            for aperture in walls[side]:
+                positions.extend((aperture.start_point[axis], aperture.start_point[axis] + aperture.width))
+            yield side, _chain(positions, fixed, vertical)
+    # bulkheads
+    rects = [bulkhead.rect for bulkhead in frame.bulkheads]
+    vertical_rects = [rect for rect in rects if rect[3] - rect[1] > rect[2] - rect[0]]
+    horizontal_rects = [rect for rect in rects if rect[3] - rect[1] <= rect[2] - rect[0]]
+    if horizontal_rects:
+        positions = [y0 + wall_width, y1 - wall_width]
+        for rect in horizontal_rects:
+            positions.extend((rect[1], rect[3]))
+        yield "right", _chain(positions, x1, True)
+    if vertical_rects:
+        positions = [x0 + wall_width, x1 - wall_width]
+        for rect in vertical_rects:
+            positions.extend((rect[0], rect[2]))
+        yield "bottom", _chain(positions, y1, False)
+    # overall
+    yield "top", [((x0, y0), (x1, y0))]
+    yield "left", [((x0, y0), (x0, y1))]
+
+
+def _place(segment, direction, extension_size, step, placer, attribs):
+    """
+    Create dimension of segment with label not overlapping with placed labels.
+    """
+    start_point, end_point = segment
+    length = abs(end_point[0] - start_point[0]) + abs(end_point[1] - start_point[1])
+    label = format_length(length)
+    first = None
+    for shift in range(FrameDimensions.MAX_SHIFTS + 1):
+        size = extension_size + shift * step
+        candidates = []
+        if length >= 2 * ExtensionableLinearDimension.ARROW_LENGTH:
+            candidates.append(ExtensionableLinearDimension(
+                start_point, end_point, label, direction=direction, extension_size=size, **attribs))
+        for position in ('end', 'start'):
+            candidates.append(TinyExtensionableLinearDimension(
+                start_point, end_point, label, direction=direction, extension_size=size,
+                label_position=position, **attribs))
+        for dimension in candidates:
+            bbox = _get_label_bbox(dimension)
+            if placer.fits(bbox):
+                placer.add(bbox)
+                return dimension
+            if first is None:
+                first = dimension, bbox
+    # there is no free place, overlapping is unavoidable
+    placer.add(first[1])
+    return first[0]
+
+
+class FrameDimensions(object):
+
+    """
+    Generator of dimension chains of frames (see module description).
+    """
+
+    # max count of steps dimension can be moved away from its tier
+    MAX_SHIFTS = 3
+    DIRECTIONS = {"top": -1, "left": -1, "right": 1, "bottom": 1}
+
+    def __init__(self, offset=12, step=10, placer=None, **attribs):
+        """
+        offset - extension size of the first tier
+        step - distance between tiers
+        placer - `LabelPlacer` shared with other generators, new one by default
+        attribs - SVG attributes of dimensions
+        """
+        self.offset = offset
+        self.step = step
+        self.placer = placer if placer is not None else LabelPlacer()
+        self.attribs = attribs
+
+    def create(self, frame):
+        """
+        List of dimensions of frame.
+        """
+        tiers = dict((side, 0) for side in self.DIRECTIONS)
+        res = []
+        for side, segments in _frame_chains(frame):
+            extension_size = self.offset + tiers[side] * self.step
+            tiers[side] += 1
+            for segment in segments:
+                res.append(_place(
+                    segment, self.DIRECTIONS[side], extension_size, self.step / 2., self.placer, self.attribs))
+        return res
+
+
+def frame_dimensions(frame, offset=12, step=10, placer=None, **attribs):
+    """
+    Dimension chains of frame, see `FrameDimensions`.
+    """
+    return FrameDimensions(offset, step, placer, **attribs).create(frame)
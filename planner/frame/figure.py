@@ -1,28 +1,212 @@
-from svgwrite import shapes, pattern
-from shortuuid import uuid
-import math
-import sys
+from planner.backend.svgwrite_backend import SvgwriteBackend
+from planner.backend.primitives import iter_primitives, get_bbox
+from planner.frame.hatching import Hatching
+from planner.geometry import is_point_on_segment, TOLERANCE as DEFAULT_TOLERANCE
 
 
 class Figure(object):
 
     """ Absctract drawing figure class """
 
+    __slots__ = ('_uuid', '_fragment', '_bbox', '_parent', 'hatch', 'filling')
+
+    # private attributes calculated from figure description, not saved by `planner.serialization`
+    _DERIVED = ()
+    # max distance between point and line for points lying on lines (walls borders, etc)
+    TOLERANCE = DEFAULT_TOLERANCE
+
+    def __new__(cls, *args, **kwargs):
+        self = super(Figure, cls).__new__(cls)
+        # rendering cache and owner are always set, so checks of them are cheap
+        object.__setattr__(self, '_fragment', None)
+        object.__setattr__(self, '_bbox', None)
+        object.__setattr__(self, '_parent', None)
+        return self
+
+    def __setattr__(self, name, value):
+        super(Figure, self).__setattr__(name, value)
+        # public attributes define figure (geometry, attribs, hatch, filling, etc)
+        if name[0] != '_':
+            self.invalidate()
+
+    def __delattr__(self, name):
+        super(Figure, self).__delattr__(name)
+        if name[0] != '_':
+            self.invalidate()
+
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        state.update(getattr(self, '__dict__', {}))
+        # Rendering cache is not a part of figure description
+        state.pop('_fragment', None)
+        state.pop('_bbox', None)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def _after_load(self):
+        """
+        Restore derived attributes (see `_DERIVED`) of figure loaded from binary format.
+        """
+
+    def invalidate(self):
+        """
+        Drop cached rendering of figure and of figures containing it.
+        Called automatically on assignment of public attributes. Attributes are changed
+        by assignment (`attribs` are immutable `planner.style.Style`), except of arrays
+        of batch figures (e.g. `PolygonBatch.points`): call it after changing their items in place.
+        """
+        parent = self._parent
+        if parent is None and self._fragment is None and self._bbox is None:
+            # nothing to drop (e.g. figure under construction)
+            return
+        self._fragment = None
+        self._bbox = None
+        if parent is not None:
+            parent._child_changed(self)
+
+    def _child_changed(self, child):
+        """
+        Notification about change of nested figure (aperture, bulkhead, etc).
+        """
+        self.invalidate()
+
     @property
     def uuid(self):
+        """
+        Short id of figure, allocated on first access by drawing containing figure.
+        Ids are deterministic: the same plan built in the same order gets the same ids.
+        Raise ValueError if figure (or figure containing it) isn't added to drawing.
+        """
         if not hasattr(self, "_uuid"):
-            self._uuid = uuid()
+            owner = self._parent
+            while isinstance(owner, Figure):
+                owner = owner._parent
+            if owner is None:
+                raise ValueError("Id of figure is allocated by drawing, figure should be added to drawing")
+            self._uuid = owner.ids.allocate()
         return self._uuid
 
-    def _draw(self):
+    def _children(self):
+        """
+        Nested figures (apertures, bulkheads, etc).
+        """
+        return ()
+
+    def _primitives(self):
+        """
+        Describe figure with rendering primitives (see `planner.backend.primitives`).
+        Can return single primitive or list of primitives.
+        """
         raise NotImplementedError("Draw method is not yet implemented")
 
-    def _defs(self):
+    def _defs_primitives(self):
+        """
+        Primitives of defs section (masks, clips, markers, etc).
+        Items with the same id are emitted once per drawing.
+        """
+        if hasattr(self, "hatch") and self.hatch:
+            return [self.hatch.pattern]
         return False
 
+    @property
+    def bbox(self):
+        """
+        Bounding box of figure geometry (x0, y0, x1, y1) or None for figure without geometry.
+        Cached until figure is changed.
+        """
+        bbox = self._bbox
+        if bbox is None:
+            bbox = self._bbox = self._get_bbox()
+        return bbox
+
+    def _get_bbox(self):
+        """
+        Calculate bounding box, by default it's a bounding box of figure primitives.
+        """
+        return get_bbox(self._primitives())
+
+    def _draw(self):
+        """
+        Draw figure as svgwrite objects (strict backend with validation of attributes).
+        """
+        return SvgwriteBackend.convert(self._primitives())
+
+    def _defs(self):
+        return SvgwriteBackend.convert(self._defs_primitives())
+
+    def _get_defs_primitives(self, lod=None):
+        """
+        Primitives of defs section simplified for level of detail
+        lod (`planner.lod.LevelOfDetail`), full detail by default.
+        """
+        drawed = self._defs_primitives()
+        if lod is not None:
+            drawed = lod.simplify_defs(drawed)
+        return drawed
+
+    def _get_primitives(self, lod=None):
+        """
+        Primitives of figure simplified for level of detail (see `_get_defs_primitives`).
+        """
+        drawed = self._primitives()
+        if lod is not None:
+            drawed = lod.simplify(drawed)
+        return drawed
+
+    @staticmethod
+    def _serialize_defs(backend, drawed):
+        """
+        Serialize defs section items with specified backend, returns list of pairs (id, svg).
+        """
+        return [(item.attribs.get('id'), backend.serialize(item)) for item in iter_primitives(drawed)]
+
+    @staticmethod
+    def _serialize_body(backend, drawed):
+        """
+        Serialize figure elements with specified backend.
+        """
+        return ''.join(backend.serialize(primitive) for primitive in iter_primitives(drawed))
+
+    def _render_defs(self, backend, lod=None):
+        """
+        Serialize defs section items with specified backend, returns list of pairs (id, svg).
+        lod - level of detail (`planner.lod.LevelOfDetail`), full detail by default
+        """
+        return self._serialize_defs(backend, self._get_defs_primitives(lod))
+
+    def _render_body(self, backend, lod=None):
+        """
+        Serialize figure elements with specified backend.
+        """
+        return self._serialize_body(backend, self._get_primitives(lod))
+
+    def _render(self, backend, lod=None):
+        """
+        Rendered fragment of figure: tuple (defs, body), see `_render_defs` and `_render_body`.
+        Fragment is cached until figure is changed.
+        """
+        lod_key = lod and lod.key
+        fragment = self._fragment
+        if fragment is not None and fragment[0] is backend and fragment[1] == lod_key:
+            return fragment[2]
+        body = self._render_body(backend, lod)
+        defs = self._render_defs(backend, lod)
+        # definitions required by serialized primitives (CSS classes, etc)
+        defs.extend(backend.pop_defs())
+        rendered = (defs, body)
+        self._fragment = (backend, lod_key, rendered)
+        return rendered
+
     @property
     def _hatching_id(self):
-        return "hatching-{}".format(self.uuid)
+        return self.hatch.id
 
     def add_hatching(self, angle=45, distance=3, width=1, color="#000"):
         """
@@ -30,23 +214,12 @@ class Figure(object):
         angle - angle of hatches in deg
         distance - distance between hatches
         width - stroke-width
+        Hatching pattern is shared between all figures with the same hatching parameters.
         **Replaces all previously added hatchings or fillings.**
         """
         if hasattr(self, "filling"):
             del self.filling
-        angle = math.radians(angle)
-        style = "stroke: {color}; stroke-width: {width}".format(color=color, width=width)
-        pattern_width = distance / math.sin(angle)
-        pattern_height = pattern_width * math.tan(angle)
-        self.hatch = pattern.Pattern(
-            (0, 0),
-            (pattern_width, pattern_height), id=self._hatching_id, patternUnits="userSpaceOnUse")
-        self.hatch.add(shapes.Rect((0, 0), (pattern_width, pattern_height), fill="#fff"))
-        self.hatch.add(shapes.Line((0, 0), (pattern_width, pattern_height), style=style))
-        self.hatch.add(
-            shapes.Line((-1, (pattern_height - 1)), (1, (pattern_height + 1)), style=style))
-        self.hatch.add(
-            shapes.Line(((pattern_width - 1), -1), ((pattern_width + 1), 1), style=style))
+        self.hatch = Hatching.get(angle, distance, width, color)
         return self.hatch
 
     def add_filling(self, color):
@@ -61,17 +234,6 @@ class Figure(object):
     @classmethod
     def _is_point_on_line(cls, line_start, line_end, point):
         """
-        Check that point is lay on the line
-        """
-        crossproduct = ((point[1] - line_start[1]) * (line_end[0] - line_start[0]) -
-                        (point[0] - line_start[0]) * (line_end[1] - line_start[1]))
-        if abs(crossproduct) > sys.float_info.epsilon:
-            return False
-        dotproduct = ((point[0] - line_start[0]) * (line_end[0] - line_start[0]) +
-                      (point[1] - line_start[1]) * (line_end[1] - line_start[1]))
-        if dotproduct < 0:
-            return False
-        squaredlength = pow(line_end[0] - line_start[0], 2) + pow(line_end[1] - line_start[1], 2)
-        if dotproduct > squaredlength:
-            return False
-        return True
+        Check that point is lay on the line (with tolerance `TOLERANCE`)
+        """
+        return is_point_on_segment(line_start, line_end, point, cls.TOLERANCE)
@@ -0,0 +1,58 @@
+from planner.backend import primitives
+from planner.tools import content_id
+import math
+
+
+class Hatching(object):
+
+    """
+    Hatching pattern definition.
+    Patterns are shared: all figures hatched with the same parameters
+    reference the same pattern, which is emitted once in defs section.
+    """
+
+    _instances = {}
+
+    def __init__(self, angle=45, distance=3, width=1, color="#000"):
+        """
+        angle - angle of hatches in deg
+        distance - distance between hatches
+        width - stroke-width
+        """
+        self.angle = angle
+        self.distance = distance
+        self.width = width
+        self.color = color
+        self.id = "hatching-{}".format(content_id(angle, distance, width, color))
+        self.pattern = self._create_pattern()
+
+    @classmethod
+    def get(cls, angle=45, distance=3, width=1, color="#000"):
+        """
+        Get shared hatching with specified parameters.
+        """
+        key = repr((angle, distance, width, color))
+        hatching = cls._instances.get(key)
+        if hatching is None:
+            hatching = cls._instances[key] = cls(angle, distance, width, color)
+        return hatching
+
+    def __reduce__(self):
+        # Only parameters are pickled, unpickled hatching is shared as well
+        return (Hatching.get, (self.angle, self.distance, self.width, self.color))
+
+    def _create_pattern(self):
+        angle = math.radians(self.angle)
+        style = "stroke: {color}; stroke-width: {width}".format(color=self.color, width=self.width)
+        pattern_width = self.distance / math.sin(angle)
+        pattern_height = pattern_width * math.tan(angle)
+        pattern = primitives.Pattern(
+            (0, 0),
+            (pattern_width, pattern_height), id=self.id, patternUnits="userSpaceOnUse")
+        pattern.add(primitives.Rect((0, 0), (pattern_width, pattern_height), fill="#fff"))
+        pattern.add(primitives.Line((0, 0), (pattern_width, pattern_height), style=style))
+        pattern.add(
+            primitives.Line((-1, (pattern_height - 1)), (1, (pattern_height + 1)), style=style))
+        pattern.add(
+            primitives.Line(((pattern_width - 1), -1), ((pattern_width + 1), 1), style=style))
+        return pattern
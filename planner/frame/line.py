@@ -1,16 +1,22 @@
 from planner.frame import Figure
-from svgwrite import shapes
+from planner.backend import primitives
+from planner.style import Style
+from planner.geometry import points_bbox
 
 
 class Line(Figure):
 
+    __slots__ = ('start_point', 'end_point', 'attribs')
+
     DEFAULT_ATTRIBS = {"stroke-width": 0.5, "stroke": "#000"}
 
     def __init__(self, start_point, end_point, **attribs):
         self.start_point = start_point
         self.end_point = end_point
-        self.attribs = self.DEFAULT_ATTRIBS.copy()
-        self.attribs.update(attribs)
+        self.attribs = Style.get(self.DEFAULT_ATTRIBS, attribs)
+
+    def _get_bbox(self):
+        return points_bbox([self.start_point, self.end_point])
 
-    def _draw(self):
-        return shapes.Line(self.start_point, self.end_point, **self.attribs)
+    def _primitives(self):
+        return primitives.Line(self.start_point, self.end_point, **self.attribs)
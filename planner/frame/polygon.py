@@ -1,5 +1,7 @@
 from planner.frame import Figure
-from svgwrite import shapes
+from planner.backend import primitives
+from planner.style import Style
+from planner.geometry import points_bbox
 
 
 class Polygon(Figure):
@@ -8,6 +10,8 @@ class Polygon(Figure):
     Polygon figure.
     """
 
+    __slots__ = ('points', 'attribs')
+
     DEFAULT_ATTRIBS = {"stroke": "#000", "stroke-width": "2", "fill": "#fff"}
 
     def __init__(self, points, **attribs):
@@ -15,10 +19,12 @@ class Polygon(Figure):
         `points` - iterable with tuples of coordinates (x, y)
         """
         self.points = points
-        self.attribs = self.DEFAULT_ATTRIBS.copy()
-        self.attribs.update(attribs)
+        self.attribs = Style.get(self.DEFAULT_ATTRIBS, attribs)
+
+    def _get_bbox(self):
+        return points_bbox(self.points)
 
-    def _draw(self):
+    def _primitives(self):
         res = []
-        res = shapes.Polygon(self.points, **self.attribs)
+        res = primitives.Polygon(self.points, **self.attribs)
         return res
@@ -1,30 +1,36 @@
 from planner.frame.figure import Figure
-from svgwrite import shapes
+from planner.backend import primitives
+from planner.style import Style
+from planner.geometry import points_bbox
 
 
 class Rect(Figure):
 
     """ Rectangle representation """
 
+    __slots__ = ('corner', 'size', 'attribs')
+
     def __init__(self, x=0, y=0, width=1, height=1, **attribs):
         """
         x, y - coordinates of left top corner
         """
         self.corner = (x, y)
         self.size = (width, height)
-        self.attribs = attribs
+        self.attribs = Style.get(attribs)
+
+    def _get_bbox(self):
+        return points_bbox([self.corner, (self.corner[0] + self.size[0], self.corner[1] + self.size[1])])
 
-    def _draw(self):
+    def _primitives(self):
         res = []
         rect_params = self.attribs.copy()
         if hasattr(self, "hatch") and self.hatch:
             rect_params['style'] = "fill: url(#{})".format(self._hatching_id)
-            res.append(self.hatch)
         if hasattr(self, "filling"):
             rect_params['fill'] = self.filling
         else:
             if 'fill' not in self.attribs:
                 rect_params['fill'] = "#fff"
-        rect = shapes.Rect(self.corner, self.size, **rect_params)
+        rect = primitives.Rect(self.corner, self.size, **rect_params)
         res.append(rect)
         return res
@@ -1,14 +1,25 @@
 from planner.frame.figure import Figure
 from planner.frame.aperture import Aperture
 from planner.frame.bulkhead import Bulkhead
-from svgwrite import shapes
+from planner.index import IntervalIndex
+from planner.geometry import group_touching_rects, rects_outline, points_bbox, match_segments, points_on_segments
+from planner.backend import primitives
+from planner.style import Style
+import numpy as np
 
 
 class RectFrame(Figure):
 
     """ Rectangle frame representation """
 
+    __slots__ = ('corner', 'size', 'inner_corner', 'inner_size', 'x', 'y', 'width', 'height', 'wall_width',
+                 'attribs', 'apertures', 'bulkheads', 'stroke_width', '_walls', '_apertures_index')
+
     DEFAULT_PARAMS = {"stroke": "#000", "stroke-width": "2"}
+    WALLS = ('left', 'top', 'right', 'bottom')
+    # attributes defining position of walls borders
+    _GEOMETRY = ('x', 'y', 'width', 'height', 'wall_width')
+    _DERIVED = ('_walls', '_apertures_index')
 
     def __init__(self, x=0, y=0, width=1, height=1, wall_width=1, **attribs):
         self.corner = (x, y)
@@ -20,19 +31,49 @@ class RectFrame(Figure):
         self.width = width
         self.height = height
         self.wall_width = wall_width
-        self.attribs = attribs or dict()
+        self.attribs = Style.get(attribs)
         self.apertures = []
         self.bulkheads = []
         self.stroke_width = attribs.get('stroke-width') or self.DEFAULT_PARAMS.get('stroke-width')
 
-    def _draw(self):
+    def __setattr__(self, name, value):
+        super(RectFrame, self).__setattr__(name, value)
+        if name in self._GEOMETRY:
+            # walls are moved, apertures index is rebuilt on next use
+            object.__setattr__(self, '_apertures_index', None)
+
+    def _after_load(self):
+        self._apertures_index = None
+
+    def _get_apertures_index(self):
+        """
+        Intervals of apertures on every wall (see `WALLS`), built on first use after change of geometry.
+        Apertures which are not located on walls borders (e.g. after moving of frame) are not indexed.
+        """
+        index = self._apertures_index
+        if index is None:
+            index = [IntervalIndex() for wall in self.WALLS]
+            walls = self._get_aperture_lines_coordinates()
+            for aperture in self.apertures:
+                wall_index = self._match_wall(aperture.start_point)
+                if wall_index is None:
+                    continue
+                vertical_wall = self._is_vertical_wall(walls[wall_index])
+                start = aperture.start_point[1] if vertical_wall else aperture.start_point[0]
+                index[wall_index].add(start, start + aperture.width, aperture)
+            object.__setattr__(self, '_apertures_index', index)
+        return index
+
+    def _children(self):
+        return self.apertures + self.bulkheads
+
+    def _primitives(self):
         rect_params = self.DEFAULT_PARAMS.copy()
         rect_params.update(self.attribs)
         res = []
         # Hatching and filling
         if hasattr(self, "hatch") and self.hatch:
             rect_params['style'] = "fill: url(#{})".format(self._hatching_id)
-            res.append(self.hatch)
         if hasattr(self, "filling"):
             rect_params['fill'] = self.filling
         else:
@@ -41,38 +82,87 @@ class RectFrame(Figure):
         # Create outer and inner rects
         del rect_params['stroke-width']
         del rect_params['stroke']
-        top_rect = shapes.Rect(self.corner, (self.size[0], self.wall_width), **rect_params)
-        left_rect = shapes.Rect(self.corner, (self.wall_width, self.size[1]), **rect_params)
-        right_rect = shapes.Rect(
+        top_rect = primitives.Rect(self.corner, (self.size[0], self.wall_width), **rect_params)
+        left_rect = primitives.Rect(self.corner, (self.wall_width, self.size[1]), **rect_params)
+        right_rect = primitives.Rect(
             (self.corner[0] + self.size[0] - self.wall_width, self.corner[1]),
             (self.wall_width, self.size[1]), **rect_params)
-        bottom_rect = shapes.Rect(
+        bottom_rect = primitives.Rect(
             (self.corner[0], self.corner[1] + self.size[1] - self.wall_width),
             (self.size[0], self.wall_width), **rect_params)
 
         inner_params = self.DEFAULT_PARAMS.copy()
         inner_params.update(self.attribs)
         inner_params['fill-opacity'] = "0"
-        rect = shapes.Rect(self.corner, self.size, **inner_params)
-        inner_rect = shapes.Rect(self.inner_corner, self.inner_size, **inner_params)
+        rect = primitives.Rect(self.corner, self.size, **inner_params)
+        inner_rect = primitives.Rect(self.inner_corner, self.inner_size, **inner_params)
         res.extend((top_rect, left_rect, right_rect, bottom_rect, rect, inner_rect))
         # Apertures
         if self.apertures:
             for aperture in self.apertures:
-                res.append(aperture._draw())
-        # Bulkheads
+                res.append(aperture._primitives())
+        # Bulkheads, intersecting bulkheads are drawn with common outline
         borders = []
         backgrounds = []
-        if self.bulkheads:
-            for bulkhead in self.bulkheads:
-                border, *background = bulkhead._draw()
+        merged = []
+        for group in self.bulkhead_groups():
+            if len(group) == 1:
+                border, *background = group[0]._primitives()
                 borders.append(border)
                 backgrounds.extend(background)
+            else:
+                merged.extend(bulkhead._background(inside_border=False) for bulkhead in group)
+                merged.append(self._create_bulkheads_outline(group))
         res.extend(borders)
         res.extend(backgrounds)
+        res.extend(merged)
+        return res
+
+    def _get_bbox(self):
+        return points_bbox([self.corner, (self.x + self.width, self.y + self.height)])
+
+    def bulkhead_groups(self):
+        """
+        Split bulkheads into groups of intersecting or touching bulkheads (walls topology).
+        Returns list of lists of bulkheads.
+        """
+        groups = group_touching_rects([bulkhead.rect for bulkhead in self.bulkheads])
+        return [[self.bulkheads[index] for index in group] for group in groups]
+
+    def bulkhead_outlines(self):
+        """
+        Outlines of groups of bulkheads (see `bulkhead_groups`) in the same order.
+        Every outline is a list of segments ((x1, y1), (x2, y2)).
+        """
+        return [rects_outline([bulkhead.rect for bulkhead in group]) for group in self.bulkhead_groups()]
+
+    def _create_bulkheads_outline(self, group):
+        segments = np.array(rects_outline([bulkhead.rect for bulkhead in group]), dtype=float).reshape(-1, 2)
+        params = group[0]._border_params()
+        params['fill'] = 'none'
+        # square caps close corners of outline
+        params['stroke-linecap'] = 'square'
+        return primitives.Path(primitives.PathData(segments, np.arange(0, len(segments) + 1, 2)), **params)
+
+    def _defs_primitives(self):
+        res = []
+        # Hatchings of frame and its bulkheads
+        for figure in [self] + self.bulkheads:
+            res.extend(Figure._defs_primitives(figure) or [])
         return res
 
     def _get_aperture_lines_coordinates(self):
+        """
+        Borders of walls for apertures placement in order of `WALLS`.
+        Calculated once per frame geometry.
+        """
+        geometry = (self.x, self.y, self.width, self.height, self.wall_width)
+        walls = getattr(self, '_walls', None)
+        if walls is None or walls[0] != geometry:
+            walls = self._walls = (geometry, self._create_aperture_lines_coordinates())
+        return walls[1]
+
+    def _create_aperture_lines_coordinates(self):
         outer_lines = []
         # left
         outer_lines.append(((self.x, self.y + self.wall_width), (self.x, self.y + self.height - self.wall_width)))
@@ -89,24 +179,130 @@ class RectFrame(Figure):
         return outer_lines
 
     def _is_point_on_lines(self, lines, point):
-        return any([self._is_point_on_line(p[0], p[1], point) for p in lines])
+        # single points are checked without numpy, arrays of points are matched by `_match_walls`
+        return any(self._is_point_on_line(start, end, point) for start, end in lines)
+
+    def _match_walls(self, points):
+        """
+        Indexes of walls (see `WALLS`) with borders containing points, -1 for points not on walls.
+        points - array of points with shape (n, 2)
+        """
+        walls = self._get_aperture_lines_coordinates()
+        return match_segments(points, [wall[0] for wall in walls], [wall[1] for wall in walls], self.TOLERANCE)
+
+    def _match_wall(self, point):
+        """
+        Index of wall (see `WALLS`) with border containing point or None.
+        """
+        for index, (wall_start, wall_end) in enumerate(self._get_aperture_lines_coordinates()):
+            if self._is_point_on_line(wall_start, wall_end, point):
+                return index
+        return None
+
+    @staticmethod
+    def _is_vertical_wall(wall):
+        return wall[0][0] == wall[1][0]
 
     def add_aperture(self, x, y, width, **attribs):
         """
         Add aperture (door, window, etc) to the wall.
         x, y - coordinates of left-top corner, should be located on wall border
+        Raise ValueError if aperture overlaps with one of apertures in the wall.
         """
-        outer_lines = self._get_aperture_lines_coordinates()
-        coords = (x, y)
+        wall_index = self._match_wall((x, y))
+        if wall_index is None:
+            raise ValueError("Coordinates {}, {} of aparture left corner not located on the wall border".format(x, y))
+        wall = self._get_aperture_lines_coordinates()[wall_index]
+        start = y if self._is_vertical_wall(wall) else x
+        index = self._get_apertures_index()[wall_index]
+        overlapping = index.find_overlapping(start, start + width)
+        if overlapping is not None:
+            raise ValueError("Aperture {}, {} overlaps with aperture {}, {}".format(x, y, *overlapping.start_point))
         # Propagate stroke-width
         if 'stroke-width' not in attribs:
             attribs['stroke-width'] = self.stroke_width
-        aperture = Aperture.match_wall_and_create(coords, width, outer_lines, self.wall_width, **attribs)
-        if not aperture:
-            raise ValueError("Coordinates {}, {} of aparture left corner not located on the wall border".format(x, y))
+        aperture = Aperture((x, y), width, wall[0], wall[1], self.wall_width, **attribs)
+        index.add(start, start + width, aperture)
+        aperture._parent = self
         self.apertures.append(aperture)
+        self.invalidate()
         return aperture
 
+    def add_apertures(self, apertures, **attribs):
+        """
+        Add many apertures at once, all of them are validated before adding.
+        apertures - sequence of (x, y, width), see `add_aperture`
+        attribs - attributes of all apertures
+        Raise ValueError if any aperture is not located on the wall border, exceeds it
+        or overlaps with other apertures.
+        Returns list of created apertures.
+        """
+        apertures = [tuple(aperture) for aperture in apertures]
+        if not apertures:
+            return []
+        values = np.array(apertures, dtype=float).reshape(-1, 3)
+        walls = self._get_aperture_lines_coordinates()
+        wall_indexes = self._match_walls(values[:, :2])
+        invalid = np.flatnonzero(wall_indexes < 0)
+        if len(invalid):
+            raise ValueError("Coordinates {}, {} of aperture left corner not located on the wall border".format(
+                *apertures[invalid[0]][:2]))
+        # apertures lay along walls, ends should be on the same walls
+        vertical = np.array([self._is_vertical_wall(wall) for wall in walls])[wall_indexes]
+        starts = np.where(vertical, values[:, 1], values[:, 0])
+        end_points = values[:, :2] + values[:, 2:] * np.column_stack((~vertical, vertical))
+        walls = np.array(walls, dtype=float)[wall_indexes]
+        invalid = np.flatnonzero(~points_on_segments(end_points, walls[:, 0], walls[:, 1], self.TOLERANCE))
+        if len(invalid):
+            raise ValueError("Aperture {}, {} width exceed wall sizes".format(*apertures[invalid[0]][:2]))
+        # new apertures ordered by walls and starts, neighbours shouldn't overlap
+        order = np.lexsort((starts, wall_indexes))
+        same_wall = wall_indexes[order[1:]] == wall_indexes[order[:-1]]
+        overlapping = same_wall & ((starts[order[1:]] < starts[order[:-1]] + values[order[:-1], 2]) |
+                                   (starts[order[1:]] == starts[order[:-1]]))
+        invalid = np.flatnonzero(overlapping)
+        if len(invalid):
+            first, second = apertures[order[invalid[0]]], apertures[order[invalid[0] + 1]]
+            raise ValueError("Aperture {}, {} overlaps with aperture {}, {}".format(
+                second[0], second[1], first[0], first[1]))
+        index = self._get_apertures_index()
+        for (x, y, width), wall_index, vertical_wall in zip(apertures, wall_indexes.tolist(), vertical.tolist()):
+            start = y if vertical_wall else x
+            overlapping = index[wall_index].find_overlapping(start, start + width)
+            if overlapping is not None:
+                raise ValueError("Aperture {}, {} overlaps with aperture {}, {}".format(
+                    x, y, *overlapping.start_point))
+        # Propagate stroke-width
+        if 'stroke-width' not in attribs:
+            attribs['stroke-width'] = self.stroke_width
+        walls = self._get_aperture_lines_coordinates()
+        res = []
+        for (x, y, width), wall_index, vertical_wall in zip(apertures, wall_indexes.tolist(), vertical.tolist()):
+            wall = walls[wall_index]
+            aperture = Aperture((x, y), width, wall[0], wall[1], self.wall_width, **attribs)
+            start = y if vertical_wall else x
+            index[wall_index].add(start, start + width, aperture)
+            aperture._parent = self
+            res.append(aperture)
+        self.apertures.extend(res)
+        self.invalidate()
+        return res
+
+    def free_spans(self, wall, min_width=0):
+        """
+        Free parts of wall border (without apertures) not narrower than `min_width`.
+        wall - name of wall: "left", "top", "right" or "bottom"
+        Returns list of tuples (x, y, width), suitable for `add_aperture` arguments.
+        """
+        wall_index = self.WALLS.index(wall)
+        wall_start, wall_end = self._get_aperture_lines_coordinates()[wall_index]
+        index = self._get_apertures_index()[wall_index]
+        if self._is_vertical_wall((wall_start, wall_end)):
+            spans = index.free_spans(wall_start[1], wall_end[1], min_width)
+            return [(wall_start[0], start, end - start) for start, end in spans]
+        spans = index.free_spans(wall_start[0], wall_end[0], min_width)
+        return [(start, wall_start[1], end - start) for start, end in spans]
+
     def add_bulkhead(self, x, y, width, **attribs):
         """
         Add bulkhead to current frame,
@@ -128,5 +324,7 @@ class RectFrame(Figure):
         if 'stroke-width' not in attribs:
             attribs['stroke-width'] = self.stroke_width
         bulkhead = Bulkhead((x, y), end_point, **attribs)
+        bulkhead._parent = self
         self.bulkheads.append(bulkhead)
+        self.invalidate()
         return bulkhead
@@ -1,5 +1,5 @@
 from planner.frame.figure import Figure
-from svgwrite import shapes, text
+from planner.backend import primitives
 
 
 class SampleTitle(Figure):
@@ -8,6 +8,8 @@ class SampleTitle(Figure):
     Sample title block.
     """
 
+    __slots__ = ('width', 'height', 'title')
+
     LINE_ATTRIBS = {"stroke-width": 0.5, "stroke": "#000", "fill-opacity": 0}
     DEFAULT_LABEL_ATTRIBS = {"font-size": 7, "text-anchor": "middle", "font-family": "Arial"}
 
@@ -16,28 +18,32 @@ class SampleTitle(Figure):
         self.height = height
         self.title = title
 
+    def _get_bbox(self):
+        # borders contain everything
+        return (20, 10, self.width - 10, self.height - 10)
+
     def _get_table_line(self, start, end):
         """
         Create table line with relative coordinates
         """
         base = (self.width - 10 - 185, self.height - 10 - 55)
-        return shapes.Line((start[0] + base[0], start[1] + base[1]),
-                           (end[0] + base[0], end[1] + base[1]), **self.LINE_ATTRIBS)
+        return primitives.Line((start[0] + base[0], start[1] + base[1]),
+                               (end[0] + base[0], end[1] + base[1]), **self.LINE_ATTRIBS)
 
     def _get_borders(self):
         left_top = (20, 10)
         right_top = (self.width - 10, 10)
         left_bottom = (20, self.height - 10)
         right_bottom = (self.width - 10, self.height - 10)
-        return shapes.Polygon([left_top, right_top, right_bottom, left_bottom, left_top], **self.LINE_ATTRIBS)
+        return primitives.Polygon([left_top, right_top, right_bottom, left_bottom, left_top], **self.LINE_ATTRIBS)
 
-    def _draw(self):
+    def _primitives(self):
         res = []
         # Borders
         res.append(self._get_borders())
         # Title table
         title_insert_point = (self.width - 10 - 185, self.height - 10 - 55)
-        res.append(shapes.Rect(title_insert_point, (185, 55), **self.LINE_ATTRIBS))
+        res.append(primitives.Rect(title_insert_point, (185, 55), **self.LINE_ATTRIBS))
         res.append(self._get_table_line((0, 5), (65, 5)))
         res.append(self._get_table_line((0, 10), (65, 10)))
         res.append(self._get_table_line((0, 15), (185, 15)))
@@ -66,7 +72,7 @@ class SampleTitle(Figure):
         res.append(self._get_table_line((155, 35), (155, 40)))
 
         # Text
-        res.append(text.Text(self.title,
+        res.append(primitives.Text(self.title,
                    (title_insert_point[0] + 100, title_insert_point[1] + 30), **self.DEFAULT_LABEL_ATTRIBS))
         return res
 
@@ -77,6 +83,8 @@ class SampleLogoTitle(SampleTitle):
     Sample title block with logo.
     """
 
+    __slots__ = ('project_title', 'field_title', 'field_value', '_base_point')
+
     DEFAULT_LABEL_ATTRIBS = {"font-size": 5, "text-anchor": "middle", "font-family": "Arial"}
 
     def __init__(self, width, height, title="Sample drawning",
@@ -91,16 +99,16 @@ class SampleLogoTitle(SampleTitle):
         """
         Create table line with relative coordinates
         """
-        return shapes.Line((start[0] + self._base_point[0], start[1] + self._base_point[1]),
-                           (end[0] + self._base_point[0], end[1] + self._base_point[1]), **self.LINE_ATTRIBS)
+        return primitives.Line((start[0] + self._base_point[0], start[1] + self._base_point[1]),
+                               (end[0] + self._base_point[0], end[1] + self._base_point[1]), **self.LINE_ATTRIBS)
 
     def _get_logo(self):
         """
-        Return list of svg elements represented company logo
+        Return list of primitives (or svgwrite objects) represented company logo
         """
         return None
 
-    def _draw(self):
+    def _primitives(self):
         res = []
         # Borders
         res.append(self._get_borders())
@@ -114,16 +122,16 @@ class SampleLogoTitle(SampleTitle):
         # Text
         # project title
         project_title_insert_point = (self.width - 30 - 195, self._base_point[1] + 11)
-        res.append(text.Text(self.project_title, project_title_insert_point, **self.DEFAULT_LABEL_ATTRIBS))
+        res.append(primitives.Text(self.project_title, project_title_insert_point, **self.DEFAULT_LABEL_ATTRIBS))
         # drawing title
         title_insert_point = (self.width - 30 - 95, self._base_point[1] + 15)
-        res.append(text.Text(self.title, title_insert_point, **self.DEFAULT_LABEL_ATTRIBS))
+        res.append(primitives.Text(self.title, title_insert_point, **self.DEFAULT_LABEL_ATTRIBS))
         # field title
         field_title_insert_point = (self.width - 10 - 255, self._base_point[1] + 23)
-        res.append(text.Text(self.field_title, field_title_insert_point, **self.DEFAULT_LABEL_ATTRIBS))
+        res.append(primitives.Text(self.field_title, field_title_insert_point, **self.DEFAULT_LABEL_ATTRIBS))
         # field value
         field_value_insert_point = (self.width - 10 - 205, self._base_point[1] + 23)
-        res.append(text.Text(self.field_value, field_value_insert_point, **self.DEFAULT_LABEL_ATTRIBS))
+        res.append(primitives.Text(self.field_value, field_value_insert_point, **self.DEFAULT_LABEL_ATTRIBS))
         # Logo
         logo = self._get_logo()
         if logo is not None:
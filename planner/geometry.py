@@ -0,0 +1,383 @@
+"""
+Geometric algorithms on figures coordinates.
+Rectangles are axis-aligned and specified as tuples (x0, y0, x1, y1) with x0 <= x1 and y0 <= y1.
+"""
+from heapq import heappush, heappop
+import numpy as np
+import math
+
+# max distance between point and segment (in plan units) to consider point lying on segment
+TOLERANCE = 1e-6
+# max count of point-segment pairs checked at once by `match_segments`
+MATCH_CHUNK_SIZE = 2 ** 20
+
+
+class _IntervalTree(object):
+
+    """
+    Segment tree over sorted coordinates storing closed intervals [start, end] (indexes of coordinates).
+    Reports stored intervals intersecting or touching query interval in O(log m + k log m).
+    """
+
+    __slots__ = ('size', 'stored', 'total')
+
+    def __init__(self, count):
+        self.size = 1
+        while self.size < count:
+            self.size *= 2
+        # keys of intervals stored in node (interval covers node range) and count of stored keys in subtree
+        self.stored = [None] * (2 * self.size)
+        self.total = [0] * (2 * self.size)
+
+    def _update(self, start, end, key, add):
+        stored, total = self.stored, self.total
+        left, right = start + self.size, end + self.size + 1
+        while left < right:
+            for node in ((left,) if left & 1 else ()) + ((right - 1,) if right & 1 else ()):
+                if add:
+                    if stored[node] is None:
+                        stored[node] = set()
+                    stored[node].add(key)
+                    total[node] += 1
+                else:
+                    stored[node].discard(key)
+                    total[node] -= 1
+            left = (left + 1) >> 1
+            right >>= 1
+        # canonical nodes are on the paths from bounds to root or are children of nodes on these paths
+        for node in ((start + self.size) >> 1, (end + self.size) >> 1):
+            while node:
+                total[node] = len(stored[node] or ()) + total[2 * node] + total[2 * node + 1]
+                node >>= 1
+
+    def insert(self, start, end, key):
+        self._update(start, end, key, True)
+
+    def remove(self, start, end, key):
+        self._update(start, end, key, False)
+
+    def query(self, start, end):
+        """
+        Set of keys of intervals intersecting or touching interval [start, end].
+        """
+        stored, total = self.stored, self.total
+        found = set()
+        stack = [(1, 0, self.size - 1)]
+        while stack:
+            node, low, high = stack.pop()
+            if not total[node] or high < start or end < low:
+                continue
+            if stored[node]:
+                found.update(stored[node])
+            if node < self.size:
+                middle = (low + high) // 2
+                stack.append((2 * node, low, middle))
+                stack.append((2 * node + 1, middle + 1, high))
+        return found
+
+
+def find_touching_rects(rects):
+    """
+    Find pairs of intersecting or touching rectangles with sweep line along x axis,
+    rectangles crossing sweep line are kept in interval tree along y axis, so search takes O((n + k) log n).
+    Returns list of pairs of indexes of rectangles.
+    """
+    ys = sorted(set(y for rect in rects for y in (rect[1], rect[3])))
+    y_indexes = dict((y, index) for index, y in enumerate(ys))
+    tree = _IntervalTree(len(ys))
+    order = sorted(range(len(rects)), key=lambda index: rects[index][0])
+    # rectangles crossing sweep line, heap by right side
+    active = []
+    pairs = []
+    for index in order:
+        x0, y0, x1, y1 = rects[index]
+        while active and active[0][0] < x0:
+            other = heappop(active)[1]
+            tree.remove(y_indexes[rects[other][1]], y_indexes[rects[other][3]], other)
+        start, end = y_indexes[y0], y_indexes[y1]
+        for other in sorted(tree.query(start, end)):
+            pairs.append((other, index))
+        tree.insert(start, end, index)
+        heappush(active, (x1, index))
+    return pairs
+
+
+def group_touching_rects(rects):
+    """
+    Split rectangles into groups of intersecting or touching (directly or through other rectangles) ones.
+    Returns list of lists of indexes ordered by first index.
+    """
+    parents = list(range(len(rects)))
+
+    def find(index):
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    for first, second in find_touching_rects(rects):
+        first, second = find(first), find(second)
+        if first != second:
+            parents[max(first, second)] = min(first, second)
+    groups = {}
+    for index in range(len(rects)):
+        groups.setdefault(find(index), []).append(index)
+    return sorted(groups.values())
+
+
+class _CoverageTree(object):
+
+    """
+    Segment tree counting coverage of elementary segments between sorted coordinates by intervals.
+    """
+
+    __slots__ = ('size', 'count', 'full', 'empty')
+
+    def __init__(self, count):
+        self.size = 1
+        while self.size < count:
+            self.size *= 2
+        # count of intervals covering node range, node range is fully covered, node subtree has no intervals
+        self.count = [0] * (2 * self.size)
+        self.full = [False] * (2 * self.size)
+        self.empty = [True] * (2 * self.size)
+
+    def _pull(self, node):
+        if node < self.size:
+            children = (2 * node, 2 * node + 1)
+            self.full[node] = self.count[node] > 0 or all(self.full[child] for child in children)
+            self.empty[node] = self.count[node] == 0 and all(self.empty[child] for child in children)
+        else:
+            self.full[node] = self.count[node] > 0
+            self.empty[node] = self.count[node] == 0
+
+    def add(self, start, end, delta):
+        """
+        Change coverage of elementary segments [start, end) by delta.
+        """
+        if start >= end:
+            return
+        left, right = start + self.size, end + self.size
+        nodes = []
+        while left < right:
+            if left & 1:
+                nodes.append(left)
+                left += 1
+            if right & 1:
+                right -= 1
+                nodes.append(right)
+            left >>= 1
+            right >>= 1
+        for node in nodes:
+            self.count[node] += delta
+            self._pull(node)
+        for node in ((start + self.size) >> 1, (end - 1 + self.size) >> 1):
+            while node:
+                self._pull(node)
+                node >>= 1
+
+    def uncovered(self, start, end):
+        """
+        Runs [start, end) of uncovered elementary segments in range [start, end), ordered and joined.
+        """
+        runs = []
+        stack = [(1, 0, self.size)]
+        while stack:
+            node, low, high = stack.pop()
+            if high <= start or end <= low or self.full[node]:
+                continue
+            if self.empty[node]:
+                low, high = max(low, start), min(high, end)
+                if runs and runs[-1][1] == low:
+                    runs[-1][1] = high
+                else:
+                    runs.append([low, high])
+                continue
+            middle = (low + high) // 2
+            # the left child is processed first
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+        return runs
+
+
+def _merge_intervals(intervals):
+    """
+    Union of intervals (start, end) as sorted list of disjoint intervals (touching ones are joined).
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _xor_intervals(first, second):
+    """
+    Symmetric difference of sorted lists of disjoint intervals.
+    """
+    events = sorted([(start, 1) for start, end in first + second] + [(end, -1) for start, end in first + second])
+    result = []
+    depth = 0
+    position = None
+    for coordinate, delta in events:
+        if depth == 1 and position < coordinate:
+            if result and result[-1][1] == position:
+                result[-1][1] = coordinate
+            else:
+                result.append([position, coordinate])
+        depth += delta
+        position = coordinate
+    return result
+
+
+def _outline_edges(rects, vertical):
+    """
+    Edges of outline of union of rectangles perpendicular to x axis (or to y axis if vertical is False)
+    found with sweep line: at every position boundary is where coverage by rectangles ending and starting here
+    differs and there is no rectangle crossing sweep line.
+    """
+    if not vertical:
+        rects = [(y0, x0, y1, x1) for x0, y0, x1, y1 in rects]
+    ys = sorted(set(y for rect in rects for y in (rect[1], rect[3])))
+    y_indexes = dict((y, index) for index, y in enumerate(ys))
+    tree = _CoverageTree(len(ys) - 1)
+    events = {}
+    for index, rect in enumerate(rects):
+        events.setdefault(rect[0], ([], []))[0].append(index)
+        events.setdefault(rect[2], ([], []))[1].append(index)
+    segments = []
+    for x in sorted(events):
+        starting, ending = events[x]
+        for index in ending:
+            tree.add(y_indexes[rects[index][1]], y_indexes[rects[index][3]], -1)
+        # now only rectangles crossing sweep line are in the tree
+        candidates = _xor_intervals(
+            _merge_intervals((y_indexes[rects[index][1]], y_indexes[rects[index][3]]) for index in ending),
+            _merge_intervals((y_indexes[rects[index][1]], y_indexes[rects[index][3]]) for index in starting))
+        runs = []
+        for start, end in candidates:
+            for run in tree.uncovered(start, end):
+                if runs and runs[-1][1] == run[0]:
+                    runs[-1][1] = run[1]
+                else:
+                    runs.append(run)
+        for start, end in runs:
+            if vertical:
+                segments.append(((x, ys[start]), (x, ys[end])))
+            else:
+                segments.append(((ys[start], x), (ys[end], x)))
+        for index in starting:
+            tree.add(y_indexes[rects[index][1]], y_indexes[rects[index][3]], 1)
+    return segments
+
+
+def rects_outline(rects):
+    """
+    Outline of union of rectangles: list of segments ((x1, y1), (x2, y2)),
+    collinear adjacent edges are joined.
+    Edges are found with sweep lines and coverage segment trees in O((n + k) log n), k - count of segments.
+    """
+    rects = [rect for rect in rects if rect[0] < rect[2] and rect[1] < rect[3]]
+    if not rects:
+        return []
+    return _outline_edges(rects, True) + _outline_edges(rects, False)
+
+
+def union_bboxes(bboxes):
+    """
+    Bounding box containing all specified bounding boxes (None items are skipped).
+    Returns None if there is nothing to bound.
+    """
+    bboxes = [bbox for bbox in bboxes if bbox is not None]
+    if not bboxes:
+        return None
+    return (min(bbox[0] for bbox in bboxes), min(bbox[1] for bbox in bboxes),
+            max(bbox[2] for bbox in bboxes), max(bbox[3] for bbox in bboxes))
+
+
+def points_bbox(points):
+    """
+    Bounding box of sequence (or array) of points (x, y), None for empty sequence.
+    """
+    if isinstance(points, np.ndarray):
+        if not len(points):
+            return None
+        x0, y0 = points.min(axis=0).tolist()
+        x1, y1 = points.max(axis=0).tolist()
+        return (x0, y0, x1, y1)
+    points = list(points)
+    if not points:
+        return None
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def bboxes_intersect(first, second):
+    """
+    Check that bounding boxes intersect or touch each other.
+    """
+    return first[0] <= second[2] and second[0] <= first[2] and first[1] <= second[3] and second[1] <= first[3]
+
+
+def is_point_on_segment(start, end, point, tolerance=TOLERANCE):
+    """
+    Check that point lies on segment (start, end): distance from point to segment is not greater than tolerance.
+    """
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    px, py = point[0] - start[0], point[1] - start[1]
+    squared_length = dx * dx + dy * dy
+    if not squared_length:
+        return px * px + py * py <= tolerance * tolerance
+    # distance to line is |cross product| / length
+    cross = px * dy - py * dx
+    if cross * cross > tolerance * tolerance * squared_length:
+        return False
+    # projection to line is dot product / length
+    margin = tolerance * math.sqrt(squared_length)
+    dot = px * dx + py * dy
+    return -margin <= dot <= squared_length + margin
+
+
+def points_on_segments(points, starts, ends, tolerance=TOLERANCE):
+    """
+    Vectorized `is_point_on_segment`: arrays of points, segment starts and ends
+    with shapes (..., 2) are broadcast against each other.
+    Returns boolean array.
+    """
+    points = np.asarray(points, dtype=float)
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+    dx, dy = ends[..., 0] - starts[..., 0], ends[..., 1] - starts[..., 1]
+    px, py = points[..., 0] - starts[..., 0], points[..., 1] - starts[..., 1]
+    squared_length = dx * dx + dy * dy
+    margin = tolerance * np.sqrt(squared_length)
+    cross = px * dy - py * dx
+    dot = px * dx + py * dy
+    on_segment = (np.abs(cross) <= margin) & (dot >= -margin) & (dot <= squared_length + margin)
+    # degenerate segments are points
+    return np.where(squared_length > 0, on_segment, px * px + py * py <= tolerance * tolerance)
+
+
+def match_segments(points, starts, ends, tolerance=TOLERANCE):
+    """
+    Find segment containing every point (see `is_point_on_segment`).
+    points - array of n points with shape (n, 2)
+    starts, ends - arrays of m segments ends with shape (m, 2)
+    Returns integer array of n indexes of the first segment containing point, -1 for points not on segments.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    res = -np.ones(len(points), dtype=int)
+    if not len(starts):
+        return res
+    chunk_size = max(1, MATCH_CHUNK_SIZE // len(starts))
+    for chunk_start in range(0, len(points), chunk_size):
+        chunk = points[chunk_start:chunk_start + chunk_size]
+        matches = points_on_segments(chunk[:, None, :], starts[None, :, :], ends[None, :, :], tolerance)
+        found = matches.any(axis=1)
+        res[chunk_start:chunk_start + len(chunk)][found] = matches.argmax(axis=1)[found]
+    return res
@@ -0,0 +1,181 @@
+"""
+Index structures for fast geometric queries.
+"""
+from planner.geometry import bboxes_intersect
+from bisect import bisect_left, bisect_right
+import math
+
+
+class IntervalIndex(object):
+
+    """
+    Sorted set of non-overlapping intervals [start, end] on a line with items attached.
+    Intervals can touch each other by ends.
+    Lookups are O(log n), insertion and removal are O(n): position is found with bisect,
+    but items of sorted lists are shifted (fast memory move, apertures of one wall are few).
+    """
+
+    __slots__ = ('_starts', '_ends', '_items')
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self._items = []
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        """
+        Iterate over triples (start, end, item) in order of intervals.
+        """
+        return zip(self._starts, self._ends, self._items)
+
+    def find_overlapping(self, start, end):
+        """
+        Item of interval overlapping with [start, end] (touching intervals don't overlap)
+        or None if interval is free.
+        """
+        position = bisect_right(self._starts, start)
+        # previous interval starts before (or at) start and can reach it
+        if position and (self._ends[position - 1] > start or self._starts[position - 1] == start):
+            return self._items[position - 1]
+        # next interval starts after start and can start before end
+        if position < len(self._starts) and self._starts[position] < end:
+            return self._items[position]
+        return None
+
+    def add(self, start, end, item):
+        """
+        Add interval [start, end] with item attached.
+        Raise ValueError if it overlaps with one of intervals in index.
+        """
+        if end < start:
+            raise ValueError("Interval end should not precede its start")
+        if self.find_overlapping(start, end) is not None:
+            raise ValueError("Interval {}-{} overlaps with existing interval".format(start, end))
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._ends.insert(position, end)
+        self._items.insert(position, item)
+
+    def remove(self, start, item):
+        """
+        Remove interval with specified start and item.
+        """
+        position = bisect_left(self._starts, start)
+        while position < len(self._starts) and self._starts[position] == start:
+            if self._items[position] is item:
+                del self._starts[position], self._ends[position], self._items[position]
+                return
+            position += 1
+        raise ValueError("Interval is not found in index")
+
+    def free_spans(self, start, end, min_length=0):
+        """
+        List of free spans (start, end) inside of [start, end] not shorter than `min_length`.
+        """
+        spans = []
+        position = max(bisect_right(self._starts, start) - 1, 0)
+        current = start
+        while position < len(self._starts) and self._starts[position] < end:
+            if self._ends[position] > current:
+                if self._starts[position] - current >= min_length and self._starts[position] > current:
+                    spans.append((current, self._starts[position]))
+                current = self._ends[position]
+            position += 1
+        if end - current >= min_length and end > current:
+            spans.append((current, end))
+        return spans
+
+
+class GridIndex(object):
+
+    """
+    Spatial index of items with bounding boxes (x0, y0, x1, y1) on uniform grid of square cells.
+    Every item is referenced from cells overlapped by its bounding box,
+    items without bounding box or covering too many cells are checked on every query.
+    Query results are ordered by keys of items.
+    """
+
+    __slots__ = ('cell_size', '_cells', '_items', '_large')
+
+    # max count of cells referencing one item
+    MAX_ITEM_CELLS = 64
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError("Cell size should be positive number")
+        self.cell_size = cell_size
+        self._cells = {}
+        # item -> (key, bbox, cells)
+        self._items = {}
+        self._large = set()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def _get_cells(self, bbox):
+        x0, y0, x1, y1 = [int(math.floor(value / self.cell_size)) for value in bbox]
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    def insert(self, item, bbox, key=None):
+        """
+        Insert item (or update bounding box of item already in index).
+        key - value used for ordering of query results (e.g. position of item),
+            key of item already in index is kept by default
+        """
+        if item in self._items:
+            if key is None:
+                key = self._items[item][0]
+            self.remove(item)
+        cells = None
+        if bbox is not None and not self._is_large(bbox):
+            cells = self._get_cells(bbox)
+            for cell in cells:
+                self._cells.setdefault(cell, set()).add(item)
+        else:
+            self._large.add(item)
+        self._items[item] = (key or 0, bbox, cells)
+
+    def _is_large(self, bbox):
+        columns = math.floor(bbox[2] / self.cell_size) - math.floor(bbox[0] / self.cell_size) + 1
+        rows = math.floor(bbox[3] / self.cell_size) - math.floor(bbox[1] / self.cell_size) + 1
+        return columns * rows > self.MAX_ITEM_CELLS
+
+    def remove(self, item):
+        key, bbox, cells = self._items.pop(item)
+        if cells is None:
+            self._large.discard(item)
+            return
+        for cell in cells:
+            items = self._cells[cell]
+            items.discard(item)
+            if not items:
+                del self._cells[cell]
+
+    def query(self, bbox):
+        """
+        Items with bounding boxes intersecting (or touching) specified bounding box
+        and items without bounding box, ordered by keys.
+        """
+        candidates = set(self._large)
+        x0, y0, x1, y1 = [int(math.floor(value / self.cell_size)) for value in bbox]
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            # query covers more cells than index has, check filled cells only
+            for (x, y), items in self._cells.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    candidates.update(items)
+        else:
+            for cell in self._get_cells(bbox):
+                candidates.update(self._cells.get(cell, ()))
+        res = []
+        for item in candidates:
+            key, item_bbox, cells = self._items[item]
+            if item_bbox is None or bboxes_intersect(item_bbox, bbox):
+                res.append((key, item))
+        res.sort(key=lambda pair: pair[0])
+        return [item for key, item in res]
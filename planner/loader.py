@@ -0,0 +1,450 @@
+"""
+Declarative plans import from JSON specs.
+
+Spec is a JSON object with drawing settings (arguments of `Drawing`) and list of figures:
+
+    {"size": "A3", "precision": 0.01, "figures": [
+        {"type": "RectFrame", "x": 50, "y": 50, "width": 210, "height": 145, "wall_width": 10,
+         "attribs": {"stroke-width": "1"}, "hatching": {"angle": 45, "distance": 4},
+         "apertures": [{"x": 50, "y": 70, "width": 40}],
+         "bulkheads": [{"x": 145, "y": 60, "width": 10, "filling": "#ccc"}]},
+        {"type": "LinearDimension", "start_point": [155, 100], "end_point": [250, 100], "label": "95"}]}
+
+Figure spec contains arguments of figure class (see `FIGURE_TYPES`), SVG attributes ("attribs"),
+hatching (arguments of `Figure.add_hatching`) or filling color.
+Settings should precede figures list.
+
+Spec is parsed incrementally: only the current figure spec is kept in memory as text,
+figures are validated in batches before construction.
+"""
+from planner.drawing import Drawing
+from planner.frame.batches import LineBatch, PolygonBatch
+from planner.frame.dimension import (LinearDimension, ExtensionableLinearDimension, TinyExtensionableLinearDimension,
+                                     AngleDimension, DimensionSet)
+from planner.frame.line import Line
+from planner.frame.polygon import Polygon
+from planner.frame.rect import Rect
+from planner.frame.rect_frame import RectFrame
+from planner.frame.title import SampleTitle, SampleLogoTitle
+from planner.frame.figure import Figure
+import codecs
+import io
+import inspect
+import json
+
+
+FIGURE_TYPES = {cls.__name__: cls for cls in (
+    RectFrame, Rect, Line, Polygon, LineBatch, PolygonBatch, LinearDimension, ExtensionableLinearDimension,
+    TinyExtensionableLinearDimension, AngleDimension, DimensionSet, SampleTitle, SampleLogoTitle)}
+
+# parameters of nested elements of frames
+ELEMENT_PARAMS = {
+    "apertures": ("x", "y", "width", "attribs"),
+    "bulkheads": ("x", "y", "width", "attribs", "hatching", "filling")}
+
+# types of values of parameters of figures, elements and hatching (see `_TYPE_CHECKS`),
+# values of other parameters are checked by figures constructors
+PARAM_TYPES = {
+    "x": "number", "y": "number", "width": "number", "height": "number", "wall_width": "number",
+    "direction": "number", "extension_size": "number", "elongation": "number", "chunk_size": "number",
+    "angle": "number", "distance": "number",
+    "start_point": "point", "end_point": "point",
+    "points": "points", "start_points": "points", "end_points": "points",
+    "segments": "segments",
+    "directions": "numbers", "extension_sizes": "numbers",
+    "label": "text", "labels": "texts",
+    "title": "string", "project_title": "string", "field_title": "string", "field_value": "string",
+    "label_position": "string", "color": "string",
+    "label_attribs": "object"}
+
+# max count of errors in message of validation error
+MAX_ERRORS = 10
+
+
+class _JSONStream(object):
+
+    """
+    Incremental reader of JSON values from text or binary file-like object.
+    Consumed text is dropped from buffer.
+    """
+
+    _decoder = json.JSONDecoder()
+    _whitespace = ' \t\n\r'
+    # chars which can continue number (empty string is the end of buffer)
+    _number_chars = ('', '.', 'e', 'E', '+', '-') + tuple('0123456789')
+
+    def __init__(self, fileobj, chunk_size):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self._utf8 = None
+
+    def _fill(self, size):
+        """
+        Read more text, returns False at the end of file.
+        """
+        if self.eof:
+            return False
+        chunk = self.fileobj.read(size)
+        if isinstance(chunk, bytes):
+            if self._utf8 is None:
+                self._utf8 = codecs.getincrementaldecoder('utf-8')()
+            chunk = self._utf8.decode(chunk, not chunk)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """
+        Next non-whitespace char or empty string at the end of file.
+        """
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in self._whitespace:
+                self.position += 1
+            if self.position < len(self.buffer) or not self._fill(self.chunk_size):
+                return self.buffer[self.position:self.position + 1]
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError("Invalid plan spec: expected {!r}, found {!r}".format(chars[0], char or 'end of file'))
+        self.position += 1
+        return char
+
+    def value(self):
+        """
+        Decode next JSON value.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.position)
+            except ValueError:
+                # value is incomplete, read bigger chunks to keep parsing of huge values linear
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # number can be truncated by the end of buffer
+            truncated = (isinstance(value, (int, float)) and not isinstance(value, bool) and
+                         self.buffer[end:end + 1] in self._number_chars)
+            if not truncated or not self._fill(size):
+                self.position = end
+                return value
+
+
+def _parse_spec(stream):
+    """
+    Generate pairs (settings, figure spec), figure spec is None for the first pair.
+    """
+    stream.expect('{')
+    settings = {}
+    figures = False
+    if stream.peek() == '}':
+        stream.expect('}')
+    else:
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if key == "figures":
+                figures = True
+                yield settings, None
+                stream.expect('[')
+                if stream.peek() == ']':
+                    stream.expect(']')
+                else:
+                    while True:
+                        yield settings, stream.value()
+                        if stream.expect(',]') == ']':
+                            break
+            elif figures:
+                raise ValueError("Invalid plan spec: drawing settings should precede figures")
+            else:
+                settings[key] = stream.value()
+            if stream.expect(',}') == '}':
+                break
+    if stream.peek():
+        raise ValueError("Invalid plan spec: extra data after plan")
+    if not figures:
+        yield settings, None
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_point(value):
+    return isinstance(value, list) and len(value) == 2 and all(_is_number(item) for item in value)
+
+
+def _is_text(value):
+    return isinstance(value, str) or _is_number(value)
+
+
+# type -> (check of value, description of type)
+_TYPE_CHECKS = {
+    "number": (_is_number, "a number"),
+    "point": (_is_point, "a point [x, y]"),
+    "points": (lambda value: isinstance(value, list) and all(_is_point(item) for item in value),
+               "a list of points [x, y]"),
+    "segments": (lambda value: isinstance(value, list) and all(
+        isinstance(item, list) and (len(item) == 2 and all(_is_point(point) for point in item) or
+                                    len(item) == 4 and all(_is_number(number) for number in item))
+        for item in value), "a list of segments [[x1, y1], [x2, y2]]"),
+    "numbers": (lambda value: _is_number(value) or isinstance(value, list) and all(
+        _is_number(item) for item in value), "a number or a list of numbers"),
+    "text": (_is_text, "a string"),
+    "texts": (lambda value: isinstance(value, list) and all(_is_text(item) for item in value), "a list of strings"),
+    "string": (lambda value: isinstance(value, str), "a string"),
+    "object": (lambda value: value is None or isinstance(value, dict), "an object")}
+
+
+_PARAMETERS = {}
+
+
+def _get_parameters(function):
+    """
+    Tuple (names of parameters, names of required parameters, accepts keyword arguments).
+    """
+    parameters = _PARAMETERS.get(function)
+    if parameters is None:
+        names, required, keywords = [], [], False
+        for name, parameter in inspect.signature(function).parameters.items():
+            if parameter.kind == parameter.VAR_KEYWORD:
+                keywords = True
+            elif name != 'self' and parameter.kind != parameter.VAR_POSITIONAL:
+                names.append(name)
+                if parameter.default is parameter.empty:
+                    required.append(name)
+        parameters = _PARAMETERS[function] = (names, required, keywords)
+    return parameters
+
+
+def _check_params(spec, names, required, path):
+    """
+    Check names of parameters in spec, yields error messages.
+    """
+    for name in required:
+        if name not in spec:
+            yield "{}: missing parameter {!r}".format(path, name)
+    for name in spec:
+        if name not in names:
+            yield "{}: unknown parameter {!r}".format(path, name)
+
+
+def _check_values(spec, path):
+    """
+    Check types of values of parameters in spec (see `PARAM_TYPES`), yields error messages.
+    """
+    for name, value in spec.items():
+        value_type = PARAM_TYPES.get(name)
+        if value_type is not None:
+            check, description = _TYPE_CHECKS[value_type]
+            if not check(value):
+                yield "{}: {} should be {}".format(path, name, description)
+
+
+def _check_decoration(spec, path):
+    """
+    Check attribs, hatching and filling in spec, yields error messages.
+    """
+    if not isinstance(spec.get('attribs', {}), dict):
+        yield "{}: attribs should be an object".format(path)
+    hatching = spec.get('hatching', {})
+    if not isinstance(hatching, dict):
+        yield "{}: hatching should be an object".format(path)
+    else:
+        names = _get_parameters(Figure.add_hatching)[0]
+        for message in _check_params(hatching, names, (), path + ".hatching"):
+            yield message
+        for message in _check_values(hatching, path + ".hatching"):
+            yield message
+    if not isinstance(spec.get('filling', ''), str):
+        yield "{}: filling should be a string".format(path)
+
+
+def _check_element(spec, params, path):
+    """
+    Check spec of aperture or bulkhead, yields error messages.
+    """
+    if not isinstance(spec, dict):
+        yield "{}: should be an object".format(path)
+        return
+    for message in _check_params(spec, params, params[:3], path):
+        yield message
+    for message in _check_values(spec, path):
+        yield message
+    for message in _check_decoration(spec, path):
+        yield message
+
+
+def _check_figure(spec, path):
+    """
+    Check figure spec, yields error messages.
+    """
+    if not isinstance(spec, dict):
+        yield "{}: figure should be an object".format(path)
+        return
+    cls = FIGURE_TYPES.get(spec.get('type'))
+    if cls is None:
+        yield "{}: unknown figure type {!r}".format(path, spec.get('type'))
+        return
+    names, required, keywords = _get_parameters(cls.__init__)
+    names = names + ['type', 'hatching', 'filling']
+    if keywords:
+        names.append('attribs')
+    if cls is RectFrame:
+        names.extend(ELEMENT_PARAMS)
+    for message in _check_params(spec, names, required, path):
+        yield message
+    for message in _check_values(spec, path):
+        yield message
+    for message in _check_decoration(spec, path):
+        yield message
+    for key, params in ELEMENT_PARAMS.items():
+        elements = spec.get(key, [])
+        if not isinstance(elements, list):
+            yield "{}.{}: should be a list".format(path, key)
+            continue
+        for index, element in enumerate(elements):
+            for message in _check_element(element, params, "{}.{}[{}]".format(path, key, index)):
+                yield message
+
+
+def validate(specs, start=0):
+    """
+    Validate batch of figure specs, raise ValueError with messages about found errors.
+    start - position of the first spec in figures list (used in messages)
+    """
+    errors = []
+    for index, spec in enumerate(specs, start):
+        errors.extend(_check_figure(spec, "figures[{}]".format(index)))
+        if len(errors) >= MAX_ERRORS:
+            break
+    if errors:
+        raise ValueError("Invalid plan spec: " + "; ".join(errors[:MAX_ERRORS]))
+
+
+def _to_tuples(value):
+    """
+    Convert JSON arrays to tuples (points are tuples in figures).
+    """
+    if isinstance(value, list):
+        return tuple(_to_tuples(item) for item in value)
+    return value
+
+
+def _decorate(figure, spec):
+    if 'hatching' in spec:
+        figure.add_hatching(**spec['hatching'])
+    if 'filling' in spec:
+        figure.add_filling(spec['filling'])
+
+
+def build_figure(spec):
+    """
+    Create figure by valid spec (see `validate`).
+    """
+    kwargs = {}
+    for name, value in spec.items():
+        if name not in ('type', 'attribs', 'hatching', 'filling') and name not in ELEMENT_PARAMS:
+            kwargs[name] = _to_tuples(value)
+    kwargs.update(spec.get('attribs', {}))
+    figure = FIGURE_TYPES[spec['type']](**kwargs)
+    for aperture in spec.get('apertures', ()):
+        figure.add_aperture(aperture['x'], aperture['y'], aperture['width'], **aperture.get('attribs', {}))
+    for bulkhead_spec in spec.get('bulkheads', ()):
+        bulkhead = figure.add_bulkhead(
+            bulkhead_spec['x'], bulkhead_spec['y'], bulkhead_spec['width'], **bulkhead_spec.get('attribs', {}))
+        _decorate(bulkhead, bulkhead_spec)
+    _decorate(figure, spec)
+    return figure
+
+
+def _build_figures(specs, start):
+    """
+    Generate figures by valid specs, errors of construction (e.g. inconsistent arrays)
+    are raised as ValueError with position of spec.
+    """
+    for index, spec in enumerate(specs, start):
+        try:
+            figure = build_figure(spec)
+        except (TypeError, ValueError) as error:
+            raise ValueError("Invalid plan spec: figures[{}]: {}".format(index, error))
+        yield figure
+
+
+def _iter_spec(fileobj, batch_size, chunk_size):
+    """
+    Generate pairs (settings, figure), figure is None for the first pair.
+    """
+    batch = []
+    count = 0
+    for settings, spec in _parse_spec(_JSONStream(fileobj, chunk_size)):
+        if spec is None:
+            yield settings, None
+            continue
+        batch.append(spec)
+        if len(batch) >= batch_size:
+            validate(batch, count)
+            for figure in _build_figures(batch, count):
+                yield settings, figure
+            count += len(batch)
+            batch = []
+    validate(batch, count)
+    for figure in _build_figures(batch, count):
+        yield settings, figure
+
+
+def iter_figures(fileobj, batch_size=1000, chunk_size=65536):
+    """
+    Generate figures of plan spec from file-like object (text or binary) without building of drawing.
+    batch_size - count of figure specs validated at once
+    chunk_size - size of file reads
+    """
+    for settings, figure in _iter_spec(fileobj, batch_size, chunk_size):
+        if figure is not None:
+            yield figure
+
+
+def read_drawing(fileobj, batch_size=1000, chunk_size=65536):
+    """
+    Build drawing by plan spec from file-like object (text or binary).
+    Raise ValueError on invalid spec.
+    """
+    drawing = None
+    for settings, figure in _iter_spec(fileobj, batch_size, chunk_size):
+        if drawing is None:
+            for name in settings:
+                if name not in _get_parameters(Drawing.__init__)[0]:
+                    raise ValueError("Invalid plan spec: unknown drawing setting {!r}".format(name))
+            if isinstance(settings.get('size'), list):
+                settings['size'] = tuple(settings['size'])
+            try:
+                drawing = Drawing(**settings)
+            except (TypeError, ValueError) as error:
+                raise ValueError("Invalid plan spec: drawing settings: {}".format(error))
+        if figure is not None:
+            drawing.add(figure)
+    return drawing
+
+
+def load(path, batch_size=1000, chunk_size=65536):
+    """
+    Build drawing by plan spec file.
+    """
+    with open(path, 'rb') as fileobj:
+        return read_drawing(fileobj, batch_size, chunk_size)
+
+
+def loads(text):
+    """
+    Build drawing by plan spec string.
+    """
+    return read_drawing(io.StringIO(text))
@@ -0,0 +1,91 @@
+"""
+Level of detail of rendering: simplification of plans rendered at small scales.
+"""
+from planner.backend import primitives
+
+
+class LevelOfDetail(object):
+
+    """
+    Details dropped at specified scale:
+     -  hatching is replaced with plain filling below `hatching_scale`
+     -  texts (labels, titles, etc) are omitted below `text_scale`
+     -  dimension arrows are omitted below `arrows_scale`
+     -  figures and elements smaller than `min_pixels` are omitted
+    Full detail rendering doesn't use level of detail at all.
+    """
+
+    __slots__ = ('scale', 'hatching', 'text', 'arrows', 'min_size')
+
+    HATCHING_SCALE = 2
+    TEXT_SCALE = 1
+    ARROWS_SCALE = 1
+    MIN_PIXELS = 1
+
+    def __init__(self, scale, hatching_scale=None, text_scale=None, arrows_scale=None, min_pixels=None):
+        """
+        scale - pixels per user unit of plan
+        hatching_scale, text_scale, arrows_scale - minimal scales to draw corresponding details
+        min_pixels - minimal size of figure or element to draw (in pixels)
+        """
+        if scale <= 0:
+            raise ValueError("Scale should be positive number")
+        self.scale = scale
+        self.hatching = scale >= (self.HATCHING_SCALE if hatching_scale is None else hatching_scale)
+        self.text = scale >= (self.TEXT_SCALE if text_scale is None else text_scale)
+        self.arrows = scale >= (self.ARROWS_SCALE if arrows_scale is None else arrows_scale)
+        self.min_size = float(self.MIN_PIXELS if min_pixels is None else min_pixels) / scale
+
+    @property
+    def key(self):
+        """
+        Rendering of figure depends only on these values (key of rendering cache).
+        """
+        return (self.hatching, self.text, self.arrows, self.min_size)
+
+    def is_visible(self, bbox):
+        """
+        Check that figure or element with bounding box is large enough to draw.
+        """
+        return bbox is None or bbox[2] - bbox[0] >= self.min_size or bbox[3] - bbox[1] >= self.min_size
+
+    def simplify(self, drawed):
+        """
+        Drop details from primitives of figure, returns list of primitives.
+        """
+        res = []
+        for primitive in primitives.iter_primitives(drawed):
+            if isinstance(primitive, primitives.Text):
+                if self.text:
+                    res.append(primitive)
+                continue
+            if primitive.role == 'arrow' and not self.arrows:
+                continue
+            if not self.is_visible(primitive.bbox()):
+                continue
+            attribs = primitive.attribs
+            if not self.hatching and 'url(#hatching-' in str(attribs.get('style', '')):
+                # hatching is replaced with plain filling
+                attribs = dict(attribs)
+                del attribs['style']
+            if not self.arrows and ('marker-start' in attribs or 'marker-end' in attribs):
+                attribs = dict(attribs)
+                attribs.pop('marker-start', None)
+                attribs.pop('marker-end', None)
+            primitive.attribs = attribs
+            res.append(primitive)
+        return res
+
+    def simplify_defs(self, drawed):
+        """
+        Drop definitions of dropped details (hatching patterns, arrows markers).
+        """
+        res = []
+        for primitive in primitives.iter_primitives(drawed):
+            if not self.hatching and isinstance(primitive, primitives.Pattern) and \
+                    str(primitive.attribs.get('id', '')).startswith('hatching-'):
+                continue
+            if not self.arrows and isinstance(primitive, primitives.Marker):
+                continue
+            res.append(primitive)
+        return res
@@ -0,0 +1,114 @@
+"""
+Profiling of plans rendering.
+
+    profile = RenderProfile()
+    drawing.instrument = profile
+    drawing.write(fileobj)
+    logger.info(profile.report())
+
+Statistics are collected by rendering stages of every object (see `Drawing.__init__`):
+drawing of primitives ("draw") is measured separately from serialization ("body" and "defs"),
+rendering cache is bypassed while profiling.
+"""
+
+
+def _describe(obj):
+    """
+    Class of object and position of its bounding box.
+    """
+    bbox = obj.bbox
+    if bbox is None:
+        return type(obj).__name__
+    return "{} at ({:g}, {:g})".format(type(obj).__name__, round(bbox[0], 2), round(bbox[1], 2))
+
+
+class RenderStats(object):
+
+    """
+    Accumulated statistics of rendering.
+    """
+
+    __slots__ = ('calls', 'seconds', 'elements', 'size')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.elements = 0
+        self.size = 0
+
+    def add(self, seconds, elements, size):
+        self.calls += 1
+        self.seconds += seconds
+        self.elements += elements
+        self.size += size
+
+    def as_dict(self):
+        return {"calls": self.calls, "seconds": self.seconds, "elements": self.elements, "size": self.size}
+
+
+class RenderProfile(object):
+
+    """
+    Instrumentation hook of drawing collecting rendering statistics
+    per object, per class of objects and per rendering stage.
+    """
+
+    def __init__(self):
+        # object -> RenderStats
+        self.objects = {}
+        # class name -> RenderStats
+        self.classes = {}
+        # stage -> RenderStats
+        self.stages = {}
+        self.total = RenderStats()
+
+    def __call__(self, obj, stage, seconds, elements, size):
+        for stats, key in ((self.objects, obj), (self.classes, type(obj).__name__), (self.stages, stage)):
+            item = stats.get(key)
+            if item is None:
+                item = stats[key] = RenderStats()
+            item.add(seconds, elements, size)
+        self.total.add(seconds, elements, size)
+
+    def clear(self):
+        self.objects.clear()
+        self.classes.clear()
+        self.stages.clear()
+        self.total = RenderStats()
+
+    def slowest(self, count=10):
+        """
+        List of pairs (object, stats) for objects with the longest rendering time.
+        """
+        return sorted(self.objects.items(), key=lambda pair: pair[1].seconds, reverse=True)[:count]
+
+    def metrics(self, prefix="render"):
+        """
+        Flat dict of metrics for export to monitoring systems:
+        "<prefix>.<total|class.<name>|stage.<name>>.<calls|seconds|elements|size>" -> value.
+        """
+        named = [(prefix + ".total", self.total)]
+        named.extend(("{}.class.{}".format(prefix, name), stats) for name, stats in self.classes.items())
+        named.extend(("{}.stage.{}".format(prefix, name), stats) for name, stats in self.stages.items())
+        metrics = {}
+        for name, stats in named:
+            for field, value in stats.as_dict().items():
+                metrics[name + "." + field] = value
+        return metrics
+
+    def report(self, slowest=10):
+        """
+        Text report: statistics by classes ordered by time and the slowest objects.
+        """
+        lines = ["{:<36} {:>8} {:>10} {:>10} {:>12}".format("class", "calls", "ms", "elements", "bytes")]
+        row = "{:<36} {:>8} {:>10.3f} {:>10} {:>12}"
+        for name, stats in sorted(self.classes.items(), key=lambda pair: pair[1].seconds, reverse=True):
+            lines.append(row.format(name, stats.calls, stats.seconds * 1000, stats.elements, stats.size))
+        lines.append(row.format(
+            "total", self.total.calls, self.total.seconds * 1000, self.total.elements, self.total.size))
+        if slowest:
+            lines.append("")
+            lines.append("slowest objects:")
+            for obj, stats in self.slowest(slowest):
+                lines.append(row.format(_describe(obj), stats.calls, stats.seconds * 1000, stats.elements, stats.size))
+        return "\n".join(lines)
@@ -0,0 +1,457 @@
+"""
+Compact binary format of plan model (drawing settings and figures).
+
+File layout (little-endian):
+ -  header: magic, format version, counts and offsets of sections (see `HEADER`)
+ -  string table: offsets of strings (uint64, count + 1) followed by UTF-8 data,
+    every string (labels, colors, attribute names and values, figure classes) is stored once
+ -  coordinates: fixed-width array of 8-byte values (float64, numpy arrays of integers
+    and booleans are stored as int64), points and numpy arrays of figures are stored here
+    and referenced by position
+ -  records index: offsets of records (uint64, count + 1), record 0 is drawing settings,
+    next records are figures in order of drawing
+ -  records: tagged values (see `_Writer.encode`) referencing strings and coordinates
+
+Files are memory-mapped by `PlanFile`, so a figure is decoded only when it's accessed.
+"""
+from planner.backend import BACKENDS
+from planner.drawing import Drawing
+from planner.frame.figure import Figure
+from planner.frame.hatching import Hatching
+from planner.style import Style
+import planner.frame.aperture  # noqa
+import planner.frame.batches  # noqa
+import planner.frame.bulkhead  # noqa
+import planner.frame.dimension  # noqa
+import planner.frame.line  # noqa
+import planner.frame.polygon  # noqa
+import planner.frame.rect  # noqa
+import planner.frame.rect_frame  # noqa
+import planner.frame.title  # noqa
+from array import array
+import numpy as np
+import struct
+import sys
+import mmap
+import io
+
+
+MAGIC = b'PLNR'
+VERSION = 1
+# magic, version, flags, strings count, records count, coordinates count,
+# offsets of string table, coordinates, records index and records
+HEADER = struct.Struct('<4sHHQQQQQQQ')
+
+_UINT32 = struct.Struct('<I')
+_INT32 = struct.Struct('<i')
+_INT32_PAIR = struct.Struct('<ii')
+_INT64 = struct.Struct('<q')
+_INT32_RANGE = (-2 ** 31, 2 ** 31 - 1)
+_ARRAY_DTYPES = {'d': np.float64, 'q': np.int64, '?': np.bool_}
+_ARRAY_KINDS = {'f': 'd', 'i': 'q', 'u': 'q', 'b': '?'}
+# types of 8-byte slots of coordinates array holding items of arrays by dtype codes
+_ARRAY_STORAGE = {'d': 'f8', 'q': 'i8', '?': 'i8'}
+
+
+def _figure_classes():
+    """
+    Figure classes by full names, all imported subclasses of `Figure` can be loaded.
+    """
+    classes = {}
+    pending = [Figure]
+    while pending:
+        cls = pending.pop()
+        classes['{}.{}'.format(cls.__module__, cls.__name__)] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_int32(value):
+    return isinstance(value, int) and not isinstance(value, bool) and _INT32_RANGE[0] <= value <= _INT32_RANGE[1]
+
+
+class _Writer(object):
+
+    """
+    Collects string table, coordinates and records of plan.
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.coordinates = array('d')
+        self.records = bytearray()
+        self.offsets = [0]
+
+    def string(self, value):
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = self.strings[value] = len(self.strings)
+        return string_id
+
+    def add_record(self, value):
+        self.encode(value)
+        self.offsets.append(len(self.records))
+
+    def _put(self, tag, fmt=None, *values):
+        self.records += tag
+        if fmt is not None:
+            self.records += fmt.pack(*values)
+
+    def encode(self, value):
+        """
+        Append tagged value to records:
+         -  N, T, F - None, True, False
+         -  I, J - integer (int32, int64), D - float (index of coordinate)
+         -  P - point (x, y) of floats (index of coordinates pair), Q - point of integers (int32 pair)
+         -  S - string (index in string table)
+         -  U, L - tuple, list (count, items)
+         -  M, Y - dict, style (count, pairs of items)
+         -  H - hatching (angle, distance, width, color)
+         -  A - numpy array (dtype code, ndim, shape, index of coordinates)
+         -  O - figure (layout: class and names of attributes, values of attributes)
+        """
+        if value is None:
+            self._put(b'N')
+        elif isinstance(value, (bool, np.bool_)):
+            self._put(b'T' if value else b'F')
+        elif isinstance(value, (int, np.integer)):
+            if _is_int32(int(value)):
+                self._put(b'I', _INT32, int(value))
+            else:
+                self._put(b'J', _INT64, int(value))
+        elif isinstance(value, float):
+            self._put(b'D', _UINT32, len(self.coordinates))
+            self.coordinates.append(value)
+        elif isinstance(value, str):
+            self._put(b'S', _UINT32, self.string(value))
+        elif isinstance(value, tuple) and len(value) == 2 and all(_is_number(item) for item in value):
+            # points are the most frequent values
+            if _is_int32(value[0]) and _is_int32(value[1]):
+                self._put(b'Q', _INT32_PAIR, *value)
+            else:
+                self._put(b'P', _UINT32, len(self.coordinates))
+                self.coordinates.extend((float(value[0]), float(value[1])))
+        elif isinstance(value, (tuple, list)):
+            self._put(b'U' if isinstance(value, tuple) else b'L', _UINT32, len(value))
+            for item in value:
+                self.encode(item)
+        elif isinstance(value, dict):
+            self._put(b'Y' if isinstance(value, Style) else b'M', _UINT32, len(value))
+            for key in sorted(value, key=str):
+                self.encode(key)
+                self.encode(value[key])
+        elif isinstance(value, Hatching):
+            self._put(b'H')
+            for item in (value.angle, value.distance, value.width, value.color):
+                self.encode(item)
+        elif isinstance(value, np.ndarray):
+            self._encode_array(value)
+        elif isinstance(value, Figure):
+            self._encode_figure(value)
+        else:
+            raise ValueError("Value of type {} can't be serialized".format(type(value).__name__))
+
+    def _encode_array(self, value):
+        dtype = _ARRAY_KINDS.get(value.dtype.kind)
+        if dtype is None:
+            raise ValueError("Arrays of type {} can't be serialized".format(value.dtype))
+        self.records += b'A' + dtype.encode('ascii') + _UINT32.pack(value.ndim)
+        for dimension in value.shape:
+            self.records += _UINT32.pack(dimension)
+        self.records += _UINT32.pack(len(self.coordinates))
+        # coordinates are kept in native byte order until writing
+        self.coordinates.frombytes(np.ascontiguousarray(value, dtype='=' + _ARRAY_STORAGE[dtype]).tobytes())
+
+    def _encode_figure(self, figure):
+        cls = type(figure)
+        state = figure.__getstate__()
+        # links and derived structures are restored on loading
+        for name in ('_parent',) + cls._DERIVED:
+            state.pop(name, None)
+        names = sorted(state)
+        # figures of the same class usually have the same attributes, so layout is shared
+        layout = ' '.join(['{}.{}'.format(cls.__module__, cls.__name__)] + names)
+        self._put(b'O', _UINT32, self.string(layout))
+        for name in names:
+            self.encode(state[name])
+
+    def _drawing_settings(self, drawing):
+        backend = 'string'
+        for name, backend_class in BACKENDS.items():
+            if type(drawing.backend) is backend_class:
+                backend = name
+        return {
+            'size': 'auto' if drawing.autosize else tuple(drawing.size),
+            'max_size': drawing.max_size,
+            'backend': backend,
+            'cache': drawing.cache,
+            'groups': drawing.groups,
+            'style_classes': bool(drawing.backend.style_classes),
+            'precision': drawing.backend.precision,
+            'class_prefix': drawing.backend.class_prefix}
+
+    def write(self, drawing, fileobj):
+        self.add_record(self._drawing_settings(drawing))
+        for obj in drawing.objects:
+            self.add_record(obj)
+        strings = [None] * len(self.strings)
+        for value, string_id in self.strings.items():
+            strings[string_id] = value.encode('utf-8')
+        string_offsets = np.zeros(len(strings) + 1, dtype='<u8')
+        string_offsets[1:] = np.cumsum([len(value) for value in strings])
+        strings_offset = HEADER.size
+        coordinates_offset = _align(strings_offset + string_offsets.nbytes + int(string_offsets[-1]))
+        index_offset = coordinates_offset + len(self.coordinates) * 8
+        records_offset = index_offset + len(self.offsets) * 8
+        fileobj.write(HEADER.pack(
+            MAGIC, VERSION, 0, len(strings), len(self.offsets) - 1, len(self.coordinates),
+            strings_offset, coordinates_offset, index_offset, records_offset))
+        fileobj.write(string_offsets.tobytes())
+        fileobj.write(b''.join(strings))
+        fileobj.write(b'\0' * (coordinates_offset - strings_offset - string_offsets.nbytes - int(string_offsets[-1])))
+        coordinates = self.coordinates
+        if sys.byteorder == 'big':
+            coordinates = array('d', coordinates)
+            coordinates.byteswap()
+        fileobj.write(coordinates.tobytes())
+        fileobj.write(np.array(self.offsets, dtype='<u8').tobytes())
+        fileobj.write(bytes(self.records))
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+class PlanFile(object):
+
+    """
+    Lazy reader of plan in binary format.
+    Works over any buffer (bytes, mmap), figures are decoded on access:
+        with PlanFile.open("plan.bin") as plan:
+            frame = plan[10]
+    Numpy arrays of decoded figures are read-only views of the buffer.
+    """
+
+    def __init__(self, buffer):
+        if len(buffer) < HEADER.size:
+            raise ValueError("Plan data is truncated")
+        (magic, version, flags, strings_count, records_count, coordinates_count,
+         strings_offset, coordinates_offset, index_offset, records_offset) = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Data is not a plan in binary format")
+        if version > VERSION:
+            raise ValueError("Plan format version {} is not supported".format(version))
+        self._buffer = buffer
+        self._mmap = None
+        self._string_offsets = np.frombuffer(buffer, '<u8', strings_count + 1, strings_offset)
+        self._strings_data = strings_offset + self._string_offsets.nbytes
+        self._strings = {}
+        self._coordinates = np.frombuffer(buffer, '<f8', coordinates_count, coordinates_offset)
+        self._index = np.frombuffer(buffer, '<u8', records_count + 1, index_offset)
+        self._records_offset = records_offset
+        self._classes = None
+        self._layouts = {}
+        self.settings = self._read_record(0)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-map plan file, only header and accessed figures are read from disk.
+        """
+        with open(path, 'rb') as fileobj:
+            buffer = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        plan = cls(buffer)
+        plan._mmap = buffer
+        return plan
+
+    def close(self):
+        """
+        Release memory map, decoded figures are independent of file.
+        """
+        if self._mmap is not None:
+            self._string_offsets = self._coordinates = self._index = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self._index) - 2
+
+    def __getitem__(self, index):
+        """
+        Decode figure by its position in drawing.
+        """
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("Figure index out of range")
+        return self._read_record(index + 1)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._read_record(index + 1)
+
+    def drawing(self):
+        """
+        Decode drawing with all figures.
+        """
+        settings = dict(self.settings)
+        drawing = Drawing(settings.pop('size'), **settings)
+        for figure in self:
+            drawing.add(figure)
+        return drawing
+
+    def _string(self, string_id):
+        value = self._strings.get(string_id)
+        if value is None:
+            start = self._strings_data + int(self._string_offsets[string_id])
+            end = self._strings_data + int(self._string_offsets[string_id + 1])
+            value = self._strings[string_id] = bytes(self._buffer[start:end]).decode('utf-8')
+        return value
+
+    def _read_record(self, index):
+        offset = self._records_offset + int(self._index[index])
+        return self._decode(offset)[0]
+
+    def _decode(self, offset):
+        """
+        Decode value at offset, returns pair (value, offset of next value).
+        """
+        buffer = self._buffer
+        tag = buffer[offset:offset + 1]
+        offset += 1
+        if tag == b'N':
+            return None, offset
+        if tag == b'T':
+            return True, offset
+        if tag == b'F':
+            return False, offset
+        if tag == b'I':
+            return _INT32.unpack_from(buffer, offset)[0], offset + 4
+        if tag == b'J':
+            return _INT64.unpack_from(buffer, offset)[0], offset + 8
+        if tag == b'Q':
+            return _INT32_PAIR.unpack_from(buffer, offset), offset + 8
+        if tag == b'A':
+            return self._decode_array(offset)
+        if tag == b'H':
+            values = []
+            for i in range(4):
+                value, offset = self._decode(offset)
+                values.append(value)
+            return Hatching.get(*values), offset
+        position = _UINT32.unpack_from(buffer, offset)[0]
+        offset += 4
+        if tag == b'D':
+            return float(self._coordinates[position]), offset
+        if tag == b'P':
+            return tuple(self._coordinates[position:position + 2].tolist()), offset
+        if tag == b'S':
+            return self._string(position), offset
+        if tag in (b'U', b'L'):
+            items = []
+            for i in range(position):
+                item, offset = self._decode(offset)
+                items.append(item)
+            return (tuple(items) if tag == b'U' else items), offset
+        if tag in (b'M', b'Y'):
+            items = {}
+            for i in range(position):
+                key, offset = self._decode(offset)
+                items[key], offset = self._decode(offset)
+            return (Style.get(items) if tag == b'Y' else items), offset
+        if tag == b'O':
+            return self._decode_figure(position, offset)
+        raise ValueError("Plan data is corrupted: unknown tag {!r}".format(tag))
+
+    def _decode_array(self, offset):
+        buffer = self._buffer
+        code = bytes(buffer[offset:offset + 1]).decode('ascii')
+        ndim = _UINT32.unpack_from(buffer, offset + 1)[0]
+        shape = struct.unpack_from('<{}I'.format(ndim), buffer, offset + 5)
+        offset += 5 + 4 * ndim
+        position = _UINT32.unpack_from(buffer, offset)[0]
+        size = int(np.prod(shape))
+        items = self._coordinates[position:position + size].view('<' + _ARRAY_STORAGE[code])
+        # arrays are copied, so figures stay valid after closing of file
+        return items.reshape(shape).astype(_ARRAY_DTYPES[code]), offset + 4
+
+    def _get_layout(self, layout_id):
+        """
+        Figure class and names of attributes by id of layout string.
+        """
+        layout = self._layouts.get(layout_id)
+        if layout is None:
+            if self._classes is None:
+                self._classes = _figure_classes()
+            names = self._string(layout_id).split(' ')
+            cls = self._classes.get(names[0])
+            if cls is None:
+                raise ValueError("Unknown figure class {}".format(names[0]))
+            layout = self._layouts[layout_id] = (cls, names[1:])
+        return layout
+
+    def _decode_figure(self, layout_id, offset):
+        cls, names = self._get_layout(layout_id)
+        state = {}
+        for name in names:
+            state[name], offset = self._decode(offset)
+        figure = cls.__new__(cls)
+        figure.__setstate__(state)
+        for value in state.values():
+            # nested figures (apertures, bulkheads) notify their owner about changes
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, Figure):
+                        item._parent = figure
+        figure._after_load()
+        return figure, offset
+
+
+def dump(drawing, fileobj):
+    """
+    Write drawing to binary file-like object.
+    """
+    _Writer().write(drawing, fileobj)
+
+
+def dumps(drawing):
+    """
+    Serialize drawing to bytes.
+    """
+    stream = io.BytesIO()
+    dump(drawing, stream)
+    return stream.getvalue()
+
+
+def loads(data):
+    """
+    Decode drawing from bytes.
+    """
+    return PlanFile(data).drawing()
+
+
+def save(drawing, path):
+    """
+    Save drawing to file.
+    """
+    with open(path, 'wb') as fileobj:
+        dump(drawing, fileobj)
+
+
+def load(path):
+    """
+    Load whole drawing from file, use `PlanFile.open` to read separate figures.
+    """
+    with open(path, 'rb') as fileobj:
+        return loads(fileobj.read())
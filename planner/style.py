@@ -0,0 +1,57 @@
+"""
+Shared styles of figures.
+"""
+import weakref
+
+
+class Style(dict):
+
+    """
+    Immutable set of SVG attributes.
+    Styles are interned: figures with the same attributes share the same style object.
+    `copy()` returns regular (mutable) dict.
+    """
+
+    __slots__ = ('__weakref__', '_hash')
+
+    _instances = weakref.WeakValueDictionary()
+
+    def __init__(self, *args, **kwargs):
+        super(Style, self).__init__(*args, **kwargs)
+        self._hash = None
+
+    @classmethod
+    def get(cls, *mappings):
+        """
+        Get shared style with attributes of all mappings (latter mappings override former).
+        """
+        if len(mappings) == 1 and isinstance(mappings[0], Style):
+            return mappings[0]
+        attribs = {}
+        for mapping in mappings:
+            if mapping:
+                dict.update(attribs, mapping)
+        try:
+            key = frozenset(attribs.items())
+        except TypeError:
+            # unhashable values can't be shared
+            return cls(attribs)
+        style = cls._instances.get(key)
+        if style is None:
+            style = cls(attribs)
+            cls._instances[key] = style
+        return style
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __reduce__(self):
+        return (Style.get, (dict(self),))
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Style is immutable, create new one with Style.get()")
+
+    __setitem__ = __delitem__ = update = setdefault = pop = popitem = clear = _immutable
+    __ior__ = _immutable
@@ -0,0 +1,114 @@
+"""
+Tiled rendering of large plans: pyramid of SVG tiles for web viewers.
+"""
+from planner.backend.base import style_element
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple, deque
+import math
+import os
+
+TileResult = namedtuple('TileResult', ('path', 'zoom', 'x', 'y', 'size'))
+
+
+def get_tiles_grid(extent, zoom):
+    """
+    Tiles grid of zoom level for plan with extent (x0, y0, x1, y1): tuple (tile size in user units, columns, rows).
+    On zoom level 0 the longest side of plan is covered with one tile,
+    on every next level tiles are twice smaller.
+    """
+    width, height = extent[2] - extent[0], extent[3] - extent[1]
+    tile_size = max(width, height, 1) / 2 ** zoom
+    if tile_size == int(tile_size):
+        # keep viewboxes of tiles short
+        tile_size = int(tile_size)
+    columns = max(int(math.ceil(width / tile_size)), 1)
+    rows = max(int(math.ceil(height / tile_size)), 1)
+    return tile_size, columns, rows
+
+
+def assign_tiles(bboxes, extent, zoom):
+    """
+    Assign items with bounding boxes to tiles of zoom level of plan with extent (x0, y0, x1, y1).
+    Items without bounding box are assigned to all tiles.
+    Returns dict {(x, y): list of indexes of items touching tile in order of items}.
+    """
+    tile_size, columns, rows = get_tiles_grid(extent, zoom)
+    origin_x, origin_y = extent[:2]
+    tiles = {}
+    for index, bbox in enumerate(bboxes):
+        if bbox is None:
+            x0, y0, x1, y1 = 0, 0, columns - 1, rows - 1
+        else:
+            x0 = max(int(math.floor((bbox[0] - origin_x) / tile_size)), 0)
+            y0 = max(int(math.floor((bbox[1] - origin_y) / tile_size)), 0)
+            x1 = min(int(math.floor((bbox[2] - origin_x) / tile_size)), columns - 1)
+            y1 = min(int(math.floor((bbox[3] - origin_y) / tile_size)), rows - 1)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                tiles.setdefault((x, y), []).append(index)
+    return tiles
+
+
+def render_tiles(drawing, tile_size=256, zoom_levels=3, out_dir='.', workers=None):
+    """
+    Render drawing to tiles pyramid (see `Drawing.render_tiles`).
+    Pyramid covers bounding box of content (sheet of drawing if it's empty).
+    Objects are rendered in current thread, rendered tiles are passed to thread pool writing them,
+    count of tiles waiting for writing is limited, so fragments aren't kept for the whole run
+    (with disabled cache objects are rendered for every tile they touch).
+    """
+    if isinstance(zoom_levels, int):
+        zoom_levels = range(zoom_levels)
+    workers = workers or os.cpu_count() or 1
+    backend = drawing.backend
+    objects = list(drawing.objects)
+    bboxes = [obj.bbox for obj in objects]
+    extent = drawing.bbox
+    if extent is None:
+        x, y, width, height = drawing.layout().viewbox
+        extent = (x, y, x + width, y + height)
+
+    def write_tile(task):
+        zoom, (x, y), chunks = task
+        path = os.path.join(out_dir, str(zoom), str(x), '{}.svg'.format(y))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = ''.join(chunks).encode('utf-8')
+        with open(path, 'wb') as output:
+            output.write(data)
+        return TileResult(path, zoom, x, y, len(data))
+
+    def render_tile(indexes, viewbox):
+        # rendering isn't thread safe (backends collect definitions), so it's done before writing
+        fragments = [drawing._render_fragment(objects[index]) for index in indexes]
+        defs_ids = set()
+        defs = []
+        rules = []
+        for fragment in fragments:
+            defs.extend(drawing._split_rules(drawing._new_defs(fragment[0], defs_ids), rules))
+        if rules:
+            defs.append(style_element(rules))
+        chunks = [backend.header((tile_size, tile_size), viewbox, unit='px')]
+        chunks.extend(['<defs>'] + defs + ['</defs>'] if defs else ['<defs />'])
+        chunks.extend(fragment[1] for fragment in fragments)
+        chunks.append(backend.footer())
+        return chunks
+
+    def iter_tasks():
+        for zoom in zoom_levels:
+            plan_tile_size, columns, rows = get_tiles_grid(extent, zoom)
+            tiles = assign_tiles(bboxes, extent, zoom)
+            for x in range(columns):
+                for y in range(rows):
+                    viewbox = (extent[0] + x * plan_tile_size, extent[1] + y * plan_tile_size,
+                               plan_tile_size, plan_tile_size)
+                    yield zoom, (x, y), render_tile(tiles.get((x, y), []), viewbox)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in iter_tasks():
+            pending.append(executor.submit(write_tile, task))
+            if len(pending) >= 2 * workers:
+                results.append(pending.popleft().result())
+        results.extend(future.result() for future in pending)
+    return results
@@ -1,3 +1,4 @@
+import hashlib
 import re
 
 _measure_patterns = re.compile(r'^([0-9]+\.?[0-9]*)([a-zA-Z]*)$')
@@ -13,3 +14,57 @@ def parse_measure_units(values, default_unit="mm"):
     else:
         value = int(groups[0])
     return (value, groups[1] or default_unit)
+
+
+def content_id(*values):
+    """
+    Short deterministic id based on representation of values.
+    Equal values always produce equal ids (across runs too).
+    """
+    return hashlib.md5(repr(values).encode('utf-8')).hexdigest()[:10]
+
+
+_BASE36_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def to_base36(number):
+    """
+    Short string representation of non-negative integer.
+    """
+    if number == 0:
+        return '0'
+    digits = []
+    while number:
+        number, digit = divmod(number, 36)
+        digits.append(_BASE36_DIGITS[digit])
+    return ''.join(reversed(digits))
+
+
+class IdAllocator(object):
+
+    """
+    Generator of short sequential ids: prefix followed by base-36 counter ("f0", "f1", ..., "fz", "f10").
+    Ids are the same on every run for the same order of allocation.
+    """
+
+    __slots__ = ('prefix', '_next')
+
+    def __init__(self, prefix='f'):
+        self.prefix = prefix
+        self._next = 0
+
+    def allocate(self):
+        number = self._next
+        self._next += 1
+        return self.prefix + to_base36(number)
+
+    def reserve(self, allocated_id):
+        """
+        Mark id allocated elsewhere (e.g. by allocator of other drawing) as used.
+        """
+        if allocated_id.startswith(self.prefix):
+            try:
+                number = int(allocated_id[len(self.prefix):], 36)
+            except ValueError:
+                return
+            self._next = max(self._next, number + 1)
@@ -48,3 +48,37 @@ class TestParseUnitsTools(BaseTestCase):
         val, unit = TestParseUnitsTools.parse_measure_units('10.5')
         self.assertEqual(val, 10.5)
         self.assertEqual(unit, 'mm')
+
+
+class TestIdAllocator(BaseTestCase):
+
+    """
+    Test allocator of short ids.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.tools import IdAllocator
+        cls.IdAllocator = IdAllocator
+
+    def test_allocate(self):
+        """
+        Should allocate sequential base-36 ids.
+        """
+        ids = self.IdAllocator()
+        allocated = [ids.allocate() for i in range(38)]
+        self.assertEqual(allocated[:3], ['f0', 'f1', 'f2'])
+        self.assertEqual(allocated[35:], ['fz', 'f10', 'f11'])
+        self.assertEqual([ids.allocate() for i in range(38)][0], 'f12')
+        self.assertEqual(self.IdAllocator('g').allocate(), 'g0')
+
+    def test_reserve(self):
+        """
+        Should skip reserved ids and ignore foreign ones.
+        """
+        ids = self.IdAllocator()
+        ids.reserve('f10')
+        ids.reserve('f2')
+        ids.reserve('g100')
+        ids.reserve('f-x')
+        self.assertEqual(ids.allocate(), 'f11')
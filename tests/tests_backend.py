@@ -0,0 +1,84 @@
+from tests import BaseTestCase
+
+
+class TestBackends(BaseTestCase):
+
+    """
+    Test rendering backends
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.backend import StringBackend, SvgwriteBackend
+        cls.string_backend = StringBackend()
+        cls.svgwrite_backend = SvgwriteBackend()
+
+    def assertSameOutput(self, primitive):
+        """ Check that both backends serialize primitive in the same way """
+        self.assertEqual(self.string_backend.serialize(primitive), self.svgwrite_backend.serialize(primitive))
+
+    def test_get_backend(self):
+        """
+        Should return backend by name or backend instance itself
+        """
+        from planner.backend import get_backend, StringBackend, SvgwriteBackend
+        self.assertIsInstance(get_backend("string"), StringBackend)
+        self.assertIsInstance(get_backend("svgwrite"), SvgwriteBackend)
+        self.assertIs(get_backend(self.string_backend), self.string_backend)
+        with self.assertRaises(ValueError):
+            get_backend("unknown")
+
+    def test_shapes(self):
+        """
+        String backend output should be the same as svgwrite output
+        """
+        from planner.backend import primitives
+        self.assertSameOutput(primitives.Rect((10, 20.5), (30, 40), fill="#fff", stroke_width="2"))
+        self.assertSameOutput(primitives.Line((1, 2), (3.25, 4), **{"stroke-width": 0.5, "stroke": "#000"}))
+        self.assertSameOutput(primitives.Polygon([(1, 2), (3, 4.5), (1, 2)], fill="#000"))
+        self.assertSameOutput(primitives.Text('a < b & "c"', (1, 2), transform="rotate(90, 1, 2)"))
+        path = primitives.Path(stroke="#000")
+        path.push("M")
+        path.push((1, 2))
+        path.push_arc((3, 4), 0, 5, large_arc=False, absolute=True)
+        self.assertSameOutput(path)
+
+    def test_containers(self):
+        """
+        Nested primitives should be serialized inside of container
+        """
+        from planner.backend import primitives
+        pattern = primitives.Pattern((0, 0), (5, 5), id="pattern", patternUnits="userSpaceOnUse")
+        pattern.add(primitives.Rect((0, 0), (5, 5), fill="#fff"))
+        self.assertSameOutput(pattern)
+        marker = primitives.Marker(size=(6, 3), id="marker", orient="auto", refX=0, refY=1.5)
+        marker.add(primitives.Path(["M", (0, 0), (6, 1.5)], stroke="#000"))
+        self.assertSameOutput(marker)
+        self.assertIn('<rect fill="#fff"', self.string_backend.serialize(pattern))
+
+    def test_foreign_elements(self):
+        """
+        svgwrite objects should be accepted by both backends
+        """
+        from svgwrite import shapes
+        rect = shapes.Rect((1, 2), (3, 4))
+        self.assertEqual(self.string_backend.serialize(rect), rect.tostring())
+        self.assertEqual(self.svgwrite_backend.serialize(rect), rect.tostring())
+
+    def test_style_classes(self):
+        """
+        Presentation attributes should be replaced with CSS classes defined once
+        """
+        from planner.backend import primitives, StringBackend, SvgwriteBackend
+        for backend in (StringBackend(style_classes=True), SvgwriteBackend(style_classes=True)):
+            rect = backend.serialize(primitives.Rect((0, 0), (1, 1), fill="#fff", stroke="#000", id="rect"))
+            line = backend.serialize(primitives.Line((0, 0), (1, 1), stroke="#000", fill="#fff", class_="wall"))
+            self.assertEqual(rect, '<rect class="s0" height="1" id="rect" width="1" x="0" y="0" />')
+            self.assertEqual(line, '<line class="wall s0" x1="0" x2="1" y1="0" y2="1" />')
+            self.assertEqual(backend.pop_defs(), [("s0", ".s0{fill:#fff;stroke:#000}")])
+            self.assertEqual(backend.pop_defs(), [])
+            text = backend.serialize(primitives.Text("label", (0, 0), **{"font-family": "Arial"}))
+            self.assertIn('class="s1"', text)
+            self.assertEqual(backend.pop_defs()[0][0], "s1")
+        backend = StringBackend(style_classes=True, class_prefix="d1s")
+        self.assertIn('class="d1s0"', backend.serialize(primitives.Line((0, 0), (1, 1), stroke="#000")))
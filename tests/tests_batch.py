@@ -0,0 +1,97 @@
+from tests import BaseTestCase
+
+
+class TestBatchRendering(BaseTestCase):
+
+    """
+    Test rendering of many drawings in a process pool
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.batch import render_many
+        cls.render_many = staticmethod(render_many)
+
+    def setUp(self):
+        import tempfile
+        from planner.drawing import Drawing
+        from planner.frame import RectFrame
+        self.out_dir = tempfile.mkdtemp()
+        self.drawings = []
+        for index in range(3):
+            drawing = Drawing("A4")
+            rect_frame = RectFrame(10, 10, 100 + index, 100, 5)
+            rect_frame.add_hatching()
+            rect_frame.add_bulkhead(30, 15, 5).add_hatching(angle=30)
+            drawing.add(rect_frame)
+            self.drawings.append(drawing)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.out_dir)
+
+    def assertRendered(self, results, names):
+        import os
+        self.assertLength(results, len(self.drawings))
+        for drawing, result, name in zip(self.drawings, results, names):
+            self.assertEqual(result.path, os.path.join(self.out_dir, name))
+            with open(result.path, encoding='utf-8') as svg:
+                content = svg.read()
+            self.assertEqual(content, str(drawing))
+            self.assertEqual(result.size, len(content.encode('utf-8')))
+            self.assertGreaterEqual(result.seconds, 0)
+
+    def test_render_many(self):
+        """
+        Should render every drawing to separate file in worker processes
+        """
+        results = self.render_many(self.drawings, self.out_dir, workers=2)
+        self.assertRendered(results, ['drawing-1.svg', 'drawing-2.svg', 'drawing-3.svg'])
+
+    def test_render_many_in_process(self):
+        """
+        Should render drawings in current process with one worker
+        """
+        names = ['a.svg', 'b.svg', 'c.svg']
+        results = self.render_many(self.drawings, self.out_dir, workers=1, names=names)
+        self.assertRendered(results, names)
+
+    def test_binary_description(self):
+        """
+        Workers should receive drawings in binary format
+        """
+        from planner.batch import _pack, _render_file
+        import os
+        path = os.path.join(self.out_dir, 'packed.svg')
+        task = _pack((self.drawings[0], path))
+        self.assertIsInstance(task[0], bytes)
+        self.assertEqual(task[1], path)
+        result = _render_file(task)
+        with open(path, encoding='utf-8') as svg:
+            self.assertEqual(svg.read(), str(self.drawings[0]))
+        self.assertEqual(result.size, os.path.getsize(path))
+
+    def test_bounded_queue(self):
+        """
+        Results should keep order of drawings when there are more drawings than pending tasks
+        """
+        import os
+        results = self.render_many(iter(self.drawings * 4), self.out_dir, workers=2)
+        self.assertEqual([result.path for result in results],
+                         [os.path.join(self.out_dir, 'drawing-{}.svg'.format(index)) for index in range(1, 13)])
+
+    def test_pickled_description(self):
+        """
+        Rendering cache should not be shipped to workers, hatchings should stay shared
+        """
+        import pickle
+        drawing = self.drawings[0]
+        str(drawing)
+        rect_frame = drawing.objects[0]
+        self.assertIsNotNone(rect_frame._fragment)
+        restored = pickle.loads(pickle.dumps(drawing))
+        restored_frame = restored.objects[0]
+        self.assertIsNone(getattr(restored_frame, '_fragment', None))
+        self.assertIs(restored_frame.hatch, rect_frame.hatch)
+        self.assertIs(restored_frame.bulkheads[0]._parent, restored_frame)
+        self.assertEqual(str(restored), str(drawing))
@@ -0,0 +1,79 @@
+from tests import BaseTestCase
+
+
+class TestLineBatch(BaseTestCase):
+
+    """
+    Test batch of lines
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.frame.batches import LineBatch
+        from planner.backend import StringBackend
+        cls.LineBatch = LineBatch
+        cls.StringBackend = StringBackend
+
+    def test_draw(self):
+        """
+        Should draw all segments in one path
+        """
+        batch = self.LineBatch([((0, 0), (10, 10.5)), ((20, 0), (20, 30))], stroke="red")
+        self.assertEqual(len(batch), 2)
+        paths = batch._draw()
+        self.assertEqual(len(paths), 1)
+        self.assertEqual(paths[0].elementname, "path")
+        svg = paths[0].tostring()
+        self.assertIn('d="M 0.0 0.0 L 10.0 10.5 M 20.0 0.0 L 20.0 30.0"', svg)
+        self.assertIn('stroke="red"', svg)
+        self.assertIn('stroke-width="0.5"', svg)
+
+    def test_chunks(self):
+        """
+        Should split big batch to several paths
+        """
+        batch = self.LineBatch([(i, 0, i, 10) for i in range(5)], chunk_size=2)
+        paths = batch._primitives()
+        self.assertEqual(len(paths), 3)
+        body = batch._render_body(self.StringBackend(precision=1))
+        self.assertEqual(body.count("<path"), 3)
+        self.assertIn('d="M 4 0 L 4 10"', body)
+
+    def test_empty(self):
+        self.assertEqual(self.LineBatch([])._primitives(), [])
+
+
+class TestPolygonBatch(BaseTestCase):
+
+    """
+    Test batch of polygons
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.frame.batches import PolygonBatch
+        from planner.backend import StringBackend
+        cls.PolygonBatch = PolygonBatch
+        cls.StringBackend = StringBackend
+
+    def test_draw_rings(self):
+        """
+        Should draw rings of different sizes as closed subpaths
+        """
+        batch = self.PolygonBatch([[(0, 0), (1, 0), (1, 1)], [(5, 5), (6, 5), (6, 6), (5, 6)]])
+        self.assertEqual(len(batch), 2)
+        body = batch._render_body(self.StringBackend(precision=0.1))
+        self.assertIn('d="M 0 0 L 1 0 1 1 Z M 5 5 L 6 5 6 6 5 6 Z"', body)
+        self.assertIn('fill="#fff"', body)
+
+    def test_offsets(self):
+        """
+        Should accept flat array of points with offsets of rings
+        """
+        points = [(0, 0), (1, 0), (1, 1), (5, 5), (6, 5), (6, 6)]
+        batch = self.PolygonBatch(points, offsets=[0, 3], chunk_size=1)
+        self.assertEqual(len(batch), 2)
+        paths = batch._primitives()
+        self.assertEqual(len(paths), 2)
+        body = batch._render_body(self.StringBackend())
+        self.assertIn('d="M 5.0 5.0 L 6.0 5.0 6.0 6.0 Z"', body)
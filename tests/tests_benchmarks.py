@@ -0,0 +1,40 @@
+from tests import BaseTestCase
+
+
+class TestBenchmarksCheck(BaseTestCase):
+
+    """
+    Test comparison of benchmark results with baseline
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from benchmarks.__main__ import check
+        cls.check = staticmethod(check)
+
+    def test_regressions(self):
+        """
+        Should report results exceeding baseline by more than tolerance
+        """
+        baseline = {"frames/100/render": 1.0, "frames/100/build": 2.0, "frames/100/memory": 1000}
+        results = {"frames/100/render": 1.6, "frames/100/build": 2.9, "frames/100/memory": 1400}
+        self.assertEqual(self.check(results, baseline, 0.5), [("frames/100/render", 1.0, 1.6)])
+        self.assertEqual(self.check(results, baseline, 0.3),
+                         [("frames/100/build", 2.0, 2.9), ("frames/100/memory", 1000, 1400),
+                          ("frames/100/render", 1.0, 1.6)])
+
+    def test_time_noise(self):
+        """
+        Short timings should be allowed to exceed baseline by noise, memory should not
+        """
+        baseline = {"dimensions/100/render": 0.001, "dimensions/100/memory": 100}
+        results = {"dimensions/100/render": 0.004, "dimensions/100/memory": 200}
+        self.assertEqual(self.check(results, baseline, 0.5), [("dimensions/100/memory", 100, 200)])
+        self.assertEqual(self.check(results, baseline, 0.5, time_noise=0),
+                         [("dimensions/100/memory", 100, 200), ("dimensions/100/render", 0.001, 0.004)])
+
+    def test_missing_keys(self):
+        """
+        Results absent in baseline should be ignored
+        """
+        self.assertEqual(self.check({"frames/100000/render": 100.0}, {"frames/100/render": 0.1}, 0.5), [])
@@ -0,0 +1,64 @@
+from tests import BaseTestCase
+
+
+class TestDimensionSet(BaseTestCase):
+
+    """
+    Test set of dimensions
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.frame.dimension import DimensionSet, ExtensionableLinearDimension
+        from planner.backend import StringBackend
+        cls.DimensionSet = DimensionSet
+        cls.ExtensionableLinearDimension = ExtensionableLinearDimension
+        cls.StringBackend = StringBackend
+
+    def test_same_geometry(self):
+        """
+        Lines, arrows and labels should be the same as of separate dimensions
+        """
+        dimensions = [((0, 0), (10, 0), 1), ((0, 0), (0, 10), -1), ((3, 4), (10, -7), 1), ((5, 5), (1, 9), -1)]
+        dimension_set = self.DimensionSet([dimension[0] for dimension in dimensions],
+                                          [dimension[1] for dimension in dimensions],
+                                          ["label"] * len(dimensions), [dimension[2] for dimension in dimensions])
+        backend = self.StringBackend(precision=0.001)
+        lines, arrows = [path.commands[0].points.reshape(len(dimensions), -1, 2)
+                         for path in dimension_set._primitives()[:2]]
+        labels = dimension_set._primitives()[2:]
+        for index, (start_point, end_point, direction) in enumerate(dimensions):
+            dimension = self.ExtensionableLinearDimension(start_point, end_point, "label", direction=direction)
+            elements = dimension._primitives()
+            expected_lines = [point for line in elements[:3] for point in (line.start, line.end)]
+            self.assertEqual(len(lines[index]), len(expected_lines))
+            for point, expected_point in zip(lines[index], expected_lines):
+                self.assertAlmostEqual(point[0], expected_point[0])
+                self.assertAlmostEqual(point[1], expected_point[1])
+            # arrow polygons are closed by repeated tip point
+            expected_arrows = [point for arrow in elements[3:5] for point in arrow.points[:3]]
+            self.assertEqual(len(arrows[index]), len(expected_arrows))
+            for point, expected_point in zip(arrows[index], expected_arrows):
+                self.assertAlmostEqual(point[0], expected_point[0])
+                self.assertAlmostEqual(point[1], expected_point[1])
+            self.assertEqual(backend.serialize(labels[index]), backend.serialize(elements[5]))
+
+    def test_bulk_elements(self):
+        """
+        Lines and arrows of all dimensions should be drawn with one path each
+        """
+        dimension_set = self.DimensionSet([(0, 0), (0, 20)], [(10, 0), (10, 20)], ["10", "10"], stroke="red")
+        self.assertEqual(len(dimension_set), 2)
+        body = dimension_set._render_body(self.StringBackend())
+        self.assertEqual(body.count("<path"), 2)
+        self.assertEqual(body.count("<text"), 2)
+        self.assertIn('stroke="red"', body)
+
+    def test_wrong_arrays(self):
+        """
+        Should raise ValueError on inconsistent arrays or zero length dimensions
+        """
+        with self.assertRaises(ValueError):
+            self.DimensionSet([(0, 0)], [(10, 0), (10, 20)], ["10", "10"])
+        with self.assertRaises(ValueError):
+            self.DimensionSet([(0, 0)], [(0, 0)], ["0"])
@@ -0,0 +1,86 @@
+from tests import BaseTestCase
+
+
+class TestFrameDimensions(BaseTestCase):
+
+    """
+    Test automatic dimension chains of frames
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.frame import RectFrame
+        from planner.frame.dimension_chains import frame_dimensions, LabelPlacer, _get_label_bbox
+        cls.RectFrame = RectFrame
+        cls.frame_dimensions = staticmethod(frame_dimensions)
+        cls.LabelPlacer = LabelPlacer
+        cls.get_label_bbox = staticmethod(_get_label_bbox)
+
+    def assertLabelsNotOverlap(self, dimensions):
+        from planner.geometry import bboxes_intersect
+        bboxes = [self.get_label_bbox(dimension) for dimension in dimensions]
+        for index, bbox in enumerate(bboxes):
+            for other in bboxes[index + 1:]:
+                self.assertFalse(bboxes_intersect(bbox, other), "{} overlaps {}".format(bbox, other))
+
+    def test_overall(self):
+        """
+        Frame without apertures and bulkheads should get width and height dimensions
+        """
+        dimensions = self.frame_dimensions(self.RectFrame(10, 20, 200, 150, 5))
+        self.assertLength(dimensions, 2)
+        width, height = dimensions
+        self.assertEqual((width.start_point, width.end_point, width.label), ((10, 20), (210, 20), "200"))
+        self.assertEqual((height.start_point, height.end_point, height.label), ((10, 20), (10, 170), "150"))
+        self.assertFalse(width._direction)
+        self.assertEqual(width.extension_size, 12)
+
+    def test_openings_chain(self):
+        """
+        Openings chain should be placed between frame and overall dimension
+        """
+        frame = self.RectFrame(0, 0, 200, 150, 5)
+        frame.add_aperture(50, 0, 40)
+        frame.add_aperture(120, 0, 30)
+        dimensions = self.frame_dimensions(frame)
+        self.assertEqual([dimension.label for dimension in dimensions], ["50", "40", "30", "30", "50", "200", "150"])
+        self.assertEqual([dimension.extension_size for dimension in dimensions], [12] * 5 + [22, 12])
+        self.assertLabelsNotOverlap(dimensions)
+
+    def test_bulkheads_chains(self):
+        """
+        Horizontal bulkheads should be dimensioned along right wall, vertical ones along bottom wall
+        """
+        frame = self.RectFrame(0, 0, 200, 150, 10)
+        frame.add_bulkhead(10, 60, 10)
+        frame.add_bulkhead(100, 10, 10)
+        dimensions = self.frame_dimensions(frame)
+        right = [dimension for dimension in dimensions if dimension.start_point[0] == 200]
+        self.assertEqual([dimension.label for dimension in right], ["50", "10", "70"])
+        self.assertTrue(all(dimension._direction for dimension in right))
+        bottom = [dimension for dimension in dimensions if dimension.start_point[1] == 150]
+        self.assertEqual([dimension.label for dimension in bottom], ["90", "10", "80"])
+
+    def test_tiny_segments(self):
+        """
+        Labels of narrow segments should be moved to elongated dimension lines without overlapping
+        """
+        from planner.frame.dimension import TinyExtensionableLinearDimension
+        frame = self.RectFrame(0, 0, 200, 150, 5)
+        for x in (40, 44, 48, 52):
+            frame.add_aperture(x, 0, 2)
+        dimensions = self.frame_dimensions(frame)
+        tiny = [dimension for dimension in dimensions if isinstance(dimension, TinyExtensionableLinearDimension)]
+        self.assertLength(tiny, 7)
+        self.assertLabelsNotOverlap(dimensions)
+
+    def test_shared_placer(self):
+        """
+        Labels of adjacent frames sharing placer should not overlap
+        """
+        placer = self.LabelPlacer()
+        first = self.RectFrame(0, 0, 100, 100, 5)
+        second = self.RectFrame(0, 110, 100, 100, 5)
+        dimensions = self.frame_dimensions(first, placer=placer) + self.frame_dimensions(second, placer=placer)
+        self.assertLength(placer, 4)
+        self.assertLabelsNotOverlap(dimensions)
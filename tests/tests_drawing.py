@@ -48,3 +48,409 @@ class TestDrawing(BaseTestCase):
         for element in [rect, rect_frame]:
             for shape in element._draw():
                 self.assertIn(shape.tostring(), rendered)
+
+    def test_iter_svg(self):
+        """
+        Chunks of streamed document should form the same document as rendered at once
+        """
+        from planner.frame import RectFrame
+        rect_frame = RectFrame(10, 10, 100, 100, 5)
+        rect_frame.add_hatching()
+        self.drawing.add(rect_frame)
+        chunks = list(self.drawing.iter_svg())
+        self.assertTrue(chunks[0].startswith('<svg'))
+        self.assertEqual(chunks[-1], '</svg>')
+        self.assertEqual(''.join(chunks), str(self.drawing))
+
+    def test_write(self):
+        """
+        Should write whole document to file-like object
+        """
+        from io import StringIO
+        from planner.frame import Rect
+        self.drawing.add(Rect())
+        output = StringIO()
+        self.drawing.write(output)
+        self.assertEqual(output.getvalue(), str(self.drawing))
+
+    def test_write_without_cache(self):
+        """
+        Streaming export should not keep rendered fragments unless asked to
+        """
+        from io import StringIO
+        from planner.frame import RectFrame
+        rect_frame = RectFrame(10, 10, 100, 100, 5)
+        rect_frame.add_hatching()
+        drawing = self.Drawing(style_classes=True)
+        drawing.add(rect_frame)
+        output = StringIO()
+        drawing.write(output)
+        self.assertIsNone(rect_frame._fragment)
+        self.assertEqual(output.getvalue().count('<style>'), 1)
+        drawing.write(StringIO(), cache=True)
+        self.assertIsNotNone(rect_frame._fragment)
+
+    def test_backends(self):
+        """
+        Documents rendered with fast and strict backends should be equal
+        """
+        from planner.frame import RectFrame
+        from planner.frame.dimension import LinearDimension
+        rect_frame = RectFrame(10, 10, 100, 100, 5)
+        rect_frame.add_aperture(10, 30, 20)
+        rect_frame.add_bulkhead(30, 15, 5)
+        dimension = LinearDimension((10, 50), (110, 50), "100")
+        drawings = []
+        for backend in ("string", "svgwrite"):
+            drawing = self.Drawing(backend=backend)
+            drawing.add(rect_frame)
+            drawing.add(dimension)
+            drawings.append(str(drawing))
+        self.assertEqual(*drawings)
+
+    def test_shared_hatching(self):
+        """
+        Hatching pattern used by several figures should be emitted once
+        """
+        from planner.frame import Rect
+        for i in range(3):
+            rect = Rect(i * 10, 0, 5, 5)
+            rect.add_hatching(angle=30, distance=2, width=0.5, color="#999")
+            self.drawing.add(rect)
+        rendered = str(self.drawing)
+        self.assertEqual(rendered.count('<pattern'), 1)
+        self.assertEqual(rendered.count('url(#{})'.format(rect._hatching_id)), 3)
+
+    def test_render_cache(self):
+        """
+        Unchanged figures should not be redrawn on every rendering
+        """
+        from planner.frame import Rect
+
+        class CountedRect(Rect):
+
+            """ Count calls of `_primitives` method """
+
+            def _primitives(self):
+                self._draws_count += 1
+                return super(CountedRect, self)._primitives()
+
+        rect = CountedRect(10, 10, 20, 20)
+        rect._draws_count = 0
+        self.drawing.add(rect)
+        rendered = str(self.drawing)
+        self.assertEqual(str(self.drawing), rendered)
+        self.assertEqual(rect._draws_count, 1)
+        # changed figure should be redrawn
+        rect.add_filling("#f00")
+        self.assertNotEqual(str(self.drawing), rendered)
+        self.assertEqual(rect._draws_count, 2)
+
+    def test_render_cache_nested(self):
+        """
+        Changes of apertures and bulkheads should invalidate cache of frame
+        """
+        from planner.frame import RectFrame
+        rect_frame = RectFrame(10, 10, 100, 100, 5)
+        self.drawing.add(rect_frame)
+        rendered = str(self.drawing)
+        bulkhead = rect_frame.add_bulkhead(30, 15, 5)
+        with_bulkhead = str(self.drawing)
+        self.assertNotEqual(with_bulkhead, rendered)
+        bulkhead.add_hatching()
+        self.assertIn(bulkhead._hatching_id, str(self.drawing))
+
+    def test_render_without_cache(self):
+        """
+        Drawing without cache should render the same document and keep no fragments
+        """
+        from planner.frame import Rect
+        rect = Rect(10, 10, 20, 20)
+        rect.add_hatching()
+        drawing = self.Drawing(cache=False)
+        drawing.add(rect)
+        self.drawing.add(rect)
+        self.assertEqual(str(drawing), str(self.drawing))
+        rect.invalidate()
+        str(drawing)
+        self.assertIsNone(rect._fragment)
+
+    def test_render_patch(self):
+        """
+        Patch should contain only changes since previous rendering
+        """
+        from planner.frame import Rect
+        drawing = self.Drawing(groups=True)
+        rect1 = Rect(0, 0, 10, 10)
+        rect2 = Rect(20, 0, 10, 10)
+        drawing.add(rect1)
+        drawing.add(rect2)
+        rendered = str(drawing)
+        self.assertIn('<g id="{}">'.format(rect1.uuid), rendered)
+        patch = drawing.render_patch()
+        self.assertEqual(patch, {"defs": [], "removed": [], "replaced": [], "added": []})
+        # change, add and remove objects
+        rect1.add_hatching()
+        rect3 = Rect(40, 0, 10, 10)
+        drawing.add(rect3)
+        drawing.remove(rect2)
+        patch = drawing.render_patch()
+        self.assertLength(patch["defs"], 1)
+        self.assertEqual(patch["removed"], [rect2.uuid])
+        self.assertLength(patch["replaced"], 1)
+        self.assertEqual(patch["replaced"][0]["id"], rect1.uuid)
+        self.assertIn(rect1._hatching_id, patch["replaced"][0]["svg"])
+        self.assertLength(patch["added"], 1)
+        self.assertEqual(patch["added"][0]["id"], rect3.uuid)
+        self.assertEqual(patch["added"][0]["after"], rect1.uuid)
+        # shared definitions are sent once
+        rect3.add_hatching()
+        patch = drawing.render_patch()
+        self.assertEqual(patch["defs"], [])
+        self.assertLength(patch["replaced"], 1)
+
+    def test_first_patch(self):
+        """
+        First patch without full rendering should add all objects
+        """
+        from planner.frame import Rect
+        drawing = self.Drawing(groups=True)
+        rect1 = Rect(0, 0, 10, 10)
+        rect2 = Rect(20, 0, 10, 10)
+        drawing.add(rect1)
+        drawing.add(rect2)
+        patch = drawing.render_patch()
+        self.assertEqual([item["id"] for item in patch["added"]], [rect1.uuid, rect2.uuid])
+        self.assertEqual([item["after"] for item in patch["added"]], [None, rect1.uuid])
+        with self.assertRaises(ValueError):
+            self.drawing.render_patch()
+
+    def test_remove_not_rendered(self):
+        """
+        Objects removed before rendering should not appear in patches
+        """
+        from planner.frame import Rect
+        drawing = self.Drawing(groups=True)
+        rect = Rect(0, 0, 5, 5)
+        drawing.add(rect)
+        drawing.remove(rect)
+        self.assertFalse(hasattr(rect, '_uuid'))
+        self.assertEqual(drawing.render_patch(), {"defs": [], "removed": [], "replaced": [], "added": []})
+
+    def test_patch_positions(self):
+        """
+        Added objects should follow previous objects of the list after removals
+        """
+        from planner.frame import Rect
+        drawing = self.Drawing(groups=True)
+        rects = [Rect(index * 20, 0, 10, 10) for index in range(4)]
+        for rect in rects[:3]:
+            drawing.add(rect)
+        drawing.render_patch()
+        drawing.remove(rects[0])
+        drawing.add(rects[3])
+        patch = drawing.render_patch()
+        self.assertEqual([(item["id"], item["after"]) for item in patch["added"]], [(rects[3].uuid, rects[2].uuid)])
+        drawing.remove(rects[1])
+        drawing.remove(rects[2])
+        rect = Rect(0, 20, 10, 10)
+        drawing.add(rect)
+        self.assertEqual([item["after"] for item in drawing.render_patch()["added"]], [rects[3].uuid])
+
+    def test_deterministic_ids(self):
+        """
+        Ids of objects should be allocated by drawing and should be the same for the same plans
+        """
+        from planner.frame import Rect, RectFrame
+        from planner.frame.dimension import AngleDimension
+
+        def create_drawing():
+            drawing = self.Drawing(groups=True)
+            drawing.add(Rect(0, 0, 10, 10))
+            drawing.add(AngleDimension((10, 200), (50, 200), "30"))
+            drawing.add(AngleDimension((10, 300), (50, 300), "30"))
+            return drawing
+
+        drawing = create_drawing()
+        rendered = str(drawing)
+        self.assertEqual(rendered, str(create_drawing()))
+        self.assertEqual([obj.uuid for obj in drawing.objects], ["f0", "f1", "f2"])
+        # markers are shared by all angle dimensions
+        self.assertEqual(rendered.count("<marker"), 2)
+        frame = RectFrame(0, 0, 100, 100, 5)
+        drawing.add(frame)
+        self.assertEqual(frame.add_aperture(20, 0, 10).uuid, "f3")
+        # ids of added objects are kept
+        other = self.Drawing()
+        other.add(drawing.objects[2])
+        self.assertEqual(other.ids.allocate(), "f3")
+        # as well as ids of nested figures
+        bulkhead = frame.add_bulkhead(5, 30, 5)
+        self.assertEqual((frame.uuid, bulkhead.uuid), ("f4", "f5"))
+        other = self.Drawing()
+        other.add(frame)
+        self.assertEqual(other.ids.allocate(), "f6")
+
+    def test_style_classes(self):
+        """
+        Every style should be defined once and used by class name
+        """
+        from planner.frame import Rect
+        for cache in (True, False):
+            drawing = self.Drawing(style_classes=True, cache=cache, class_prefix="s")
+            for i in range(3):
+                drawing.add(Rect(i * 10, 0, 5, 5, stroke="#000"))
+                drawing.add(Rect(i * 10, 10, 5, 5, stroke="#f00"))
+            rendered = str(drawing)
+            self.assertEqual(rendered.count('<style'), 1)
+            self.assertIn('<style>.s0{', rendered)
+            self.assertIn('}.s1{', rendered)
+            self.assertEqual(rendered.count('class="s0"'), 3)
+            self.assertNotIn('stroke=', rendered)
+            if cache:
+                self.assertLess(rendered.index('<style>'), rendered.index('</defs>'))
+        # identical plans are rendered to identical documents
+        first, second = self.Drawing(style_classes=True), self.Drawing(style_classes=True)
+        for drawing in (first, second):
+            drawing.add(Rect(0, 0, 5, 5, stroke="#000"))
+        self.assertEqual(str(first), str(second))
+        # classes of documents inlined in one page shouldn't collide with distinct prefixes
+        second = self.Drawing(style_classes=True, class_prefix="p1-")
+        second.add(Rect(0, 0, 5, 5, stroke="#000"))
+        self.assertIn('class="s0"', str(first))
+        self.assertIn('class="p1-0"', str(second))
+        self.assertNotIn('s0', str(second))
+        # patches define new classes in one style element
+        drawing = self.Drawing(style_classes=True, groups=True, class_prefix="s")
+        drawing.add(Rect(0, 0, 5, 5, stroke="#000"))
+        drawing.add(Rect(0, 0, 5, 5, stroke="#f00"))
+        patch = drawing.render_patch()
+        self.assertEqual(patch["defs"], ["<style>.s0{fill:#fff;stroke:#000}.s1{fill:#fff;stroke:#f00}</style>"])
+
+    def test_precision(self):
+        """
+        Coordinates and transformations should be rounded to drawing precision by both backends
+        """
+        from planner.frame.dimension import LinearDimension
+        dimension = LinearDimension((0, 0), (10, 7), "12.2")
+        drawings = []
+        for backend in ("string", "svgwrite"):
+            drawing = self.Drawing(backend=backend, precision=0.01)
+            drawing.add(dimension)
+            drawings.append(str(drawing))
+        self.assertEqual(*drawings)
+        self.assertIn('transform="rotate(34.99, ', drawings[0])
+        self.assertNotRegex(drawings[0], r'\d\.\d{3}')
+
+    def test_viewport_render(self):
+        """
+        Only objects intersecting with viewport should be rendered, viewBox should match viewport
+        """
+        from planner.frame import Rect
+        rects = [Rect(x * 20, y * 20, 10, 10, id="rect-{}-{}".format(x, y)) for x in range(10) for y in range(10)]
+        for rect in rects:
+            self.drawing.add(rect)
+        rendered = self.drawing.render(viewport=(25, 25, 40, 20))
+        self.assertIn('viewBox="25 25 40 20"', rendered)
+        ids = [rect.attribs["id"] for rect in rects if 'id="{}"'.format(rect.attribs["id"]) in rendered]
+        self.assertEqual(ids, ["rect-1-1", "rect-1-2", "rect-2-1", "rect-2-2", "rect-3-1", "rect-3-2"])
+        self.assertEqual(self.drawing.render(), str(self.drawing))
+
+    def test_viewport_index_updates(self):
+        """
+        Added, changed and removed objects should be found in viewport
+        """
+        from planner.frame import Rect
+        first = Rect(0, 0, 10, 10)
+        second = Rect(100, 100, 10, 10)
+        self.drawing.add(first)
+        self.drawing.add(second)
+        self.assertEqual(self.drawing.find_objects((0, 0, 50, 50)), [first])
+        third = Rect(20, 20, 10, 10)
+        self.drawing.add(third)
+        second.corner = (30, 30)
+        self.assertEqual(self.drawing.find_objects((0, 0, 50, 50)), [first, second, third])
+        self.drawing.remove(first)
+        self.assertEqual(self.drawing.find_objects((0, 0, 50, 50)), [second, third])
+
+    def test_bbox(self):
+        """
+        Bounding box of content should follow added, changed and removed objects, title blocks are skipped
+        """
+        from planner.frame import Rect
+        from planner.frame.title import SampleTitle
+        self.assertIsNone(self.drawing.bbox)
+        first = Rect(10, 20, 30, 40)
+        self.drawing.add(first)
+        self.drawing.add(SampleTitle(420, 297))
+        self.assertEqual(self.drawing.bbox, (10, 20, 40, 60))
+        second = Rect(100, 0, 10, 10)
+        self.drawing.add(second)
+        self.assertEqual(self.drawing.bbox, (10, 0, 110, 60))
+        second.corner = (0, 0)
+        self.assertEqual(self.drawing.bbox, (0, 0, 40, 60))
+        self.drawing.remove(first)
+        self.assertEqual(self.drawing.bbox, (0, 0, 10, 10))
+
+    def test_auto_size(self):
+        """
+        The most detailed standard scale and the smallest sheet with free place for title block should be chosen
+        """
+        from planner.frame import RectFrame
+        drawing = self.Drawing("auto")
+        self.assertTrue(drawing.autosize)
+        # empty sheet should fit title block
+        self.assertEqual(drawing.size, (297, 210))
+        drawing.add(RectFrame(50, 50, 210, 145, 10))
+        layout = drawing.layout()
+        self.assertEqual(layout.size, (420, 297))
+        self.assertEqual(layout.scale, 1)
+        self.assertEqual(layout.viewbox, (30, 40, 420, 297))
+        self.assertIn('viewBox="30 40 420 297"', str(drawing))
+        # plan doesn't fit the biggest sheet at 1:1
+        drawing.add(RectFrame(0, 0, 20000, 9000, 100))
+        self.assertEqual(drawing.layout(), ((1189, 841), 20, (-400, -200, 23780, 16820)))
+        self.assertEqual(self.Drawing.fit_sheet((0, 0, 20000, 9000), "A3"),
+                         ((297, 210), 100, (-2000, -1000, 29700, 21000)))
+        with self.assertRaises(ValueError):
+            self.Drawing.fit_sheet((0, 0, 10 ** 7, 10 ** 7))
+        # fixed sizes are shown at 1:1
+        self.assertEqual(self.drawing.layout(), ((420, 297), 1, (0, 0, 420, 297)))
+
+    def test_auto_size_title(self):
+        """
+        Title block of drawing with automatic size should be scaled to sheet and placed inside viewBox
+        """
+        import re
+        from planner.frame import RectFrame
+        from planner.frame.title import SampleTitle
+        drawing = self.Drawing("auto")
+        drawing.add(RectFrame(1000, 1000, 2000, 1500, 20))
+        title = SampleTitle(*drawing.size)
+        drawing.add(title)
+        rendered = str(drawing)
+        x, y, width, height = [float(value) for value in re.search(r'viewBox="([^"]+)"', rendered).group(1).split()]
+        dx, dy, scale = [float(value) for value in re.search(
+            r'<g transform="translate\(([^ ]+) ([^)]+)\) scale\(([^)]+)\)">', rendered).groups()]
+        x0, y0, x1, y1 = [dx + title.bbox[0] * scale, dy + title.bbox[1] * scale,
+                          dx + title.bbox[2] * scale, dy + title.bbox[3] * scale]
+        self.assertTrue(x <= x0 < x1 <= x + width and y <= y0 < y1 <= y + height)
+        # content is inside borders of title block
+        self.assertTrue(x0 <= 1000 and y0 <= 1000 and 3000 <= x1 and 2500 <= y1)
+
+    def test_bbox_changes(self):
+        """
+        Changes of objects inside bounding box of content should not cause its recalculation
+        """
+        from planner.frame import Rect
+        inner = Rect(10, 10, 10, 10)
+        self.drawing.add(Rect(0, 0, 100, 100))
+        self.drawing.add(inner)
+        self.assertEqual(self.drawing.bbox, (0, 0, 100, 100))
+        inner.corner = (200, 50)
+        self.assertIsNotNone(self.drawing._bbox_pending)
+        self.assertEqual(self.drawing.bbox, (0, 0, 210, 100))
+        # the object on the border has been moved, bounding box becomes smaller
+        inner.corner = (50, 50)
+        self.assertIsNone(self.drawing._bbox_pending)
+        self.assertEqual(self.drawing.bbox, (0, 0, 100, 100))
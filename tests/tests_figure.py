@@ -20,6 +20,10 @@ class TestFigure(BaseTestCase):
 
     def test_uuid_generation(self):
         """ Should return same uuid on each call of uuid property method """
+        from planner.drawing import Drawing
+        with self.assertRaises(ValueError):
+            self.figure.uuid
+        Drawing().add(self.figure)
         uuid = self.figure.uuid
         uuid2 = self.figure.uuid
         self.assertEqual(uuid, uuid2)
@@ -37,7 +41,7 @@ class TestFigure(BaseTestCase):
         import math
         # Check pattern element
         self.figure.add_hatching(self.ANGLE, self.DISTANCE, self.WIDTH, self.COLOR)
-        hatch = self.figure.hatch
+        hatch, = self.figure._defs()
         self.assertIsInstance(hatch, pattern.Pattern)
         self.assertAttrib(hatch, 'x', 0)
         self.assertAttrib(hatch, 'y', 0)
@@ -53,10 +57,15 @@ class TestFigure(BaseTestCase):
 
     def test_hatching_id(self):
         """
-        Hatching id should contain figure uuid
+        Hatching id should depend only on hatching parameters
         """
         self.figure.add_hatching(self.ANGLE, self.DISTANCE, self.WIDTH, self.COLOR)
-        self.assertIn(self.figure.uuid, self.figure._hatching_id)
+        figure = self.Figure()
+        figure.add_hatching(self.ANGLE, self.DISTANCE, self.WIDTH, self.COLOR)
+        self.assertEqual(self.figure._hatching_id, figure._hatching_id)
+        self.assertIs(self.figure.hatch, figure.hatch)
+        figure.add_hatching(self.ANGLE, self.DISTANCE + 1, self.WIDTH, self.COLOR)
+        self.assertNotEqual(self.figure._hatching_id, figure._hatching_id)
 
     def test_filling(self):
         """
@@ -106,3 +115,43 @@ class TestFigure(BaseTestCase):
         lp2 = (10, 10)
         point = (5, 5)
         self.assertTrue(self.figure._is_point_on_line(lp1, lp2, point))
+
+    def test_invalidation(self):
+        """
+        Cached rendering should be dropped on change of figure attributes
+        """
+        self.figure._fragment = 'cached'
+        self.figure.add_filling(self.COLOR)
+        self.assertIsNone(self.figure._fragment)
+        self.figure._fragment = 'cached'
+        del self.figure.filling
+        self.assertIsNone(self.figure._fragment)
+        # private attributes don't affect rendering
+        self.figure._fragment = 'cached'
+        self.figure._uuid = 'uuid'
+        self.assertEqual(self.figure._fragment, 'cached')
+
+    def test_bbox(self):
+        """
+        Figures should report bounding boxes of their geometry, cached until change
+        """
+        from planner.frame import Rect, RectFrame
+        from planner.frame.line import Line
+        from planner.frame.polygon import Polygon
+        from planner.frame.dimension import LinearDimension
+        from planner.frame.title import SampleTitle
+        rect = Rect(10, 20, 30, 40)
+        self.assertEqual(rect.bbox, (10, 20, 40, 60))
+        rect.size = (-10, 10)
+        self.assertEqual(rect.bbox, (0, 20, 10, 30))
+        self.assertEqual(Line((5, 1), (0, 8)).bbox, (0, 1, 5, 8))
+        self.assertEqual(Polygon([(0, 0), (5, -5), (10, 3)]).bbox, (0, -5, 10, 3))
+        frame = RectFrame(10, 10, 100, 50, 5)
+        self.assertEqual(frame.bbox, (10, 10, 110, 60))
+        self.assertEqual(frame.add_aperture(30, 10, 20).bbox, (30, 10, 50, 15))
+        self.assertEqual(frame.add_bulkhead(15, 30, 4).bbox, (15, 30, 105, 34))
+        self.assertEqual(SampleTitle(420, 297).bbox, (20, 10, 410, 287))
+        # dimension is bounded by its primitives including label
+        x0, y0, x1, y1 = LinearDimension((0, 0), (100, 0), "100").bbox
+        self.assertEqual((x0, x1), (0, 100))
+        self.assertLess(y0, -1)
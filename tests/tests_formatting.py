@@ -0,0 +1,79 @@
+from tests import BaseTestCase
+
+
+class TestNumberFormatter(BaseTestCase):
+
+    """
+    Test formatting of numbers in output
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.backend.formatting import number_formatter
+        cls.number_formatter = staticmethod(number_formatter)
+
+    def test_without_precision(self):
+        """
+        Numbers should be written as is without precision
+        """
+        format_number = self.number_formatter()
+        self.assertEqual(format_number(1.23456789), '1.23456789')
+        self.assertEqual(format_number(5), '5')
+
+    def test_decimal_precision(self):
+        """
+        Numbers should be rounded to precision without trailing zeros
+        """
+        format_number = self.number_formatter(0.01)
+        self.assertEqual(format_number(1.23456789), '1.23')
+        self.assertEqual(format_number(1.5), '1.5')
+        self.assertEqual(format_number(2.0), '2')
+        self.assertEqual(format_number(7), '7')
+        self.assertEqual(format_number(-0.001), '0')
+        self.assertEqual(format_number(-12.345678), '-12.35')
+
+    def test_step_precision(self):
+        """
+        Numbers should be rounded to multiples of precision
+        """
+        format_number = self.number_formatter(0.5)
+        self.assertEqual(format_number(1.2), '1')
+        self.assertEqual(format_number(1.3), '1.5')
+        format_number = self.number_formatter(10)
+        self.assertEqual(format_number(1234.5), '1230')
+
+    def test_wrong_precision(self):
+        """
+        Should raise ValueError on non-positive precision
+        """
+        with self.assertRaises(ValueError):
+            self.number_formatter(0)
+
+
+class TestPrepareArray(BaseTestCase):
+
+    """
+    Test vectorized formatting of numbers arrays
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.backend.formatting import number_formatter, prepare_array
+        cls.number_formatter = staticmethod(number_formatter)
+        cls.prepare_array = staticmethod(prepare_array)
+
+    def format(self, values, precision):
+        numbers, specifier = self.prepare_array(values, precision)
+        return [specifier % number for number in numbers]
+
+    def test_same_as_scalar(self):
+        """
+        Array should be formatted exactly as with scalar formatter
+        """
+        values = [1.23456789, 1.5, 2.0, 7.0, -0.001, -12.345678, 1234.5, 0.3]
+        for precision in (None, 0.01, 0.5, 1, 10):
+            format_number = self.number_formatter(precision)
+            self.assertEqual(self.format(values, precision), [format_number(value) for value in values])
+
+    def test_empty(self):
+        self.assertEqual(self.format([], 0.01), [])
@@ -0,0 +1,113 @@
+from tests import BaseTestCase
+
+
+class TestPointsOnSegments(BaseTestCase):
+
+    """
+    Test point-on-segment predicates
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner import geometry
+        cls.geometry = geometry
+
+    def test_scalar(self):
+        """
+        Points should lie on segment within tolerance
+        """
+        self.assertTrue(self.geometry.is_point_on_segment((0, 0), (10, 10), (5, 5)))
+        self.assertTrue(self.geometry.is_point_on_segment((0, 0), (0.3, 0.3), (0.1, 0.1)))
+        self.assertTrue(self.geometry.is_point_on_segment((0, 0), (10, 0), (10, 1e-9)))
+        self.assertFalse(self.geometry.is_point_on_segment((0, 0), (10, 0), (10, 1e-3)))
+        self.assertTrue(self.geometry.is_point_on_segment((0, 0), (10, 0), (10, 1e-3), tolerance=0.01))
+        self.assertFalse(self.geometry.is_point_on_segment((0, 0), (10, 0), (10.1, 0)))
+        self.assertFalse(self.geometry.is_point_on_segment((0, 0), (10, 0), (-0.1, 0)))
+        self.assertTrue(self.geometry.is_point_on_segment((1, 1), (1, 1), (1, 1)))
+        self.assertFalse(self.geometry.is_point_on_segment((1, 1), (1, 1), (1, 2)))
+
+    def test_vectorized(self):
+        """
+        Vectorized predicate should be the same as scalar one
+        """
+        segments = [((0, 0), (10, 0)), ((10, 0), (10, 10)), ((0, 0), (10, 10)), ((3, 3), (3, 3))]
+        points = [(5, 0), (10, 0), (10, 5), (5, 5), (5, 6), (3, 3), (11, 0), (5, 1e-9)]
+        expected = [[self.geometry.is_point_on_segment(start, end, point) for start, end in segments]
+                    for point in points]
+        starts = [segment[0] for segment in segments]
+        ends = [segment[1] for segment in segments]
+        res = self.geometry.points_on_segments([[point] for point in points], [starts], [ends])
+        self.assertEqual(res.tolist(), expected)
+        self.assertEqual(self.geometry.match_segments(points, starts, ends).tolist(), [0, 0, 1, 2, -1, 2, -1, 0])
+
+    def test_match_chunks(self):
+        """
+        Should match points by chunks
+        """
+        original = self.geometry.MATCH_CHUNK_SIZE
+        self.geometry.MATCH_CHUNK_SIZE = 4
+        try:
+            points = [(x, x % 3) for x in range(10)]
+            res = self.geometry.match_segments(points, [(0, 0), (0, 1)], [(20, 0), (20, 1)])
+        finally:
+            self.geometry.MATCH_CHUNK_SIZE = original
+        self.assertEqual(res.tolist(), [0, 1, -1, 0, 1, -1, 0, 1, -1, 0])
+        self.assertEqual(self.geometry.match_segments(points, [], []).tolist(), [-1] * 10)
+
+
+class TestRects(BaseTestCase):
+
+    """
+    Test algorithms on rectangles
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner import geometry
+        cls.geometry = geometry
+
+    def test_touching_rects(self):
+        """
+        Found pairs should be the same as found by checking of every pair
+        """
+        import random
+        generator = random.Random(1)
+        for _ in range(50):
+            rects = []
+            for _ in range(30):
+                x, y = generator.randint(0, 30), generator.randint(0, 30)
+                rects.append((x, y, x + generator.randint(0, 8), y + generator.randint(0, 8)))
+            expected = set((first, second) for first in range(len(rects)) for second in range(first + 1, len(rects))
+                           if self.geometry.bboxes_intersect(rects[first], rects[second]))
+            found = set(tuple(sorted(pair)) for pair in self.geometry.find_touching_rects(rects))
+            self.assertEqual(found, expected)
+
+    def test_touching_rects_parallel(self):
+        """
+        Parallel full-width rectangles without pairs should be checked without scanning of every pair
+        """
+        import time
+        rects = [(5, index * 20, 995, index * 20 + 5) for index in range(8000)]
+        started = time.perf_counter()
+        self.assertEqual(self.geometry.find_touching_rects(rects), [])
+        self.assertLess(time.perf_counter() - started, 1.5)
+
+    def test_rects_outline(self):
+        """
+        Outline should go around union of rectangles, adjacent collinear edges should be joined
+        """
+        # cross
+        outline = self.geometry.rects_outline([(0, 10, 30, 20), (10, 0, 20, 30)])
+        self.assertLength(outline, 12)
+        self.assertIn(((0, 10), (0, 20)), outline)
+        self.assertIn(((10, 0), (20, 0)), outline)
+        self.assertIn(((0, 10), (10, 10)), outline)
+        # touching rectangles of the same height form one rectangle
+        outline = self.geometry.rects_outline([(0, 0, 10, 10), (10, 0, 20, 10)])
+        self.assertEqual(sorted(outline), [((0, 0), (0, 10)), ((0, 0), (20, 0)), ((0, 10), (20, 10)),
+                                           ((20, 0), (20, 10))])
+        # frame of four rectangles has inner outline
+        outline = self.geometry.rects_outline([(0, 0, 30, 5), (0, 25, 30, 30), (0, 0, 5, 30), (25, 0, 30, 30)])
+        self.assertLength(outline, 8)
+        self.assertIn(((5, 5), (5, 25)), outline)
+        self.assertEqual(self.geometry.rects_outline([(0, 0, 0, 10)]), [])
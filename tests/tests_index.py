@@ -0,0 +1,103 @@
+from tests import BaseTestCase
+
+
+class TestIntervalIndex(BaseTestCase):
+
+    """
+    Test index of intervals
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.index import IntervalIndex
+        cls.IntervalIndex = IntervalIndex
+
+    def setUp(self):
+        self.index = self.IntervalIndex()
+        self.index.add(30, 40, "b")
+        self.index.add(10, 20, "a")
+        self.index.add(40, 45, "c")
+
+    def test_sorted(self):
+        """
+        Intervals should be kept in order of starts
+        """
+        self.assertEqual(list(self.index), [(10, 20, "a"), (30, 40, "b"), (40, 45, "c")])
+        self.assertLength(self.index, 3)
+
+    def test_find_overlapping(self):
+        """
+        Should find interval overlapping with specified one, touching intervals don't overlap
+        """
+        self.assertEqual(self.index.find_overlapping(15, 25), "a")
+        self.assertEqual(self.index.find_overlapping(5, 11), "a")
+        self.assertEqual(self.index.find_overlapping(12, 13), "a")
+        self.assertEqual(self.index.find_overlapping(0, 100), "a")
+        self.assertEqual(self.index.find_overlapping(25, 31), "b")
+        self.assertIsNone(self.index.find_overlapping(20, 30))
+        self.assertIsNone(self.index.find_overlapping(0, 10))
+        self.assertIsNone(self.index.find_overlapping(45, 50))
+
+    def test_add_overlapping(self):
+        """
+        Should raise ValueError on overlapping interval
+        """
+        with self.assertRaises(ValueError):
+            self.index.add(18, 22, "d")
+        with self.assertRaises(ValueError):
+            self.index.add(30, 40, "d")
+        self.assertLength(self.index, 3)
+
+    def test_remove(self):
+        self.index.remove(30, "b")
+        self.assertEqual(list(self.index), [(10, 20, "a"), (40, 45, "c")])
+        with self.assertRaises(ValueError):
+            self.index.remove(30, "b")
+
+    def test_free_spans(self):
+        """
+        Should return gaps between intervals inside of specified range
+        """
+        self.assertEqual(self.index.free_spans(0, 50), [(0, 10), (20, 30), (45, 50)])
+        self.assertEqual(self.index.free_spans(15, 35), [(20, 30)])
+        self.assertEqual(self.index.free_spans(0, 50, min_length=10), [(0, 10), (20, 30)])
+        self.assertEqual(self.IntervalIndex().free_spans(0, 5), [(0, 5)])
+
+
+class TestGridIndex(BaseTestCase):
+
+    """
+    Test spatial index
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.index import GridIndex
+        cls.GridIndex = GridIndex
+
+    def setUp(self):
+        self.index = self.GridIndex(10)
+        self.index.insert("c", (50, 50, 60, 60), 3)
+        self.index.insert("a", (0, 0, 5, 5), 1)
+        self.index.insert("b", (8, 8, 25, 12), 2)
+        self.index.insert("large", (-1000, -1000, 1000, 1000), 4)
+        self.index.insert("unbounded", None, 0)
+
+    def test_query(self):
+        """
+        Should find items intersecting bounding box ordered by keys
+        """
+        self.assertEqual(self.index.query((0, 0, 9, 9)), ["unbounded", "a", "b", "large"])
+        self.assertEqual(self.index.query((20, 10, 30, 30)), ["unbounded", "b", "large"])
+        self.assertEqual(self.index.query((2000, 2000, 2010, 2010)), ["unbounded"])
+        self.assertEqual(self.index.query((-5000, -5000, 5000, 5000)), ["unbounded", "a", "b", "c", "large"])
+
+    def test_update_and_remove(self):
+        """
+        Should move item on reinsertion keeping its key and forget removed item
+        """
+        self.index.insert("a", (55, 55, 58, 58))
+        self.assertEqual(self.index.query((50, 50, 56, 56)), ["unbounded", "a", "c", "large"])
+        self.index.remove("a")
+        self.assertNotIn("a", self.index)
+        self.assertEqual(self.index.query((0, 0, 60, 60)), ["unbounded", "b", "c", "large"])
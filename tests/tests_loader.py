@@ -0,0 +1,133 @@
+from tests import BaseTestCase
+import io
+import json
+
+
+class TestLoader(BaseTestCase):
+
+    """
+    Test import of plans from JSON specs
+    """
+
+    SPEC = {
+        "size": [400, 300],
+        "precision": 0.01,
+        "figures": [
+            {"type": "RectFrame", "x": 50, "y": 50, "width": 210, "height": 145, "wall_width": 10,
+             "attribs": {"stroke-width": "1"}, "hatching": {"angle": 45, "distance": 4, "color": "#999"},
+             "apertures": [{"x": 50, "y": 70, "width": 40}, {"x": 100, "y": 50, "width": 40}],
+             "bulkheads": [{"x": 145, "y": 60, "width": 10, "hatching": {"angle": 60}}]},
+            {"type": "LinearDimension", "start_point": [155, 100], "end_point": [250, 100], "label": "95"},
+            {"type": "ExtensionableLinearDimension", "start_point": [50, 50], "end_point": [260, 50],
+             "label": "210", "direction": -1},
+            {"type": "SampleTitle", "width": 400, "height": 300, "title": "Проект"}]}
+
+    @classmethod
+    def setUpClass(cls):
+        from planner import loader
+        from planner.drawing import Drawing
+        from planner.frame import RectFrame
+        from planner.frame.dimension import LinearDimension, ExtensionableLinearDimension
+        from planner.frame.title import SampleTitle
+        cls.loader = loader
+        cls.Drawing = Drawing
+        cls.RectFrame = RectFrame
+        cls.LinearDimension = LinearDimension
+        cls.ExtensionableLinearDimension = ExtensionableLinearDimension
+        cls.SampleTitle = SampleTitle
+
+    def _create_drawing(self):
+        drawing = self.Drawing((400, 300), precision=0.01)
+        frame = self.RectFrame(50, 50, 210, 145, 10, **{"stroke-width": "1"})
+        frame.add_hatching(45, 4, color="#999")
+        frame.add_aperture(50, 70, 40)
+        frame.add_aperture(100, 50, 40)
+        frame.add_bulkhead(145, 60, 10).add_hatching(60)
+        drawing.add(frame)
+        drawing.add(self.LinearDimension((155, 100), (250, 100), "95"))
+        drawing.add(self.ExtensionableLinearDimension((50, 50), (260, 50), "210", direction=-1))
+        drawing.add(self.SampleTitle(400, 300, "Проект"))
+        return drawing
+
+    def test_read_drawing(self):
+        """
+        Should build the same drawing as created by hand, reading spec by small chunks
+        """
+        data = json.dumps(self.SPEC, ensure_ascii=False, indent=2).encode('utf-8')
+        drawing = self.loader.read_drawing(io.BytesIO(data), batch_size=2, chunk_size=7)
+        self.assertEqual(drawing.size, (400, 300))
+        self.assertLength(drawing.objects, 4)
+        self.assertEqual(drawing.objects[1].start_point, (155, 100))
+        self.assertEqual(drawing.objects[3].title, "Проект")
+        self.assertEqual(drawing.render(), self._create_drawing().render())
+
+    def test_iter_figures(self):
+        """
+        Should generate figures without drawing
+        """
+        figures = list(self.loader.iter_figures(io.StringIO(json.dumps(self.SPEC)), chunk_size=3))
+        self.assertEqual([type(figure) for figure in figures],
+                         [self.RectFrame, self.LinearDimension, self.ExtensionableLinearDimension, self.SampleTitle])
+        self.assertLength(figures[0].apertures, 2)
+
+    def test_settings(self):
+        """
+        Should create drawing without figures and with numbers split by chunks
+        """
+        drawing = self.loader.loads('{"size": "A4", "precision": 0.125}')
+        self.assertEqual(drawing.size, (297, 210))
+        self.assertEqual(drawing.backend.precision, 0.125)
+        drawing = self.loader.read_drawing(io.StringIO('{"precision": 0.12345, "figures": []}'), chunk_size=1)
+        self.assertEqual(drawing.backend.precision, 0.12345)
+        self.assertLength(drawing.objects, 0)
+
+    def test_validation(self):
+        """
+        Should report all errors of batch with positions of figures
+        """
+        spec = {"figures": [
+            {"type": "Rect", "x": 1},
+            {"type": "Unknown"},
+            {"type": "LinearDimension", "start_point": [0, 0], "label": "1", "foo": 1},
+            {"type": "RectFrame", "apertures": [{"x": 1, "y": "2"}], "hatching": {"step": 1}}]}
+        with self.assertRaises(ValueError) as context:
+            self.loader.loads(json.dumps(spec))
+        message = str(context.exception)
+        self.assertIn("figures[1]: unknown figure type 'Unknown'", message)
+        self.assertIn("figures[2]: missing parameter 'end_point'", message)
+        self.assertIn("figures[2]: unknown parameter 'foo'", message)
+        self.assertIn("figures[3].apertures[0]: missing parameter 'width'", message)
+        self.assertIn("figures[3].apertures[0]: y should be a number", message)
+        self.assertIn("figures[3].hatching: unknown parameter 'step'", message)
+        self.assertNotIn("figures[0]", message)
+
+    def test_invalid_json(self):
+        """
+        Should raise ValueError on malformed specs
+        """
+        for text in ('{"figures": [{"type": "Rect"}', '{"figures": [], "size": "A4"}', '{"size": "A4"} []', '[]'):
+            with self.assertRaises(ValueError):
+                self.loader.loads(text)
+
+    def test_value_types(self):
+        """
+        Badly typed values should be reported as ValueError with position of value
+        """
+        cases = [
+            ({"type": "RectFrame", "x": "abc"}, "figures[0]: x should be a number"),
+            ({"type": "Line", "start_point": 5, "end_point": [1, 1]}, "figures[0]: start_point should be a point"),
+            ({"type": "Rect", "hatching": {"angle": "x"}}, "figures[0].hatching: angle should be a number"),
+            ({"type": "RectFrame", "bulkheads": [{"x": 1, "y": 1, "width": [1]}]},
+             "figures[0].bulkheads[0]: width should be a number"),
+            ({"type": "DimensionSet", "start_points": [[0, 0]], "end_points": [[1, 1]], "labels": "a"},
+             "figures[0]: labels should be a list of strings"),
+            # errors found by constructor
+            ({"type": "DimensionSet", "start_points": [[0, 0]], "end_points": [[1, 1]], "labels": ["a", "b"]},
+             "figures[0]: Count of start points"),
+            ({"type": "PolygonBatch", "rings": [[[0, 0], [1, "a"]]]}, "figures[0]: ")]
+        for figure, message in cases:
+            with self.assertRaises(ValueError) as context:
+                self.loader.loads(json.dumps({"figures": [{"type": "Rect"}, figure]}))
+            self.assertIn(message.replace("figures[0]", "figures[1]"), str(context.exception))
+        with self.assertRaises(ValueError):
+            self.loader.loads('{"size": "A4", "cache": true, "precision": "high"}')
@@ -0,0 +1,81 @@
+from tests import BaseTestCase
+
+
+class TestLevelOfDetail(BaseTestCase):
+
+    """
+    Test simplified rendering at small scales
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.lod import LevelOfDetail
+        cls.LevelOfDetail = LevelOfDetail
+
+    def setUp(self):
+        from planner.drawing import Drawing
+        from planner.frame import RectFrame
+        from planner.frame.dimension import LinearDimension, AngleDimension
+        self.drawing = Drawing()
+        self.rect_frame = RectFrame(10, 10, 200, 100, 10)
+        self.rect_frame.add_hatching()
+        self.drawing.add(self.rect_frame)
+        self.dimension = LinearDimension((10, 150), (210, 150), "200")
+        self.drawing.add(self.dimension)
+        self.angle_dimension = AngleDimension((10, 200), (50, 200), "30")
+        self.drawing.add(self.angle_dimension)
+
+    def test_thresholds(self):
+        """
+        Details should be enabled by thresholds
+        """
+        lod = self.LevelOfDetail(1.5)
+        self.assertFalse(lod.hatching)
+        self.assertTrue(lod.text)
+        self.assertTrue(lod.arrows)
+        self.assertEqual(lod.min_size, 1 / 1.5)
+        lod = self.LevelOfDetail(0.5, text_scale=0.1, min_pixels=2)
+        self.assertTrue(lod.text)
+        self.assertFalse(lod.arrows)
+        self.assertEqual(lod.min_size, 4)
+        with self.assertRaises(ValueError):
+            self.LevelOfDetail(0)
+
+    def test_full_detail(self):
+        """
+        Rendering at large scale should be the same as full detail rendering
+        """
+        self.assertEqual(self.drawing.render(scale=10), str(self.drawing))
+
+    def test_overview(self):
+        """
+        Hatching, texts and arrows should be dropped at small scale
+        """
+        overview = self.drawing.render(scale=0.5)
+        self.assertNotIn("<pattern", overview)
+        self.assertNotIn("url(#hatching", overview)
+        self.assertNotIn("<text", overview)
+        self.assertNotIn("<polygon", overview)
+        self.assertNotIn("<marker", overview)
+        self.assertNotIn("marker-start", overview)
+        # frame walls and dimension line are kept
+        self.assertIn('height="10" width="200" x="10" y="10"', overview)
+        self.assertIn("<line", overview)
+        self.assertLess(len(overview), len(str(self.drawing)))
+
+    def test_tiny_figures(self):
+        """
+        Figures smaller than pixel should be dropped
+        """
+        from planner.frame import Rect
+        self.drawing.add(Rect(300, 200, 0.5, 0.5, id="tiny"))
+        self.assertIn('id="tiny"', self.drawing.render(scale=4))
+        self.assertNotIn('id="tiny"', self.drawing.render(scale=1))
+
+    def test_cache_key(self):
+        """
+        Cached fragments of different levels of detail should not be mixed
+        """
+        full = str(self.drawing)
+        self.drawing.render(scale=0.5)
+        self.assertEqual(str(self.drawing), full)
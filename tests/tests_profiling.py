@@ -0,0 +1,110 @@
+from tests import BaseTestCase
+
+
+class TestRenderProfile(BaseTestCase):
+
+    """
+    Test rendering instrumentation
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.profiling import RenderProfile
+        from planner.drawing import Drawing
+        from planner.frame import Rect, RectFrame
+        from planner.frame.dimension import LinearDimension
+        cls.RenderProfile = RenderProfile
+        cls.Drawing = Drawing
+        cls.Rect = Rect
+        cls.RectFrame = RectFrame
+        cls.LinearDimension = LinearDimension
+
+    def setUp(self):
+        self.profile = self.RenderProfile()
+        self.drawing = self.Drawing(instrument=self.profile)
+        self.frame = self.RectFrame(10, 10, 100, 100, 5)
+        self.frame.add_hatching()
+        self.drawing.add(self.frame)
+        self.drawing.add(self.Rect(0, 0, 10, 10))
+        self.drawing.add(self.LinearDimension((0, 200), (100, 200), "100"))
+
+    def test_collect(self):
+        """
+        Should collect statistics of every object and stage
+        """
+        rendered = self.drawing.render()
+        self.assertEqual(sorted(self.profile.classes), ["LinearDimension", "Rect", "RectFrame"])
+        self.assertEqual(sorted(self.profile.stages), ["body", "defs", "draw"])
+        frame_stats = self.profile.objects[self.frame]
+        # drawing and serialization of defs and of elements
+        self.assertEqual(frame_stats.calls, 4)
+        self.assertGreater(frame_stats.seconds, 0)
+        # pattern with rect and 3 lines
+        self.assertEqual(self.profile.stages["defs"].elements, 5)
+        self.assertEqual(self.profile.stages["draw"].size, 0)
+        # header, footer and defs tags are not included
+        self.assertLess(self.profile.total.size, len(rendered))
+        self.drawing._render_body(self.frame)
+        self.assertEqual(self.profile.stages["body"].calls, 4)
+        self.assertEqual(frame_stats.calls, 6)
+
+    def test_stages(self):
+        """
+        Drawing of primitives and serialization should be measured separately on every rendering
+        """
+        import time
+
+        class SlowRect(self.Rect):
+
+            """ Rect with slow description with primitives """
+
+            def _primitives(self):
+                time.sleep(0.05)
+                return super(SlowRect, self)._primitives()
+
+        drawing = self.Drawing(instrument=self.profile)
+        rect = SlowRect(0, 0, 10, 10)
+        drawing.add(rect)
+        for _ in range(2):
+            str(drawing)
+        stats = self.profile.stages
+        # cache is bypassed, so every rendering is measured
+        self.assertEqual(stats["draw"].calls, 4)
+        self.assertEqual(stats["body"].calls, 2)
+        self.assertGreaterEqual(stats["draw"].seconds, 0.1)
+        self.assertLess(stats["body"].seconds + stats["defs"].seconds, 0.05)
+        self.assertEqual(stats["draw"].elements, 2)
+        self.assertEqual(stats["body"].elements, 2)
+        self.assertIsNone(rect._fragment)
+
+    def test_report(self):
+        """
+        Report should contain classes and slowest objects, metrics should be flat dict
+        """
+        str(self.drawing)
+        report = self.profile.report(slowest=1)
+        self.assertIn("RectFrame", report)
+        self.assertIn("LinearDimension", report)
+        self.assertEqual(report.count(" at ("), 1)
+        metrics = self.profile.metrics()
+        self.assertEqual(metrics["render.class.Rect.calls"], 4)
+        self.assertEqual(metrics["render.total.size"], self.profile.total.size)
+        self.assertIn("render.stage.defs.seconds", metrics)
+        self.profile.clear()
+        self.assertEqual(self.profile.metrics(), {
+            "render.total.calls": 0, "render.total.seconds": 0.0, "render.total.elements": 0, "render.total.size": 0})
+
+    def test_tiles(self):
+        """
+        Rendering of tiles should be measured by fragments
+        """
+        import tempfile
+        import shutil
+        out_dir = tempfile.mkdtemp()
+        try:
+            self.drawing.render_tiles(zoom_levels=1, out_dir=out_dir)
+        finally:
+            shutil.rmtree(out_dir)
+        self.assertEqual(sorted(self.profile.stages), ["body", "defs", "draw"])
+        self.assertEqual(self.profile.stages["body"].calls, 3)
+        self.assertEqual(self.profile.stages["draw"].calls, 6)
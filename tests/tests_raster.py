@@ -0,0 +1,157 @@
+from tests import BaseTestCase
+
+
+class TestRasterBackend(BaseTestCase):
+
+    """
+    Test rasterization of drawings
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.backend.raster import RasterBackend, encode_png, parse_color
+        cls.RasterBackend = RasterBackend
+        cls.encode_png = staticmethod(encode_png)
+        cls.parse_color = staticmethod(parse_color)
+
+    def setUp(self):
+        from planner.drawing import Drawing
+        self.drawing = Drawing((100, 50))
+
+    def test_parse_color(self):
+        self.assertEqual(self.parse_color("#fff"), (255, 255, 255))
+        self.assertEqual(self.parse_color("#00ff80"), (0, 255, 128))
+        self.assertEqual(self.parse_color("rgb(1, 2, 3)"), (1, 2, 3))
+        self.assertEqual(self.parse_color("black"), (0, 0, 0))
+        self.assertIsNone(self.parse_color("none"))
+
+    def test_encode_png(self):
+        """
+        Should write valid PNG structure with raw scanlines
+        """
+        import numpy as np
+        import struct
+        import zlib
+        image = np.zeros((2, 3, 3), dtype=np.uint8)
+        image[1, 2] = (255, 0, 0)
+        png = self.encode_png(image)
+        self.assertEqual(png[:8], b'\x89PNG\r\n\x1a\n')
+        self.assertEqual(struct.unpack('>II', png[16:24]), (3, 2))
+        length, = struct.unpack('>I', png[33:37])
+        self.assertEqual(png[37:41], b'IDAT')
+        scanlines = zlib.decompress(png[41:41 + length])
+        self.assertEqual(scanlines, b'\x00' + b'\x00' * 9 + b'\x00' + b'\x00' * 6 + b'\xff\x00\x00')
+        self.assertTrue(png.endswith(b'IEND\xaeB`\x82'))
+
+    def test_render_rect(self):
+        """
+        Should fill and stroke rectangle in image coordinates
+        """
+        from planner.frame import Rect
+        self.drawing.add(Rect(10, 10, 20, 10, fill="#f00", stroke="#00f", **{"stroke-width": 2}))
+        image = self.RasterBackend(width=100).render(self.drawing)
+        self.assertEqual(image.shape, (50, 100, 3))
+        self.assertEqual(tuple(image[15, 20]), (255, 0, 0))
+        self.assertEqual(tuple(image[10, 20]), (0, 0, 255))
+        self.assertEqual(tuple(image[15, 10]), (0, 0, 255))
+        self.assertEqual(tuple(image[40, 60]), (255, 255, 255))
+
+    def test_render_auto_size_title(self):
+        """
+        Title block of drawing with automatic size should be drawn in sheet units
+        """
+        from planner.frame import RectFrame
+        from planner.frame.title import SampleTitle
+        from planner.drawing import Drawing
+        drawing = Drawing("auto")
+        drawing.add(RectFrame(1000, 1000, 2000, 1500, 20))
+        drawing.add(SampleTitle(*drawing.size))
+        image = self.RasterBackend(width=420).render(drawing)
+        dark = (image < 128).any(axis=2)
+        # left border of title block is 20 mm from the sheet edge (420 px per 1189 mm)
+        self.assertTrue(dark[100, 7])
+        self.assertFalse(dark[100, :6].any())
+
+    def test_render_frame_with_hatching(self):
+        """
+        Should draw walls with hatching and skip texts
+        """
+        import numpy as np
+        from planner.frame import RectFrame
+        from planner.frame.dimension import LinearDimension
+        rect_frame = RectFrame(0, 0, 100, 50, 10)
+        rect_frame.add_hatching(distance=4, color="#000")
+        self.drawing.add(rect_frame)
+        self.drawing.add(LinearDimension((20, 25), (80, 25), "60"))
+        image = self.RasterBackend(width=200).render(self.drawing)
+        self.assertEqual(image.shape, (100, 200, 3))
+        wall = image[4:16, 25:175].reshape(-1, 3)
+        colors = set(map(tuple, wall.tolist()))
+        self.assertIn((0, 0, 0), colors)
+        self.assertIn((255, 255, 255), colors)
+        # room is empty except of dimension line
+        room = image[30:45, 30:170]
+        self.assertTrue((room == 255).all())
+        self.assertTrue((image[49:51, 60:140, 0] == 0).any(axis=0).all())
+        self.assertGreater(np.count_nonzero(image[40:60, 40:45] == 0), 0)
+
+    def test_pattern_tile_cache(self):
+        """
+        Tile of pattern shared by many figures should be rendered once per canvas
+        """
+        from planner.frame import Rect
+        from planner.backend.raster import _Canvas
+        for index in range(5):
+            rect = Rect(index * 20, 0, 10, 10)
+            rect.add_hatching(distance=4)
+            self.drawing.add(rect)
+        canvas = _Canvas(100, 50, 1.0, (0, 0), (255, 255, 255))
+        tile_draws = []
+
+        class CountingBackend(self.RasterBackend):
+
+            """ Count primitives drawn on tiles of patterns """
+
+            def draw(self, target, primitive, patterns):
+                if target is not canvas:
+                    tile_draws.append(primitive)
+                super(CountingBackend, self).draw(target, primitive, patterns)
+
+        backend = CountingBackend(width=100)
+        patterns = {rect.hatch.id: rect.hatch.pattern}
+        for obj in self.drawing.objects:
+            for primitive in obj._primitives():
+                backend.draw(canvas, primitive, patterns)
+        self.assertEqual(list(canvas.tiles), [(rect.hatch.id, 1.0)])
+        self.assertLength(tile_draws, len(rect.hatch.pattern.elements))
+
+    def test_supersampling(self):
+        """
+        Supersampled image should have the same size with intermediate colors on edges
+        """
+        from planner.frame.line import Line
+        self.drawing.add(Line((0, 0), (100, 50)))
+        image = self.RasterBackend(width=100, supersampling=4).render(self.drawing)
+        self.assertEqual(image.shape, (50, 100, 3))
+        values = set(image.reshape(-1).tolist())
+        self.assertGreater(len(values), 2)
+
+    def test_render_many_png(self):
+        """
+        Should write PNG thumbnails of drawings
+        """
+        import os
+        import shutil
+        import tempfile
+        from planner.batch import render_many_png
+        from planner.frame import Rect
+        self.drawing.add(Rect(10, 10, 20, 10))
+        out_dir = tempfile.mkdtemp()
+        try:
+            results = render_many_png([self.drawing, self.drawing], out_dir, width=64, workers=1)
+            self.assertEqual([os.path.basename(result.path) for result in results],
+                             ['drawing-1.png', 'drawing-2.png'])
+            with open(results[0].path, 'rb') as png:
+                self.assertEqual(png.read(), self.RasterBackend(64).render_png(self.drawing))
+        finally:
+            shutil.rmtree(out_dir)
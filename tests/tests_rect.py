@@ -51,8 +51,8 @@ class TestRect(BaseTestCase):
         """
         self.rect.add_hatching(self.ANGLE, self.DISTANCE, self.WIDTH, self.COLOR)
         svg_objects = self.rect._draw()
-        self.assertEqual(self.rect.hatch, svg_objects[0])
-        self.assertStyle(svg_objects[1], 'fill', 'url(#{})'.format(self.rect._hatching_id))
+        self.assertIn(self.rect.hatch.pattern, self.rect._defs_primitives())
+        self.assertStyle(svg_objects[0], 'fill', 'url(#{})'.format(self.rect._hatching_id))
 
     def test_filling(self):
         """
@@ -80,8 +80,8 @@ class TestRectFrame(BaseTestCase):
         """
         self.rect_frame.add_hatching(self.ANGLE, self.DISTANCE, self.WIDTH, self.COLOR)
         svg_objects = self.rect_frame._draw()
-        self.assertEqual(self.rect_frame.hatch, svg_objects[0])
-        self.assertStyle(svg_objects[1], 'fill', 'url(#{})'.format(self.rect_frame._hatching_id))
+        self.assertIn(self.rect_frame.hatch.pattern, self.rect_frame._defs_primitives())
+        self.assertStyle(svg_objects[0], 'fill', 'url(#{})'.format(self.rect_frame._hatching_id))
 
     def test_filling(self):
         """
@@ -98,6 +98,16 @@ class TestRectFrame(BaseTestCase):
         with self.assertRaisesRegex(ValueError, "not located on the wall border"):
             self.rect_frame.add_aperture(0, 0, 50)
 
+    def test_point_on_walls(self):
+        """
+        Single points and arrays of points should be matched with walls borders the same way
+        """
+        walls = self.rect_frame._get_aperture_lines_coordinates()
+        points = [(10, 100), (100, 20), (50, 50), (10, 20), (9, 100), (335, 100)]
+        matched = self.rect_frame._match_walls(points).tolist()
+        self.assertEqual([self.rect_frame._is_point_on_lines(walls, point) for point in points],
+                         [index >= 0 for index in matched])
+
     def test_add_aperture_with_correct_coordinates(self):
         """
         Test apperture with correct coordinates
@@ -128,6 +138,72 @@ class TestRectFrame(BaseTestCase):
         with self.assertRaisesRegex(ValueError, "Aperture width exceed wall sizes"):
             self.rect_frame.add_aperture(45, 245, 350)
 
+    def test_overlapping_apertures_validation(self):
+        """
+        Should raise ValueError on aperture overlapping with other aperture in the same wall
+        """
+        self.rect_frame.add_aperture(55, 20, 50)
+        with self.assertRaises(ValueError):
+            self.rect_frame.add_aperture(100, 20, 50)
+        with self.assertRaises(ValueError):
+            self.rect_frame.add_aperture(40, 20, 20)
+        # touching apertures and apertures in other walls are allowed
+        self.rect_frame.add_aperture(105, 20, 50)
+        self.rect_frame.add_aperture(45, 245, 50)
+        self.assertLength(self.rect_frame.apertures, 3)
+
+    def test_add_apertures(self):
+        """
+        Should validate all apertures at once before adding
+        """
+        self.rect_frame.add_aperture(55, 20, 50)
+        apertures = self.rect_frame.add_apertures([(105, 20, 50), (10, 45, 20), (335, 100, 20.5), (45, 245, 50)],
+                                                  fill="#eee")
+        self.assertLength(apertures, 4)
+        self.assertLength(self.rect_frame.apertures, 5)
+        self.assertEqual(apertures[2].wall_start_point, (335, 45))
+        self.assertEqual(apertures[0].attribs["fill"], "#eee")
+        self.assertIs(apertures[3]._parent, self.rect_frame)
+        invalid = [
+            [(200, 20, 10), (200, 21, 10)],  # not on the wall
+            [(200, 20, 10), (300, 245, 50)],  # exceeds the wall
+            [(200, 20, 10), (205, 20, 10)],  # overlaps with new aperture
+            [(200, 20, 10), (200, 20, 0)],
+            [(200, 20, 10), (60, 20, 10)]]  # overlaps with existing aperture
+        for specs in invalid:
+            with self.assertRaises(ValueError):
+                self.rect_frame.add_apertures(specs)
+        self.assertLength(self.rect_frame.apertures, 5)
+        self.assertEqual(self.rect_frame.add_apertures([]), [])
+        # almost on the wall border
+        self.rect_frame.add_apertures([(10 + 1e-9, 150, 10)])
+        self.assertEqual(self.rect_frame.free_spans("left"), [(10, 65, 85), (10, 160, 85)])
+
+    def test_free_spans(self):
+        """
+        Should return free parts of wall border as arguments for new apertures
+        """
+        self.rect_frame.add_aperture(55, 20, 50)
+        self.rect_frame.add_aperture(10, 50, 50)
+        self.assertEqual(self.rect_frame.free_spans("top"), [(35, 20, 20), (105, 20, 230)])
+        self.assertEqual(self.rect_frame.free_spans("top", min_width=50), [(105, 20, 230)])
+        self.assertEqual(self.rect_frame.free_spans("left"), [(10, 45, 5), (10, 100, 145)])
+        x, y, width = self.rect_frame.free_spans("top")[0]
+        self.rect_frame.add_aperture(x, y, width)
+
+    def test_free_spans_after_geometry_change(self):
+        """
+        Apertures index should follow walls after change of frame geometry
+        """
+        self.rect_frame.add_aperture(55, 20, 50)
+        self.rect_frame.width = 450
+        self.assertEqual(self.rect_frame.free_spans("top"), [(35, 20, 20), (105, 20, 330)])
+        with self.assertRaises(ValueError):
+            self.rect_frame.add_aperture(100, 20, 10)
+        # aperture isn't located on the moved wall anymore
+        self.rect_frame.y = 30
+        self.assertEqual(self.rect_frame.free_spans("top"), [(35, 30, 400)])
+
     def test_aperture_draw(self):
         """
         Test that added aperture correctly drawed
@@ -194,7 +270,7 @@ class TestRectFrame(BaseTestCase):
         Should draw all added bulkheads
         """
         bulkhead1 = self.rect_frame.add_bulkhead(70, 45, 30)
-        bulkhead2 = self.rect_frame.add_bulkhead(35, 70, 30)
+        bulkhead2 = self.rect_frame.add_bulkhead(120, 45, 30)
         from planner.drawing import Drawing
         drawing = Drawing()
         drawing.add(self.rect_frame)
@@ -203,3 +279,51 @@ class TestRectFrame(BaseTestCase):
         self.assertIn(bulkhead1._draw()[1].tostring(), drawed)
         self.assertIn(bulkhead2._draw()[0].tostring(), drawed)
         self.assertIn(bulkhead2._draw()[1].tostring(), drawed)
+
+    def test_bulkhead_groups(self):
+        """
+        Should group intersecting and touching bulkheads
+        """
+        bulkhead1 = self.rect_frame.add_bulkhead(70, 45, 30)
+        bulkhead2 = self.rect_frame.add_bulkhead(200, 45, 30)
+        bulkhead3 = self.rect_frame.add_bulkhead(100, 45, 10)
+        self.assertEqual(self.rect_frame.bulkhead_groups(), [[bulkhead1, bulkhead3], [bulkhead2]])
+        # horizontal bulkhead crosses all vertical ones
+        bulkhead4 = self.rect_frame.add_bulkhead(35, 70, 30)
+        self.assertEqual(self.rect_frame.bulkhead_groups(), [[bulkhead1, bulkhead2, bulkhead3, bulkhead4]])
+
+    def test_bulkhead_outlines(self):
+        """
+        Outline of intersecting bulkheads should go around of their union
+        """
+        self.rect_frame.add_bulkhead(70, 45, 30)
+        self.rect_frame.add_bulkhead(35, 70, 30)
+        outline, = self.rect_frame.bulkhead_outlines()
+        # cross of two bulkheads has 12 sides
+        self.assertLength(outline, 12)
+        self.assertIn(((35, 70), (70, 70)), outline)
+        self.assertIn(((70, 45), (100, 45)), outline)
+
+    def test_draw_merged_bulkheads(self):
+        """
+        Intersecting bulkheads should be drawn with backgrounds and one common outline
+        """
+        self.rect_frame.add_bulkhead(70, 45, 30)
+        self.rect_frame.add_bulkhead(35, 70, 30)
+        svg_objects = self.rect_frame._draw()
+        self.assertLength(svg_objects, 9)
+        background1, background2, outline = svg_objects[6:]
+        self.assertAttrib(background1, 'x', 70)
+        self.assertAttrib(background1, 'width', 30)
+        self.assertAttrib(background2, 'y', 70)
+        self.assertAttrib(background2, 'height', 30)
+        self.assertEqual(outline.elementname, 'path')
+        self.assertAttrib(outline, 'fill', 'none')
+
+    def test_bulkhead_hatching_defs(self):
+        """
+        Hatchings of bulkheads should be placed to defs section of frame
+        """
+        bulkhead = self.rect_frame.add_bulkhead(70, 45, 30)
+        bulkhead.add_hatching(self.ANGLE, self.DISTANCE, self.WIDTH, self.COLOR)
+        self.assertIn(bulkhead.hatch.pattern, self.rect_frame._defs_primitives())
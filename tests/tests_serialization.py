@@ -0,0 +1,149 @@
+from tests import BaseTestCase
+import os
+import tempfile
+
+
+class TestSerialization(BaseTestCase):
+
+    """
+    Test binary format of plans
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner import serialization
+        from planner.drawing import Drawing
+        from planner.frame import RectFrame
+        from planner.frame.dimension import AngleDimension, ExtensionableLinearDimension, DimensionSet
+        from planner.frame.batches import LineBatch
+        from planner.frame.title import SampleTitle
+        cls.serialization = serialization
+        cls.Drawing = Drawing
+        cls.RectFrame = RectFrame
+        cls.AngleDimension = AngleDimension
+        cls.ExtensionableLinearDimension = ExtensionableLinearDimension
+        cls.DimensionSet = DimensionSet
+        cls.LineBatch = LineBatch
+        cls.SampleTitle = SampleTitle
+
+    def _create_drawing(self):
+        drawing = self.Drawing((400, 300), precision=0.01)
+        frame = self.RectFrame(10, 10, 200, 150, 5, stroke="#111")
+        frame.add_aperture(15, 10, 30)
+        frame.add_aperture(10, 40, 20.5)
+        frame.add_bulkhead(15, 50, 5)
+        frame.add_hatching(30, 4)
+        drawing.add(frame)
+        other = self.RectFrame(250, 10, 100, 100, 3)
+        other.add_filling("#eee")
+        drawing.add(other)
+        drawing.add(self.ExtensionableLinearDimension((10, 10), (210, 10), "200 mm", direction=-1))
+        drawing.add(self.AngleDimension((0, 0), (10, 10), "45"))
+        drawing.add(self.DimensionSet([(0, 200), (0, 220)], [(100, 200), (100, 220)], ["a", "b"], [1, -1]))
+        drawing.add(self.LineBatch([((0, 0), (10, 10.5)), ((20, 0), (20, 30))], stroke="red"))
+        drawing.add(self.SampleTitle(400, 300, "Plan"))
+        return drawing
+
+    def test_round_trip(self):
+        """
+        Loaded drawing should be rendered the same as original one
+        """
+        drawing = self._create_drawing()
+        data = self.serialization.dumps(drawing)
+        self.assertEqual(data[:4], b"PLNR")
+        loaded = self.serialization.loads(data)
+        self.assertEqual(loaded.size, (400, 300))
+        self.assertEqual(loaded.backend.precision, 0.01)
+        self.assertEqual([type(obj) for obj in loaded.objects], [type(obj) for obj in drawing.objects])
+        self.assertEqual(loaded.render(), drawing.render())
+
+    def test_auto_size(self):
+        """
+        Automatic size of drawing should be kept
+        """
+        drawing = self.Drawing("auto", max_size="A2")
+        drawing.add(self.RectFrame(0, 0, 1000, 500, 10))
+        loaded = self.serialization.loads(self.serialization.dumps(drawing))
+        self.assertTrue(loaded.autosize)
+        self.assertEqual(loaded.layout(), drawing.layout())
+
+    def test_array_dtypes(self):
+        """
+        Numpy arrays should keep their types and values
+        """
+        import numpy as np
+        from planner.frame.batches import PolygonBatch
+        drawing = self.Drawing()
+        batch = PolygonBatch([[(0, 0), (10, 0), (10, 10)], [(20, 0), (30, 0), (30, 10), (20, 10)]])
+        batch.attribs = {"ids": np.array([2 ** 60 + 1, -3]), "mask": np.array([[True, False], [False, True]])}
+        drawing.add(batch)
+        loaded = self.serialization.loads(self.serialization.dumps(drawing)).objects[0]
+        for loaded_array, array in ((loaded.points, batch.points), (loaded.offsets, batch.offsets),
+                                    (loaded.attribs["ids"], batch.attribs["ids"]),
+                                    (loaded.attribs["mask"], batch.attribs["mask"])):
+            self.assertEqual(loaded_array.dtype, array.dtype)
+            self.assertEqual(loaded_array.tolist(), array.tolist())
+        self.assertEqual(loaded.offsets.dtype, np.int64)
+
+    def test_loaded_frame(self):
+        """
+        Loaded frame should be fully functional: nested figures and apertures index are restored
+        """
+        loaded = self.serialization.loads(self.serialization.dumps(self._create_drawing()))
+        frame = loaded.objects[0]
+        self.assertEqual(frame.corner, (10, 10))
+        self.assertIsInstance(frame.corner[0], int)
+        self.assertEqual(frame.apertures[1].width, 20.5)
+        self.assertIs(frame.apertures[0]._parent, frame)
+        self.assertEqual(frame.hatch.angle, 30)
+        self.assertEqual(loaded.objects[1].filling, "#eee")
+        with self.assertRaises(ValueError):
+            frame.add_aperture(10, 50, 10)
+        frame.add_aperture(10, 100, 10)
+        self.assertEqual(frame.free_spans("top"), [(45, 10, 160)])
+
+    def test_lazy_file(self):
+        """
+        Figures of memory-mapped file should be decoded separately
+        """
+        drawing = self._create_drawing()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            self.serialization.save(drawing, path)
+            with self.serialization.PlanFile.open(path) as plan:
+                self.assertEqual(len(plan), len(drawing.objects))
+                self.assertEqual(plan.settings["size"], (400, 300))
+                dimension_set = plan[4]
+                self.assertEqual(dimension_set.labels, ["a", "b"])
+                self.assertEqual(dimension_set.directions.tolist(), [True, False])
+                self.assertEqual(plan[-1].title, "Plan")
+                with self.assertRaises(IndexError):
+                    plan[len(drawing.objects)]
+            self.assertEqual(self.serialization.load(path).render(), drawing.render())
+        finally:
+            os.remove(path)
+
+    def test_strings_table(self):
+        """
+        Repeated strings should be stored once
+        """
+        drawing = self.Drawing()
+        for i in range(100):
+            drawing.add(self.RectFrame(i * 10, 0, 10, 10, 1, stroke="#123456"))
+        data = self.serialization.dumps(drawing)
+        self.assertEqual(data.count(b"#123456"), 1)
+        self.assertEqual(data.count(b"wall_width"), 1)
+
+    def test_invalid_data(self):
+        """
+        Should raise ValueError on foreign data or unknown values
+        """
+        with self.assertRaises(ValueError):
+            self.serialization.loads(b"GIF89a" + b"\0" * 100)
+        drawing = self.Drawing()
+        frame = self.RectFrame()
+        frame.attribs = {"stroke": object()}
+        drawing.add(frame)
+        with self.assertRaises(ValueError):
+            self.serialization.dumps(drawing)
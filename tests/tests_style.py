@@ -0,0 +1,69 @@
+from tests import BaseTestCase
+
+
+class TestStyle(BaseTestCase):
+
+    """
+    Test shared immutable styles
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.style import Style
+        cls.Style = Style
+
+    def test_interning(self):
+        """
+        Equal attributes should produce the same style object
+        """
+        style = self.Style.get({"stroke": "#000"}, {"stroke-width": "2"})
+        self.assertIs(style, self.Style.get({"stroke-width": "2", "stroke": "#000"}))
+        self.assertIs(style, self.Style.get(style))
+        self.assertIsNot(style, self.Style.get({"stroke": "#000"}))
+        self.assertEqual(style, {"stroke": "#000", "stroke-width": "2"})
+
+    def test_immutability(self):
+        """
+        Style can't be changed, but it copy is a regular dict
+        """
+        style = self.Style.get({"fill": "#fff"})
+        with self.assertRaises(TypeError):
+            style["fill"] = "#000"
+        with self.assertRaises(TypeError):
+            style.update({"fill": "#000"})
+        with self.assertRaises(TypeError):
+            del style["fill"]
+        attribs = style.copy()
+        attribs["fill"] = "#000"
+        self.assertEqual(style["fill"], "#fff")
+
+    def test_pickling(self):
+        """
+        Unpickled style should be shared as well
+        """
+        import pickle
+        style = self.Style.get({"fill": "#fff"})
+        self.assertIs(pickle.loads(pickle.dumps(style)), style)
+
+    def test_shared_figures_styles(self):
+        """
+        Figures with the same attributes should share style and have no instance dict
+        """
+        from planner.frame.line import Line
+        from planner.frame.bulkhead import Bulkhead
+        line1 = Line((0, 0), (1, 1), stroke="#f00")
+        line2 = Line((1, 1), (2, 2), stroke="#f00")
+        self.assertIs(line1.attribs, line2.attribs)
+        self.assertEqual(line1.attribs["stroke-width"], 0.5)
+        self.assertFalse(hasattr(line1, '__dict__'))
+        self.assertFalse(hasattr(Bulkhead((0, 0), (1, 1)), '__dict__'))
+
+    def test_dimension_attribs_isolation(self):
+        """
+        Attributes of one dimension should not affect other dimensions
+        """
+        from planner.frame.dimension import LinearDimension
+        red = LinearDimension((0, 0), (10, 0), "10", stroke="#f00")
+        black = LinearDimension((0, 0), (10, 0), "10")
+        self.assertEqual(red.attribs["stroke"], "#f00")
+        self.assertEqual(black.attribs["stroke"], "#000000")
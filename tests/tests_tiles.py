@@ -0,0 +1,100 @@
+from tests import BaseTestCase
+
+
+class TestTiles(BaseTestCase):
+
+    """
+    Test tiled rendering
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from planner.tiles import assign_tiles, get_tiles_grid
+        cls.assign_tiles = staticmethod(assign_tiles)
+        cls.get_tiles_grid = staticmethod(get_tiles_grid)
+
+    def setUp(self):
+        import tempfile
+        from planner.drawing import Drawing
+        from planner.frame import Rect
+        self.out_dir = tempfile.mkdtemp()
+        self.drawing = Drawing((400, 200))
+        self.left = Rect(10, 10, 50, 50, id="left")
+        self.right = Rect(300, 150, 20, 20, id="right")
+        self.rect = Rect(10, 100, 200, 50, id="rect")
+        self.rect.add_hatching()
+        for figure in (self.left, self.right, self.rect):
+            self.drawing.add(figure)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.out_dir)
+
+    def read(self, *path):
+        import os
+        with open(os.path.join(self.out_dir, *path)) as tile:
+            return tile.read()
+
+    def test_tiles_grid(self):
+        """
+        Longest side of plan should be covered with 2 ** zoom tiles
+        """
+        self.assertEqual(self.get_tiles_grid((0, 0, 400, 200), 0), (400, 1, 1))
+        self.assertEqual(self.get_tiles_grid((0, 0, 400, 200), 2), (100, 4, 2))
+        self.assertEqual(self.get_tiles_grid((1000, 1000, 3000, 2500), 1), (1000, 2, 2))
+
+    def test_assign_tiles(self):
+        """
+        Items should be assigned only to touched tiles
+        """
+        tiles = self.assign_tiles([(10, 10, 60, 60), (150, 10, 250, 60), None], (0, 0, 400, 200), 2)
+        self.assertEqual(tiles[(0, 0)], [0, 2])
+        self.assertEqual(tiles[(1, 0)], [1, 2])
+        self.assertEqual(tiles[(2, 0)], [1, 2])
+        self.assertEqual(tiles[(3, 1)], [2])
+        # grid starts at the origin of extent
+        tiles = self.assign_tiles([(1010, 1010, 1060, 1060)], (1000, 1000, 1400, 1200), 2)
+        self.assertEqual(list(tiles), [(0, 0)])
+
+    def test_render_tiles(self):
+        """
+        Should write tiles of every zoom level with touched objects only
+        """
+        import os
+        results = self.drawing.render_tiles(tile_size=256, zoom_levels=2, out_dir=self.out_dir, workers=2)
+        # 1 tile on zoom 0, 2 x 2 tiles on zoom 1
+        self.assertEqual(sorted((result.zoom, result.x, result.y) for result in results),
+                         [(0, 0, 0), (1, 0, 0), (1, 0, 1), (1, 1, 0), (1, 1, 1)])
+        for result in results:
+            self.assertEqual(os.path.getsize(result.path), result.size)
+        tile = self.read("0", "0", "0.svg")
+        self.assertIn('width="256px"', tile)
+        # pyramid covers content (10, 10, 320, 170)
+        self.assertIn('viewBox="10 10 310 310"', tile)
+        for figure_id in ("left", "right", "rect"):
+            self.assertIn('id="{}"'.format(figure_id), tile)
+        tile = self.read("1", "0", "0.svg")
+        self.assertIn('viewBox="10 10 155 155"', tile)
+        self.assertIn('id="left"', tile)
+        self.assertIn('id="rect"', tile)
+        self.assertIn(self.rect.hatch.id, tile)
+        self.assertNotIn('id="right"', tile)
+        tile = self.read("1", "1", "0.svg")
+        self.assertIn('id="right"', tile)
+        self.assertIn('id="rect"', tile)
+        self.assertNotIn('id="left"', tile)
+
+    def test_render_tiles_auto_size(self):
+        """
+        Tiles of drawing with automatic size should cover content far from the origin
+        """
+        from planner.drawing import Drawing
+        from planner.frame import RectFrame
+        drawing = Drawing("auto", cache=False)
+        drawing.add(RectFrame(1000, 1000, 2000, 1500, 20, id="frame"))
+        results = drawing.render_tiles(tile_size=256, zoom_levels=2, out_dir=self.out_dir)
+        self.assertLength(results, 1 + 4)
+        tile = self.read("0", "0", "0.svg")
+        self.assertIn('viewBox="1000 1000 2000 2000"', tile)
+        self.assertIn('id="frame"', tile)
+        self.assertIn('viewBox="2000 2000 1000 1000"', self.read("1", "1", "1.svg"))